@@ -1,3 +1,8 @@
-from .controller import Controller
-from .graph import collaborative, hero_comic
-from .manager import create_hero_service
\ No newline at end of file
+from . import lazy
+
+__all__ = ['Controller', 'collaborative', 'hero_comic', 'create_hero_service']
+
+__getattr__, __dir__ = lazy.attach(__name__, {'Controller': ('.controller', 'Controller'),
+                                              'collaborative': ('.graph.collaborative', None),
+                                              'hero_comic': ('.graph.hero_comic', None),
+                                              'create_hero_service': ('.manager', 'create_hero_service')})
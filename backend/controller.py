@@ -1,14 +1,22 @@
 """A controller module for the Marvel Hero graph."""
 import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 import networkx as nx
 
+from . import manager
+from .graph.snapshot import Snapshot
+from .instrument import run_instrumented
 from .manager import features, shortest_order_route, disconnecting_graphs, metrics, extract_communities
 
 logging.basicConfig(format='%(asctime)s - %(message)s', datefmt='%d-%b-%y %H:%M:%S')
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# The controller of a process pool worker, set once by _init_worker.
+_worker_controller = None
+
 
 class Controller:
     """The controller class is the main interface for the user to run methods on marvel graphs."""
@@ -17,32 +25,105 @@ class Controller:
         """Initialises the Controller.
 
         :arg
-        graph (nx.Graph) - the graph that this controller will operate on.
+        graph (nx.Graph, Snapshot) - the graph that this controller will operate on. Snapshots are shared, not copied.
         """
-        self.graph = nx.Graph(graph)
+        self.graph = graph if isinstance(graph, Snapshot) else nx.Graph(graph)
         self.funcs = {features.__name__: features,
                       shortest_order_route.__name__: shortest_order_route,
                       disconnecting_graphs.__name__: disconnecting_graphs,
                       metrics.__name__: metrics,
                       extract_communities.__name__: extract_communities}
 
-    def run(self, identifier: str, top_n: int, **kwargs):
+    def run(self, identifier: str, top_n: int, instrument=False, profile=None, **kwargs):
         """Runs the function that maps to the specific identifier on the graph of this controller.
 
         :arg
         identifier (str) - the name of the function to be run.
+        instrument (bool) - whether to record the time, the memory peak and the graph sizes of every stage of the run.
+        profile (str) - a path where the cProfile stats of the run are dumped. Implies instrument.
         **kwargs - keyword arguments that depend on the identifier that is provided. For example, <features> expects to
         find graph_type in the **kwargs.
 
         :return
-        the result of the function that was run.
+        the result of the function that was run. When instrumented, an InstrumentedResult with the result and the
+        RunRecord of the run.
         """
         if identifier not in self.funcs:
             raise ValueError(f'The identifier \"{identifier}\" does not map to an existing function.')
 
         logger.info(f'Calling function \"{identifier}\".')
-        result = self.funcs[identifier](self.graph, top_n, **kwargs)
+        if instrument or profile:
+            result = run_instrumented(self.funcs[identifier], identifier, self.graph, top_n, profile=profile, **kwargs)
+        else:
+            result = self.funcs[identifier](self.graph, top_n, **kwargs)
 
         logger.info(f'Received result from function \"{identifier}\".')
         return result
 
+
+    def run_batch(self, jobs, parallel=False, max_workers=None, instrument=False):
+        """Runs many jobs on the graph of this controller.
+
+        The jobs are grouped by top_n so that the top N heroes and their subgraph are only selected once per group. The
+        groups run in increasing order of top_n and the jobs within a group are ordered by identifier, so that runs of
+        the same function follow each other.
+
+        :arg
+        jobs (iter) - an iterable of (identifier, top_n, kwargs) tuples.
+        parallel (bool) - whether the groups run in parallel, in separate processes. The results are then pickled back
+        to this process.
+        max_workers (int) - the number of processes when running in parallel.
+        instrument (bool) - whether every result is an InstrumentedResult with the RunRecord of its job.
+
+        :return
+        a list with the result of each job, in the same order as the jobs.
+        """
+        jobs = list(jobs)
+        for identifier, _, _ in jobs:
+            if identifier not in self.funcs:
+                raise ValueError(f'The identifier \"{identifier}\" does not map to an existing function.')
+
+        groups = defaultdict(list)
+        for index, (identifier, top_n, kwargs) in enumerate(jobs):
+            groups[top_n].append(index)
+
+        groups = [sorted(indices, key=lambda index: jobs[index][0]) for _, indices in sorted(groups.items())]
+        group_jobs = [[jobs[index] for index in indices] for indices in groups]
+
+        logger.info(f'Running {len(jobs)} jobs in {len(groups)} groups.')
+        if parallel and len(groups) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self, manager.hero_service, manager.hero_registry)) as pool:
+                group_results = list(pool.map(_run_group_in_worker, group_jobs, [instrument] * len(group_jobs)))
+        else:
+            group_results = [self._run_group(group, instrument) for group in group_jobs]
+
+        results = [None] * len(jobs)
+        for indices, group_result in zip(groups, group_results):
+            for index, result in zip(indices, group_result):
+                results[index] = result
+
+        logger.info(f'Received results of {len(jobs)} jobs.')
+        return results
+
+    def _run_group(self, jobs, instrument=False):
+        """Runs jobs that share the same top_n with a shared selection of the top N heroes."""
+        selection_cache = {}
+        if instrument:
+            return [run_instrumented(self.funcs[identifier], identifier, self.graph, top_n,
+                                     selection_cache=selection_cache, **kwargs)
+                    for identifier, top_n, kwargs in jobs]
+
+        return [self.funcs[identifier](self.graph, top_n, selection_cache=selection_cache, **kwargs)
+                for identifier, top_n, kwargs in jobs]
+
+
+def _init_worker(controller, hero_service, hero_registry=None):
+    global _worker_controller
+    _worker_controller = controller
+    manager.hero_service = hero_service
+    manager.hero_registry = hero_registry
+
+
+def _run_group_in_worker(jobs, instrument):
+    return _worker_controller._run_group(jobs, instrument)
@@ -1,2 +1,6 @@
-from .graph import GraphType, GraphFeatures, GraphMode
-from .graph import get_degree_dist, get_hubs, get_graph_mode
+from backend import lazy
+
+__all__ = ['GraphType', 'GraphFeatures', 'GraphMode', 'Estimate', 'SampledFeatures', 'get_degree_dist', 'get_hubs',
+           'get_graph_mode']
+
+__getattr__, __dir__ = lazy.attach(__name__, {name: ('.graph', name) for name in __all__})
@@ -37,6 +37,34 @@ class GraphFeatures:
     avg_degree: float
     hubs: pd.DataFrame
     mode: GraphMode
+    # the statistics of the two node sets of the hero-comic graph, None for the collaborative graph
+    bipartite_density: float = None
+    hero_degree_dist: pd.DataFrame = None
+    comic_degree_dist: pd.DataFrame = None
+    # the clustering of the collaborative graph, None unless requested
+    global_clustering: float = None
+    avg_clustering: float = None
+    hero_triangles: pd.DataFrame = None
+
+
+@dataclass(frozen=True, repr=True)
+class Estimate:
+    """The estimate of a statistic from samples: the mean over the samples and its confidence interval."""
+    value: float
+    low: float
+    high: float
+    n_samples: int
+
+
+@dataclass(frozen=True, repr=True)
+class SampledFeatures:
+    """A dataclass for graph features that are estimated from samples of the graph, see the sampling module."""
+    graph_type: GraphType
+    n_nodes: int
+    sample: any
+    density: Estimate
+    avg_degree: Estimate
+    hub_threshold: Estimate
 
 
 def get_degree_dist(graph: nx.Graph):
@@ -48,8 +76,8 @@ def get_degree_dist(graph: nx.Graph):
     :return
     a pandas dataframe with node and degree columns.
     """
-    dist = [(hero, graph.degree(hero)) for hero in graph.nodes()]
-    return pd.DataFrame(data=dist, columns=['node', 'degree'])
+    nodes, degrees = zip(*graph.degree()) if graph.number_of_nodes() else ((), ())
+    return pd.DataFrame({'node': np.array(nodes, dtype=object), 'degree': np.array(degrees, dtype=np.int64)})
 
 
 def get_hubs(graph: nx.Graph, percentile: int):
@@ -1,4 +1,8 @@
-from .comic import Comic
-from .hero import Collaboration
-from .disconnection import Disconnection
-from .communities import Communities
+from backend import lazy
+
+__all__ = ['Comic', 'Collaboration', 'Disconnection', 'Communities']
+
+__getattr__, __dir__ = lazy.attach(__name__, {'Comic': ('.comic', 'Comic'),
+                                              'Collaboration': ('.hero', 'Collaboration'),
+                                              'Disconnection': ('.disconnection', 'Disconnection'),
+                                              'Communities': ('.communities', 'Communities')})
@@ -1,17 +1,45 @@
 """Module for community objects."""
+import attr
+import numpy as np
 from attr import dataclass
-import networkx as nx
 
+from .compact import GraphRef
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Communities:
-    links: iter
-    original_graph: nx.Graph
+    """Two communities of the top heroes and the minimum edge cut of their graph.
+
+    The nodes and the cut edges are stored as numpy arrays. The graphs are built on demand from the graph the
+    communities were computed on, which is only weakly referenced.
+    """
+    links: np.ndarray
     hero_1: str
     hero_2: str
-    community_1: nx.Graph
-    community_2: nx.Graph
+    nodes: np.ndarray
+    community_1: np.ndarray
+    community_2: np.ndarray
     same_community: bool
+    source: GraphRef = attr.ib(factory=GraphRef, repr=False)
 
     def num_links(self):
-        return len(self.links)
\ No newline at end of file
+        return len(self.links)
+
+    @property
+    def original_graph(self):
+        """The subgraph of the top heroes that was split into communities."""
+        return self.source.subgraph(self.nodes)
+
+    @property
+    def graph_1(self):
+        """The subgraph of the first community."""
+        return self.source.subgraph(self.community_1)
+
+    @property
+    def graph_2(self):
+        """The subgraph of the second community."""
+        return self.source.subgraph(self.community_2)
+
+    def with_graph(self, graph):
+        """Returns a copy of the communities whose subgraphs are built from the given graph."""
+        return attr.evolve(self, source=GraphRef(graph))
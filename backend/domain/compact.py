@@ -0,0 +1,75 @@
+"""A module with the building blocks of compact result objects.
+
+Results hold the nodes and edges they refer to as numpy arrays, together with a weak reference to the graph they were
+computed on. Networkx subgraphs are only built when they are asked for, so results do not keep graphs alive.
+"""
+import weakref
+
+import numpy as np
+
+
+class GraphRef:
+    """A weak reference to a networkx graph that is pickled as a dead reference."""
+
+    __slots__ = ('_ref',)
+
+    def __init__(self, graph=None):
+        """Initialises the GraphRef.
+
+        :arg
+        graph (nx.Graph) - the graph to refer to. If None, the reference is dead.
+        """
+        self._ref = weakref.ref(graph) if graph is not None else None
+
+    def __call__(self):
+        """Returns the graph, or None if it no longer exists."""
+        return self._ref() if self._ref else None
+
+    def __reduce__(self):
+        return GraphRef, ()
+
+    def subgraph(self, nodes):
+        """Builds the subgraph of the referenced graph that is induced by the nodes.
+
+        :arg
+        nodes (iter) - the nodes of the subgraph.
+
+        :return
+        a networkx subgraph view.
+        """
+        graph = self()
+        if graph is None:
+            raise ValueError('The graph of this result no longer exists. Attach a graph with with_graph(graph).')
+
+        return graph.subgraph(nodes.tolist() if isinstance(nodes, np.ndarray) else nodes)
+
+
+def node_array(nodes):
+    """Converts nodes into a one dimensional numpy object array.
+
+    :arg
+    nodes (iter) - an iterable of nodes.
+
+    :return
+    a numpy array of the nodes.
+    """
+    nodes = list(nodes)
+    array = np.empty(len(nodes), dtype=object)
+    array[:] = nodes
+    return array
+
+
+def edge_array(edges):
+    """Converts edges into a numpy object array with one (u, v) row per edge.
+
+    :arg
+    edges (iter) - an iterable of (u, v) tuples.
+
+    :return
+    a numpy array of shape (n_edges, 2).
+    """
+    edges = list(edges)
+    array = np.empty((len(edges), 2), dtype=object)
+    for i, (u, v) in enumerate(edges):
+        array[i, 0], array[i, 1] = u, v
+    return array
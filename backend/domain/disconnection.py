@@ -1,17 +1,45 @@
 """Module for disconnecting graph domain objects."""
-import networkx as nx
+import attr
+import numpy as np
 from attr import dataclass
 
+from .compact import GraphRef
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Disconnection:
-    links: iter
+    """The minimum cut that disconnects two heroes.
+
+    The nodes and the cut edges are stored as numpy arrays. The graphs are built on demand from the graph the
+    disconnection was computed on, which is only weakly referenced.
+    """
+    links: np.ndarray
     weight: float
-    original_graph: nx.Graph
     hero_a: str
     hero_b: str
-    graph_a: nx.Graph
-    graph_b: nx.Graph
+    nodes: np.ndarray
+    nodes_a: np.ndarray
+    nodes_b: np.ndarray
+    source: GraphRef = attr.ib(factory=GraphRef, repr=False)
 
     def num_links(self):
         return len(self.links)
+
+    @property
+    def original_graph(self):
+        """The subgraph of the top heroes that was cut."""
+        return self.source.subgraph(self.nodes)
+
+    @property
+    def graph_a(self):
+        """The subgraph on the side of hero_a."""
+        return self.source.subgraph(self.nodes_a)
+
+    @property
+    def graph_b(self):
+        """The subgraph on the side of hero_b."""
+        return self.source.subgraph(self.nodes_b)
+
+    def with_graph(self, graph):
+        """Returns a copy of the disconnection whose subgraphs are built from the given graph."""
+        return attr.evolve(self, source=GraphRef(graph))
@@ -1,3 +1,20 @@
-from .collaborative import get_hero_collabs
-from .hero_comic import get_n_heroes_per_comic, get_comic_nodes, get_subgraph_with
-from .weight import max_prop, reciprocal_prop
+from backend import lazy
+
+__all__ = ['get_hero_collabs', 'get_n_heroes_per_comic', 'get_comic_nodes', 'get_subgraph_with', 'max_prop',
+           'reciprocal_prop', 'core_numbers', 'k_core', 'BipartiteIndex', 'ComponentIndex',
+           'EdgeBetweenness', 'edge_betweenness', 'triangles', 'transitivity']
+
+__getattr__, __dir__ = lazy.attach(__name__, {'get_hero_collabs': ('.collaborative', 'get_hero_collabs'),
+                                              'get_n_heroes_per_comic': ('.hero_comic', 'get_n_heroes_per_comic'),
+                                              'get_comic_nodes': ('.hero_comic', 'get_comic_nodes'),
+                                              'get_subgraph_with': ('.hero_comic', 'get_subgraph_with'),
+                                              'max_prop': ('.weight', 'max_prop'),
+                                              'reciprocal_prop': ('.weight', 'reciprocal_prop'),
+                                              'core_numbers': ('.core', 'core_numbers'),
+                                              'k_core': ('.core', 'k_core'),
+                                              'BipartiteIndex': ('.bipartite', 'BipartiteIndex'),
+                                              'ComponentIndex': ('.components', 'ComponentIndex'),
+                                              'EdgeBetweenness': ('.betweenness', 'EdgeBetweenness'),
+                                              'edge_betweenness': ('.betweenness', 'edge_betweenness'),
+                                              'triangles': ('.triangles', 'triangles'),
+                                              'transitivity': ('.triangles', 'transitivity')})
@@ -0,0 +1,187 @@
+"""A module for the edge betweenness of hero graphs.
+
+The edge betweenness of an edge is the number of shortest paths between all pairs of nodes that pass through it. It is
+computed with the algorithm of Brandes on the graph in CSR form: one shortest path search per source node, followed by
+the accumulation of the dependencies of the source onto the edges. The sources are split into batches, which are
+accumulated into one array per batch, in parallel processes if requested, and summed.
+
+The scores are scaled like nx.edge_betweenness_centrality, so the two are interchangeable. The result is an
+EdgeBetweenness with one score per edge in the order of graph.edges().
+"""
+import heapq
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import numpy as np
+
+
+class EdgeBetweenness:
+    """The edge betweenness of every edge of a graph."""
+
+    def __init__(self, nodes: list, edges: np.ndarray, scores: np.ndarray):
+        """Initialises the EdgeBetweenness.
+
+        :arg
+        nodes (list) - the nodes of the graph.
+        edges (np.ndarray) - an (m, 2) array with the positions of the nodes of every edge in nodes.
+        scores (np.ndarray) - the score of every edge.
+        """
+        self.nodes = nodes
+        self.edges = edges
+        self.scores = scores
+        self._positions = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def edge(self, i: int):
+        """Returns the edge at a position, as a tuple of nodes."""
+        return self.nodes[self.edges[i, 0]], self.nodes[self.edges[i, 1]]
+
+    def top(self):
+        """Returns the edge with the highest score. Of edges with the same score, the first one in the order of
+        graph.edges() is returned."""
+        return self.edge(int(np.argmax(self.scores)))
+
+    def score(self, u, v):
+        """Returns the score of an edge, in either direction."""
+        if self._positions is None:
+            self._positions = {self.edge(i): i for i in range(len(self))}
+        position = self._positions.get((u, v), self._positions.get((v, u)))
+        if position is None:
+            raise KeyError(f'The edge ({u}, {v}) is not in the graph.')
+        return float(self.scores[position])
+
+    def to_dict(self):
+        """Returns a dictionary of edge to score, like nx.edge_betweenness_centrality."""
+        return {self.edge(i): score for i, score in enumerate(self.scores.tolist())}
+
+
+def edge_betweenness(graph: nx.Graph, weight: str = None, k: int = None, seed=None, normalized=True,
+                     max_workers=1, batch_size=None):
+    """Computes the edge betweenness of every edge of a graph.
+
+    :arg
+    graph (nx.Graph) - an undirected networkx graph.
+    weight (str) - the edge attribute with the length of the edges. If None, every edge has length 1.
+    k (int) - if given, the number of sources that are sampled, which approximates the betweenness.
+    seed (int) - the seed of the sampling. The same seed samples the same sources as nx.edge_betweenness_centrality.
+    normalized (bool) - whether the scores are divided by the number of pairs of nodes.
+    max_workers (int) - the number of processes. If None, the number of CPUs.
+    batch_size (int) - the number of sources per batch. By default, the sources are split evenly over the processes.
+
+    :return
+    an EdgeBetweenness.
+    """
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    lengths = None if weight is None else np.fromiter((length for *_, length in graph.edges(data=weight, default=1)),
+                                                      dtype=float, count=len(edges))
+
+    sources = list(range(len(nodes))) if k is None else \
+        [index[node] for node in random.Random(seed).sample(nodes, k)]
+    max_workers = max_workers or os.cpu_count() or 1
+    batch_size = batch_size or max(1, -(-len(sources) // max_workers))
+    batches = [sources[i:i + batch_size] for i in range(0, len(sources), batch_size)]
+
+    csr = _csr(len(nodes), edges, lengths)
+    if max_workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(_accumulate, itertools.repeat(csr), batches))
+    else:
+        partials = [_accumulate(csr, batch) for batch in batches]
+
+    scores = np.sum(partials, axis=0) if partials else np.zeros(len(edges))
+    return EdgeBetweenness(nodes, edges, scores * _scale(len(nodes), len(sources), normalized))
+
+
+def _scale(n, n_sources, normalized):
+    """Scales the sums over ordered pairs of nodes like networkx does."""
+    if n < 2 or not n_sources:
+        return 1.0
+    if normalized:
+        return 1 / (n_sources * (n - 1))
+    # every unordered pair of nodes is counted from both of its nodes
+    return n / (n_sources * 2)
+
+
+def _csr(n, edges, lengths):
+    """The neighbours, the edge positions and the edge lengths of every node, with offsets[i] the position of the first
+    neighbour of node i."""
+    sources = np.concatenate([edges[:, 0], edges[:, 1]])
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    neighbours = np.concatenate([edges[:, 1], edges[:, 0]])[order]
+    edge_ids = np.concatenate([np.arange(len(edges)), np.arange(len(edges))])[order]
+    return offsets, neighbours, edge_ids, None if lengths is None else np.concatenate([lengths, lengths])[order]
+
+
+def _accumulate(csr, sources):
+    """Sums the dependencies of the edges over the sources."""
+    offsets, neighbours, edge_ids, lengths = csr
+    n = len(offsets) - 1
+    scores = [0.0] * (len(edge_ids) // 2)
+    adjacency = [list(zip(neighbours[offsets[i]:offsets[i + 1]].tolist(),
+                          edge_ids[offsets[i]:offsets[i + 1]].tolist(),
+                          lengths[offsets[i]:offsets[i + 1]].tolist() if lengths is not None
+                          else itertools.repeat(1)))
+                 for i in range(n)]
+
+    search = _breadth_first if lengths is None else _dijkstra
+    for source in sources:
+        order, predecessors, sigma = search(adjacency, n, source)
+        delta = [0.0] * n
+        for w in reversed(order):
+            coefficient = (1 + delta[w]) / sigma[w]
+            for v, edge in predecessors[w]:
+                c = sigma[v] * coefficient
+                scores[edge] += c
+                delta[v] += c
+
+    return np.array(scores)
+
+
+def _breadth_first(adjacency, n, source):
+    """The nodes in order of distance, their predecessors on shortest paths and their number of shortest paths."""
+    sigma, distances, predecessors = [0.0] * n, [-1] * n, [[] for _ in range(n)]
+    sigma[source], distances[source] = 1.0, 0
+    order, queue = [], [source]
+    for v in queue:
+        order.append(v)
+        for w, edge, _ in adjacency[v]:
+            if distances[w] < 0:
+                distances[w] = distances[v] + 1
+                queue.append(w)
+            if distances[w] == distances[v] + 1:
+                sigma[w] += sigma[v]
+                predecessors[w].append((v, edge))
+    return order, predecessors, sigma
+
+
+def _dijkstra(adjacency, n, source):
+    """Like _breadth_first, with the lengths of the edges."""
+    sigma, distances, predecessors = [0.0] * n, [None] * n, [[] for _ in range(n)]
+    sigma[source], distances[source] = 1.0, 0
+    done, order, queue = [False] * n, [], [(0, source)]
+    while queue:
+        distance, v = heapq.heappop(queue)
+        if done[v]:
+            continue
+        done[v] = True
+        order.append(v)
+        for w, edge, length in adjacency[v]:
+            w_distance = distance + length
+            if done[w]:
+                continue
+            if distances[w] is None or w_distance < distances[w]:
+                distances[w], sigma[w], predecessors[w] = w_distance, sigma[v], [(v, edge)]
+                heapq.heappush(queue, (w_distance, w))
+            elif w_distance == distances[w]:
+                sigma[w] += sigma[v]
+                predecessors[w].append((v, edge))
+    return order, predecessors, sigma
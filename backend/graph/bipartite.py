@@ -0,0 +1,115 @@
+"""A module for algorithms that know the two node sets of the hero-comic graph.
+
+Heroes are only connected to comics and comics only to heroes. The node sets are told apart by the 'type' attribute of
+the nodes, nodes without it are heroes. Generic algorithms mix the two sets: the density of a bipartite graph can be at
+most |heroes| * |comics| / (n * (n - 1) / 2), and a breadth-first search from a hero expands every comic as a node of
+its own. The BipartiteIndex keeps the adjacency of both sides, so statistics are computed per side and searches step
+from heroes to heroes over comics in one hop.
+"""
+import weakref
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+_cache = weakref.WeakKeyDictionary()
+
+
+class BipartiteIndex:
+    """The comics of every hero and the heroes of every comic of a hero-comic graph."""
+
+    def __init__(self, graph: nx.Graph):
+        """Initialises the BipartiteIndex. The graph must not be modified afterwards.
+
+        :arg
+        graph (nx.Graph) - a hero-comic networkx graph.
+        """
+        types = dict(graph.nodes(data='type', default='hero'))
+        self.hero_comics = {node: tuple(graph.adj[node]) for node, node_type in types.items() if node_type == 'hero'}
+        self.comic_heroes = {node: tuple(graph.adj[node]) for node, node_type in types.items() if node_type != 'hero'}
+        self.n_edges = graph.number_of_edges()
+
+    @staticmethod
+    def of(graph: nx.Graph):
+        """Returns the index of a graph. It is built once and cached until the graph is garbage collected."""
+        if graph not in _cache:
+            _cache[graph] = BipartiteIndex(graph)
+        return _cache[graph]
+
+    def density(self):
+        """Returns the bipartite density: the number of edges divided by the number of hero-comic pairs."""
+        pairs = len(self.hero_comics) * len(self.comic_heroes)
+        return self.n_edges / pairs if pairs else 0.0
+
+    def degree_dists(self):
+        """Returns the degree distributions of the heroes, i.e. their number of comics, and of the comics, i.e. their
+        number of heroes.
+
+        :return
+        (pd.DataFrame, pd.DataFrame) - the distributions of the heroes and the comics, with node and degree columns.
+        """
+        return tuple(pd.DataFrame({'node': np.array(list(adjacency), dtype=object),
+                                   'degree': np.fromiter(map(len, adjacency.values()), dtype=np.int64,
+                                                         count=len(adjacency))})
+                     for adjacency in (self.hero_comics, self.comic_heroes))
+
+    def shortest_path(self, source, target):
+        """Finds a shortest path between two heroes.
+
+        The search is bidirectional and expands heroes only: the heroes of every comic of a hero are its next layer.
+        Every comic is expanded at most once per direction.
+
+        :arg
+        source - the first hero.
+        target - the last hero.
+
+        :return
+        a list of the nodes of the path, heroes and the comics between them, like nx.bidirectional_shortest_path.
+
+        :raise
+        nx.NodeNotFound - if a hero is not in the graph.
+        nx.NetworkXNoPath - if there is no path between the heroes.
+        """
+        for hero in (source, target):
+            if hero not in self.hero_comics:
+                raise nx.NodeNotFound(f'The hero {hero} is not in the graph.')
+        if source == target:
+            return [source]
+
+        # parents[hero] is the (comic, hero) step towards the source or the target
+        parents = ({source: None}, {target: None})
+        seen_comics = (set(), set())
+        frontiers = ([source], [target])
+        while frontiers[0] and frontiers[1]:
+            # expand the smaller frontier
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            next_frontier = []
+            for hero in frontiers[side]:
+                for comic in self.hero_comics[hero]:
+                    if comic in seen_comics[side]:
+                        continue
+                    seen_comics[side].add(comic)
+                    for neighbour in self.comic_heroes[comic]:
+                        if neighbour in parents[side]:
+                            continue
+                        parents[side][neighbour] = comic, hero
+                        if neighbour in parents[1 - side]:
+                            return _join(parents, neighbour)
+                        next_frontier.append(neighbour)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+        raise nx.NetworkXNoPath(f'There is no path between {source} and {target}.')
+
+
+def _join(parents, meeting):
+    """Joins the paths from the source and from the target that meet at a hero."""
+    path = [meeting]
+    step = parents[0][meeting]
+    while step:
+        path[:0] = step[::-1]
+        step = parents[0][step[1]]
+    step = parents[1][meeting]
+    while step:
+        path.extend(step)
+        step = parents[1][step[1]]
+    return path
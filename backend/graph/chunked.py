@@ -0,0 +1,156 @@
+"""A module for reading and pair-counting large csv files in parallel.
+
+A csv file is split into byte ranges of about the same size. Every range is parsed, preprocessed and reduced in its own
+process, e.g. into the number of collaborations of every pair of heroes, and the partial results are merged in the
+order of the ranges. All preprocessing steps are applied row by row, so the result is the same as reading the whole
+file at once.
+
+Quoted fields that contain line breaks are not supported, a line break always ends a row.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .preprocess import remove_self_loops, strip_trailing_characters, replace_hero
+
+
+def chunk_ranges(path: str, n_chunks: int):
+    """Splits a csv file into byte ranges that start at the beginning of a row.
+
+    :arg
+    path (str) - the path of the csv file.
+    n_chunks (int) - the number of ranges.
+
+    :return
+    a list of (start, end) byte offsets. The first range starts after the header.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        file.readline()
+        header_end = file.tell()
+
+        boundaries = [header_end]
+        for i in range(1, n_chunks):
+            # move every boundary to the start of the next row
+            file.seek(max(header_end + (size - header_end) * i // n_chunks - 1, boundaries[-1]))
+            file.readline()
+            boundaries.append(max(file.tell(), boundaries[-1]))
+        boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def read_range(path: str, start: int, end: int):
+    """Reads the rows of a csv file within a byte range.
+
+    :arg
+    path (str) - the path of the csv file.
+    start (int) - the offset of the first row.
+    end (int) - the offset after the last row.
+
+    :return
+    a pandas dataframe with the rows and the columns of the header of the file.
+    """
+    with open(path, 'rb') as file:
+        columns = pd.read_csv(io.BytesIO(file.readline()), nrows=0).columns
+        file.seek(start)
+        data = file.read(end - start)
+
+    return pd.read_csv(io.BytesIO(data), header=None, names=columns)
+
+
+def read_csv(path: str, process=None, max_workers=None):
+    """Reads a csv file in parallel.
+
+    :arg
+    path (str) - the path of the csv file.
+    process (function) - a function that is applied to the dataframe of every range, in the worker processes. It must
+    be picklable, i.e. a module level function. If None, the dataframes are returned as they are.
+    max_workers (int) - the number of processes. If None, the number of CPUs.
+
+    :return
+    the results of the function, one per range, in the order of the ranges.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    ranges = chunk_ranges(path, max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_read_and_process, path, start, end, process) for start, end in ranges]
+        return [future.result() for future in futures]
+
+
+def count_hero_pairs(path: str, max_workers=None):
+    """Counts the collaborations of every pair of heroes in a hero-network csv file, in parallel.
+
+    The rows are preprocessed like collaborative.create_from does: self loops are removed, trailing characters are
+    stripped and 'SPIDER-MAN/PETER PAR' is renamed.
+
+    :arg
+    path (str) - the path of the hero-network csv file with the columns hero1 and hero2.
+    max_workers (int) - the number of processes. If None, the number of CPUs.
+
+    :return
+    a pandas dataframe with the columns hero_1, hero_2 and n_collabs, one row per pair, where hero_1 <= hero_2.
+    """
+    counts = pd.concat(read_csv(path, _count_pairs, max_workers), ignore_index=True)
+    return counts.groupby(['hero_1', 'hero_2'], sort=False, as_index=False)['n_collabs'].sum()
+
+
+def read_edges(path: str, max_workers=None):
+    """Reads a hero-comic edges csv file in parallel, with trailing characters stripped from all columns.
+
+    :arg
+    path (str) - the path of the edges csv file.
+    max_workers (int) - the number of processes. If None, the number of CPUs.
+
+    :return
+    a pandas dataframe with the rows of the file, in the order of the file.
+    """
+    return pd.concat(read_csv(path, _strip, max_workers), ignore_index=True)
+
+
+class MultiGraphDegrees:
+    """The degrees of the multigraph of all collaborations, computed from the pair counts.
+
+    Weight functions receive it instead of the multigraph: it supports graph.nodes(), graph.degree(node) and
+    nx.degree(graph, node).
+    """
+
+    def __init__(self, counts: pd.DataFrame):
+        """Initialises the MultiGraphDegrees.
+
+        :arg
+        counts (pd.DataFrame) - the pair counts with the columns hero_1, hero_2 and n_collabs.
+        """
+        # a self loop adds 2 to the degree of its hero, like in networkx
+        degrees = pd.concat([counts.groupby('hero_1')['n_collabs'].sum(), counts.groupby('hero_2')['n_collabs'].sum()])
+        self.degrees = degrees.groupby(level=0).sum().to_dict()
+
+    def nodes(self):
+        return self.degrees.keys()
+
+    def degree(self, node, weight=None):
+        return self.degrees[node]
+
+
+def _read_and_process(path, start, end, process):
+    data = read_range(path, start, end)
+    return process(data) if process else data
+
+
+def _count_pairs(data):
+    remove_self_loops(data)
+    strip_trailing_characters(data)
+    replace_hero(data, 'SPIDER-MAN/PETER PAR', 'SPIDER-MAN/PETER PARKER')
+
+    # every pair is counted once, independently of the order of its heroes
+    swap = data.hero1.values > data.hero2.values
+    pairs = pd.DataFrame({'hero_1': data.hero1.where(~swap, data.hero2),
+                          'hero_2': data.hero2.where(~swap, data.hero1)})
+    return pairs.value_counts(sort=False).rename('n_collabs').reset_index()
+
+
+def _strip(data):
+    strip_trailing_characters(data)
+    return data
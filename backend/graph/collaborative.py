@@ -3,9 +3,11 @@ import logging
 from collections import Counter
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 
 from backend.describe import GraphType
+from . import chunked
 from .preprocess import remove_self_loops, strip_trailing_characters, replace_hero
 from .weight import reciprocal_prop, max_prop
 
@@ -17,7 +19,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def create_from(data=None, weight=max_prop):
+def create_from(data=None, weight=max_prop, parallel=False, max_workers=None):
     """Creates a collaborative hero graph.
 
     Only specify either the path OR the data parameter, NOT both.
@@ -26,6 +28,9 @@ def create_from(data=None, weight=max_prop):
     path (str) - the path to a file to create the graph from.
     data (pd.DataFrame) - a pandas dataframe to create the graph from.
     weight (function) - a function that is used to weight the edges between heroes.
+    parallel (bool) - whether to read and count the collaborations of a csv file in parallel, in byte range chunks.
+    The weight function then receives a MultiGraphDegrees instead of the multigraph, see the chunked module.
+    max_workers (int) - the number of processes when reading in parallel. If None, the number of CPUs.
 
     :return
     A weighted, undirected, collaborative networkx graph of the hero data, and its graph type.
@@ -33,6 +38,11 @@ def create_from(data=None, weight=max_prop):
     if not type(data) in _ACCEPTED_TYPES:
         raise ValueError(f'The data must be of the allowed types {_ACCEPTED_TYPES}. type(data) = {type(data)}')
 
+    if isinstance(data, str) and parallel:
+        logger.info(f'Creating collaborative hero graph from a csv file, in parallel.')
+        return _create_graph_from_pair_counts(chunked.count_hero_pairs(data, max_workers), weight), \
+            GraphType.COLLABORATIVE
+
     if isinstance(data, str):
         data = pd.read_csv(data)
         remove_self_loops(data)
@@ -51,6 +61,28 @@ def _create_graph_from_data(data, weight=reciprocal_prop):
     return _create_weighted_graph_from_multi_graph(multi_graph, weight)
 
 
+def _create_graph_from_pair_counts(counts, weight=reciprocal_prop):
+    """Creates an undirected, weighted graph from the number of collaborations of every pair of heroes.
+
+    :arg
+    counts (pd.DataFrame) - a pandas dataframe with the columns hero_1, hero_2 and n_collabs, one row per pair.
+    weight (function) - a function that is used to weight the edges between heroes.
+
+    :return
+    an networkx graph with weighted edges.
+    """
+    degrees = chunked.MultiGraphDegrees(counts)
+    weighted_edges = [(hero_1, hero_2, {'weight': weight(hero_1, hero_2, n, degrees), 'n_collabs': n})
+                      for hero_1, hero_2, n in zip(counts.hero_1.values, counts.hero_2.values,
+                                                   counts.n_collabs.values.tolist())]
+
+    weighted_graph = nx.Graph()
+    weighted_graph.add_nodes_from(degrees.nodes())
+    weighted_graph.add_edges_from(weighted_edges)
+
+    return weighted_graph
+
+
 def _create_multi_graph_from_data(data):
     """Creates an undirected, unweighted multigraph from the data.
 
@@ -109,11 +141,10 @@ def get_hero_collabs(graph: nx.Graph):
     :return
     a dataframe of unique hero collaborations.
     """
-    collabs = []
-    for hero in graph.nodes():
-
-        for neigh in graph.neighbors(hero):
-            n_collabs = graph.get_edge_data(hero, neigh)['n_collabs']
-            collabs.append([hero, neigh, n_collabs])
+    # every undirected edge is visited once, so every collaboration is stored once
+    heroes_1, heroes_2, n_collabs = (zip(*graph.edges(data='n_collabs')) if graph.number_of_edges()
+                                     else ((), (), ()))
 
-    return pd.DataFrame(collabs, columns=['hero_1', 'hero_2', 'n_collabs'])
+    return pd.DataFrame({'hero_1': np.array(heroes_1, dtype=object),
+                         'hero_2': np.array(heroes_2, dtype=object),
+                         'n_collabs': np.array(n_collabs, dtype=np.int64)})
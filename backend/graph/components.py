@@ -0,0 +1,144 @@
+"""A module for the connected components of hero graphs.
+
+The ComponentIndex labels every node with its component, so whether two nodes are connected is answered in O(1). The
+labels are kept up to date when edges are added, by merging the smaller component into the larger one, and when edges
+are removed, by searching from both ends of the edge at the same time until one side is exhausted or the two meet. A
+split only relabels the smaller side.
+"""
+import itertools
+import weakref
+
+import networkx as nx
+
+_cache = weakref.WeakKeyDictionary()
+
+
+class ComponentIndex:
+    """The connected component of every node of a graph."""
+
+    def __init__(self, graph: nx.Graph):
+        """Initialises the ComponentIndex.
+
+        :arg
+        graph (nx.Graph) - a networkx graph.
+        """
+        self.labels = {}
+        self.members = {}
+        self._next_label = itertools.count()
+        for component in nx.connected_components(graph):
+            label = next(self._next_label)
+            self.members[label] = component
+            self.labels.update(dict.fromkeys(component, label))
+
+    @staticmethod
+    def of(graph: nx.Graph):
+        """Returns the index of a graph. It is built once and cached until the graph is garbage collected, so the graph
+        must only be modified through the index afterwards, see add_edge and remove_edge."""
+        if graph not in _cache:
+            _cache[graph] = ComponentIndex(graph)
+        return _cache[graph]
+
+    def __len__(self):
+        return len(self.members)
+
+    def connected(self, u, v):
+        """Returns whether there is a path between two nodes. Nodes that are not in the graph are not connected."""
+        return u in self.labels and v in self.labels and self.labels[u] == self.labels[v]
+
+    def component(self, node):
+        """Returns the nodes of the component of a node."""
+        return self.members[self.labels[node]]
+
+    def components(self):
+        """Returns the components, as sets of nodes, from the largest to the smallest."""
+        return sorted(self.members.values(), key=len, reverse=True)
+
+    def add_node(self, graph: nx.Graph, node, **attributes):
+        """Adds a node to the graph. A node that is new to the graph is a component of its own.
+
+        :arg
+        graph (nx.Graph) - the graph of the index.
+        node - the node.
+        **attributes - the attributes of the node.
+        """
+        graph.add_node(node, **attributes)
+        if node not in self.labels:
+            label = next(self._next_label)
+            self.labels[node], self.members[label] = label, {node}
+
+    def add_edge(self, graph: nx.Graph, u, v, **attributes):
+        """Adds an edge to the graph and merges the components of its nodes.
+
+        :arg
+        graph (nx.Graph) - the graph of the index.
+        u, v - the nodes of the edge. They are added to the graph if they are not part of it.
+        **attributes - the attributes of the edge.
+        """
+        self.add_edges_from(graph, [(u, v, attributes)])
+
+    def add_edges_from(self, graph: nx.Graph, edges: list):
+        """Adds edges to the graph and merges the components of their nodes.
+
+        :arg
+        graph (nx.Graph) - the graph of the index.
+        edges (list) - (u, v) or (u, v, attributes) tuples, like for graph.add_edges_from.
+        """
+        graph.add_edges_from(edges)
+        for u, v, *_ in edges:
+            for node in (u, v):
+                if node not in self.labels:
+                    label = next(self._next_label)
+                    self.labels[node], self.members[label] = label, {node}
+
+            label_u, label_v = self.labels[u], self.labels[v]
+            if label_u == label_v:
+                continue
+            if len(self.members[label_u]) < len(self.members[label_v]):
+                label_u, label_v = label_v, label_u
+            # relabel the smaller component
+            moved = self.members.pop(label_v)
+            self.members[label_u] |= moved
+            self.labels.update(dict.fromkeys(moved, label_u))
+
+    def remove_edge(self, graph: nx.Graph, u, v):
+        """Removes an edge from the graph and splits the component of its nodes if it was a bridge.
+
+        :arg
+        graph (nx.Graph) - the graph of the index.
+        u, v - the nodes of the edge.
+
+        :return
+        whether the component was split.
+        """
+        graph.remove_edge(u, v)
+        if u == v:
+            return False
+
+        smaller = _smaller_side(graph, u, v)
+        if smaller is None:
+            return False
+
+        label = self.labels[u]
+        self.members[label] -= smaller
+        new_label = next(self._next_label)
+        self.members[new_label] = smaller
+        self.labels.update(dict.fromkeys(smaller, new_label))
+        return True
+
+
+def _smaller_side(graph, u, v):
+    """Searches from u and v in turns, one node at a time. Returns the nodes reached from the side that is exhausted
+    first, or None if the two searches meet."""
+    seen = ({u}, {v})
+    stacks = ([u], [v])
+    while True:
+        for side in (0, 1):
+            if not stacks[side]:
+                return seen[side]
+            node = stacks[side].pop()
+            for neighbour in graph.adj[node]:
+                if neighbour in seen[1 - side]:
+                    return None
+                if neighbour not in seen[side]:
+                    seen[side].add(neighbour)
+                    stacks[side].append(neighbour)
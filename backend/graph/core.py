@@ -0,0 +1,110 @@
+"""A module for the k-core decomposition of hero graphs.
+
+The core number of a node is the largest k such that the node is part of the k-core, the largest subgraph in which
+every node has at least k neighbours. The core numbers are computed with the bucket algorithm of Batagelj and
+Zaversnik, in O(n + m) time, and cached per graph. Self loops are ignored.
+"""
+import weakref
+
+import networkx as nx
+import numpy as np
+
+from .snapshot import Snapshot
+
+_cache = weakref.WeakKeyDictionary()
+
+
+def core_numbers(graph):
+    """Computes the core number of every node of a graph. The result is cached until the graph is garbage collected,
+    so the graph must not be modified afterwards.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a graph snapshot.
+
+    :return
+    a dictionary of node to core number.
+    """
+    if graph not in _cache:
+        if isinstance(graph, Snapshot):
+            nodes, offsets, neighbours = graph.names.tolist(), np.asarray(graph.offsets), np.asarray(graph.neighbours)
+        else:
+            nodes, offsets, neighbours = _csr(graph)
+        _cache[graph] = dict(zip(nodes, _decompose(offsets, neighbours)))
+
+    return _cache[graph]
+
+
+def k_core(graph: nx.Graph, k: int):
+    """Returns the k-core of a graph.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    k (int) - the minimum core number of the nodes of the k-core.
+
+    :return
+    a networkx subgraph view with the nodes whose core number is at least k.
+    """
+    return graph.subgraph([node for node, core in core_numbers(graph).items() if core >= k])
+
+
+def _csr(graph):
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    neighbours = np.empty(2 * graph.number_of_edges(), dtype=np.int64)
+    position = 0
+    for i, node in enumerate(nodes):
+        for neighbour in graph.adj[node]:
+            neighbours[position] = index[neighbour]
+            position += 1
+        offsets[i + 1] = position
+
+    return nodes, offsets, neighbours[:position]
+
+
+def _decompose(offsets, neighbours):
+    """The Batagelj-Zaversnik algorithm on a graph in CSR form.
+
+    The nodes are kept sorted by their current degree in `order`, with `starts[d]` the position of the first node of
+    degree d. Nodes are removed in increasing order of degree, and every neighbour with a higher degree is moved to the
+    front of its bucket before its degree is decreased, which keeps the order sorted.
+    """
+    n = len(offsets) - 1
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    # self loops do not count towards the degree
+    loops = np.bincount(sources[sources == neighbours], minlength=n)
+    degrees = (np.diff(offsets) - loops).tolist()
+    if not n:
+        return []
+
+    # a counting sort of the nodes by degree, starts[d] is the position of the first node of degree d
+    starts = [0] * (max(degrees) + 2)
+    for degree in degrees:
+        starts[degree + 1] += 1
+    for degree in range(1, len(starts)):
+        starts[degree] += starts[degree - 1]
+
+    order, positions, next_positions = [0] * n, [0] * n, starts[:]
+    for node, degree in enumerate(degrees):
+        position = next_positions[degree]
+        order[position], positions[node] = node, position
+        next_positions[degree] += 1
+
+    offsets, neighbours = offsets.tolist(), neighbours.tolist()
+    for i in range(n):
+        node = order[i]
+        degree = degrees[node]
+        for neighbour in neighbours[offsets[node]:offsets[node + 1]]:
+            neighbour_degree = degrees[neighbour]
+            if neighbour_degree > degree:
+                # swap the neighbour with the first node of its bucket and shrink the bucket by one
+                first_position = starts[neighbour_degree]
+                first = order[first_position]
+                if first != neighbour:
+                    position = positions[neighbour]
+                    order[first_position], order[position] = neighbour, first
+                    positions[neighbour], positions[first] = first_position, position
+                starts[neighbour_degree] += 1
+                degrees[neighbour] = neighbour_degree - 1
+
+    return degrees
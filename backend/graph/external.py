@@ -0,0 +1,260 @@
+"""A module for building graph snapshots from csv files that do not fit into memory.
+
+The csv files are read in chunks of rows. Every chunk is preprocessed like the in-memory loaders do, its names are
+interned to integer ids and every pair of ids is packed into one 64 bit key, the smaller id in the high bits. The
+sorted, counted keys of every chunk are written to disk as a run. The runs are merged in blocks of key ranges: every
+block takes the keys of the range from every run, which are found with a binary search on the memory-mapped runs, and
+counts them. Finally, the pairs are written in both directions into the CSR arrays of a snapshot, see the snapshot
+module, again block by block into memory-mapped files.
+
+Only the names and a few arrays with one value per node are held in memory. The rows, the pairs and the edges are not.
+The result is read with snapshot.Snapshot, which memory-maps it, and the TopHeroService can be created from the
+snapshot of the hero-comic graph.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from backend.describe import GraphType
+from . import snapshot
+from .preprocess import remove_self_loops, strip_trailing_characters, replace_hero
+from .weight import max_prop, reciprocal_prop
+
+# The number of csv rows that are read at once.
+CHUNK_ROWS = 1_000_000
+
+# The number of keys that are merged or written at once.
+BLOCK_SIZE = 4_000_000
+
+# The weight functions of the collaborative graph, computed on arrays of the number of collaborations of the edges and
+# the degrees of the multigraph of all collaborations of their heroes.
+_WEIGHTS = {max_prop: lambda n_collabs, degrees: 1 - n_collabs / (degrees.max() + 1),
+            reciprocal_prop: lambda n_collabs, degrees: 1 / n_collabs}
+
+
+def create_collaborative(data: str, path: str, weight=max_prop, chunk_rows=CHUNK_ROWS, block_size=BLOCK_SIZE):
+    """Creates a snapshot of the collaborative graph from a hero-network csv file, out of core.
+
+    The rows are preprocessed like collaborative.create_from does: self loops are removed, trailing characters are
+    stripped and 'SPIDER-MAN/PETER PAR' is renamed.
+
+    :arg
+    data (str) - the path of the hero-network csv file with the columns hero1 and hero2.
+    path (str) - the directory of the snapshot. Temporary runs are written to it as well.
+    weight (function) - max_prop or reciprocal_prop, see the weight module.
+    chunk_rows (int) - the number of csv rows that are read at once.
+    block_size (int) - the number of keys that are merged or written at once.
+
+    :return
+    the path of the snapshot.
+    """
+    if weight not in _WEIGHTS:
+        raise ValueError(f'Out of core graphs support the weights {[function.__name__ for function in _WEIGHTS]}. '
+                         f'weight: {weight}.')
+
+    names = _Names()
+    os.makedirs(path, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=path) as directory:
+        runs = []
+        for chunk in pd.read_csv(data, chunksize=chunk_rows):
+            remove_self_loops(chunk)
+            strip_trailing_characters(chunk)
+            replace_hero(chunk, 'SPIDER-MAN/PETER PAR', 'SPIDER-MAN/PETER PARKER')
+            runs.append(_write_run(directory, len(runs), names.ids(chunk.hero1.values), names.ids(chunk.hero2.values)))
+
+        keys, counts = merge_runs(runs, directory, block_size)
+        _write_csr(path, names, keys, counts, GraphType.COLLABORATIVE, block_size, weight=_WEIGHTS[weight])
+
+    return path
+
+
+def create_hero_comic(nodes: str, edges: str, path: str, chunk_rows=CHUNK_ROWS, block_size=BLOCK_SIZE):
+    """Creates a snapshot of the hero-comic graph from the nodes and edges csv files, out of core.
+
+    The rows are preprocessed like hero_comic.create_from does. The snapshot also stores the number of rows of every
+    hero in the edges file, which are the appearances the TopHeroService ranks heroes by.
+
+    :arg
+    nodes (str) - the path of the nodes csv file with the columns node and type.
+    edges (str) - the path of the edges csv file with the columns hero and comic.
+    path (str) - the directory of the snapshot. Temporary runs are written to it as well.
+    chunk_rows (int) - the number of csv rows that are read at once.
+    block_size (int) - the number of keys that are merged or written at once.
+
+    :return
+    the path of the snapshot.
+    """
+    names = _Names()
+    appearances = np.zeros(0, dtype=np.int64)
+    os.makedirs(path, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=path) as directory:
+        # the heroes are interned in the order of the edges file first, which keeps the order of heroes with the same
+        # number of appearances of the TopHeroService
+        runs = []
+        for chunk in pd.read_csv(edges, chunksize=chunk_rows):
+            strip_trailing_characters(chunk)
+            heroes = names.ids(chunk.hero.values)
+            runs.append(_write_run(directory, len(runs), heroes, names.ids(chunk.comic.values)))
+            appearances = _grow(appearances, len(names))
+            appearances += np.bincount(heroes, minlength=len(names))
+
+        types = np.zeros(0, dtype=np.uint8)
+        for chunk in pd.read_csv(nodes, chunksize=chunk_rows):
+            strip_trailing_characters(chunk)
+            replace_hero(chunk, 'SPIDER-MAN/PETER PARKERKER', 'SPIDER-MAN/PETER PARKER')
+            ids = names.ids(chunk.node.values)
+            types = _grow(types, len(names))
+            types[ids] = [snapshot.NODE_TYPES.index(node_type) for node_type in chunk.type.values]
+
+        keys, counts = merge_runs(runs, directory, block_size)
+        _write_csr(path, names, keys, counts, GraphType.HERO_COMIC, block_size, types=_grow(types, len(names)),
+                   appearances=_grow(appearances, len(names)))
+
+    return path
+
+
+def merge_runs(runs: list, directory: str, block_size=BLOCK_SIZE):
+    """Merges sorted runs of keys and their counts.
+
+    :arg
+    runs (list) - (keys path, counts path) tuples of .npy files, with the keys of every run sorted and unique.
+    directory (str) - the directory to write the merged keys and counts to.
+    block_size (int) - the approximate number of keys that are merged at once.
+
+    :return
+    (np.memmap, np.memmap) - the sorted, unique keys of all runs and the sum of their counts.
+    """
+    runs = [(np.load(keys, mmap_mode='r'), np.load(counts, mmap_mode='r')) for keys, counts in runs]
+    total = sum(len(keys) for keys, _ in runs)
+
+    # the block boundaries are quantiles of a sample of the keys of all runs
+    n_blocks = max(1, -(-total // block_size))
+    sample = np.sort(np.concatenate([keys[::max(1, len(keys) // (16 * n_blocks))] for keys, _ in runs] +
+                                    [np.zeros(0, dtype=np.int64)]))
+    boundaries = np.unique(sample[np.linspace(0, len(sample), n_blocks, endpoint=False).astype(np.int64)]) \
+        if len(sample) else np.zeros(0, dtype=np.int64)
+    # ids have at most 32 bits, see _pair_keys, so no key is as large as the end of the last range
+    boundaries = np.concatenate([boundaries, [np.iinfo(np.int64).max]])
+
+    keys_path, counts_path = os.path.join(directory, 'keys.bin'), os.path.join(directory, 'counts.bin')
+    size = 0
+    with open(keys_path, 'wb') as keys_file, open(counts_path, 'wb') as counts_file:
+        start = np.iinfo(np.int64).min
+        for end in boundaries:
+            block_keys, block_counts = [], []
+            for keys, counts in runs:
+                first, last = np.searchsorted(keys, [start, end])
+                block_keys.append(keys[first:last])
+                block_counts.append(counts[first:last])
+            block_keys, block_counts = _count(np.concatenate(block_keys), np.concatenate(block_counts))
+            block_keys.tofile(keys_file)
+            block_counts.tofile(counts_file)
+            size += len(block_keys)
+            start = end
+
+    if not size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.memmap(keys_path, dtype=np.int64, mode='r'), np.memmap(counts_path, dtype=np.int64, mode='r')
+
+
+class _Names:
+    """Interns names to consecutive integer ids."""
+
+    def __init__(self):
+        self.index = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def ids(self, values):
+        codes, uniques = pd.factorize(values)
+        ids = np.array([self.index.setdefault(name, len(self.index)) for name in uniques.tolist()], dtype=np.int64)
+        return ids[codes]
+
+    def names(self):
+        return list(self.index)
+
+
+def _pair_keys(a, b):
+    """Packs unordered pairs of ids into keys, the smaller id in the high 32 bits."""
+    return (np.minimum(a, b) << 32) | np.maximum(a, b)
+
+
+def _count(keys, counts):
+    """Sorts keys and sums the counts of equal keys."""
+    order = np.argsort(keys, kind='stable')
+    keys, counts = keys[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+    return keys[starts], np.add.reduceat(counts, starts) if len(starts) else counts
+
+
+def _write_run(directory, i, a, b):
+    keys, counts = _count(_pair_keys(a, b), np.ones(len(a), dtype=np.int64))
+    paths = os.path.join(directory, f'run-{i}-keys.npy'), os.path.join(directory, f'run-{i}-counts.npy')
+    np.save(paths[0], keys)
+    np.save(paths[1], counts)
+    return paths
+
+
+def _grow(array, size):
+    """Pads an array with zeros to a size."""
+    return np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)])
+
+
+def _blocks(keys, counts, block_size):
+    """The first ids, the second ids and the counts of the pairs, block by block."""
+    for start in range(0, len(keys), block_size):
+        block = np.asarray(keys[start:start + block_size])
+        yield block >> 32, block & 0xFFFFFFFF, np.asarray(counts[start:start + block_size])
+
+
+def _write_csr(path, names, keys, counts, graph_type, block_size, weight=None, types=None, appearances=None):
+    """Writes the pairs in both directions into the CSR arrays of a snapshot."""
+    n_nodes = len(names)
+    # a self loop is stored twice in the neighbours of its node, like snapshot.write does
+    degrees = np.zeros(n_nodes, dtype=np.int64)
+    collaborations = np.zeros(n_nodes, dtype=np.int64)
+    for a, b, n in _blocks(keys, counts, block_size):
+        degrees += np.bincount(a, minlength=n_nodes) + np.bincount(b, minlength=n_nodes)
+        collaborations += np.bincount(a, n, minlength=n_nodes).astype(np.int64) + \
+            np.bincount(b, n, minlength=n_nodes).astype(np.int64)
+
+    offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(degrees, out=offsets[1:])
+    np.save(os.path.join(path, 'names.npy'), np.array(names.names(), dtype=str).reshape(n_nodes))
+    np.save(os.path.join(path, 'offsets.npy'), offsets)
+
+    arrays = {'neighbours': np.lib.format.open_memmap(os.path.join(path, 'neighbours.npy'), mode='w+',
+                                                      dtype=np.int32, shape=(int(offsets[-1]),))}
+    if graph_type == GraphType.COLLABORATIVE:
+        arrays['weights'] = np.lib.format.open_memmap(os.path.join(path, 'weights.npy'), mode='w+', dtype=np.float64,
+                                                      shape=(int(offsets[-1]),))
+        arrays['n_collabs'] = np.lib.format.open_memmap(os.path.join(path, 'n_collabs.npy'), mode='w+',
+                                                        dtype=np.int32, shape=(int(offsets[-1]),))
+
+    cursors = offsets[:-1].copy()
+    for a, b, n in _blocks(keys, counts, block_size):
+        sources, targets, n = np.concatenate([a, b]), np.concatenate([b, a]), np.concatenate([n, n])
+        order = np.argsort(sources, kind='stable')
+        sources, targets, n = sources[order], targets[order], n[order]
+        # the j-th pair of a node in this block goes to the j-th free position of the node
+        starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+        ranks = np.arange(len(sources)) - np.repeat(starts, np.diff(np.r_[starts, len(sources)]))
+        positions = cursors[sources] + ranks
+        cursors += np.bincount(sources, minlength=n_nodes)
+
+        arrays['neighbours'][positions] = targets
+        if graph_type == GraphType.COLLABORATIVE:
+            arrays['weights'][positions] = weight(n, collaborations)
+            arrays['n_collabs'][positions] = n
+
+    for array in arrays.values():
+        array.flush()
+    if types is not None:
+        np.save(os.path.join(path, 'types.npy'), types)
+    if appearances is not None:
+        np.save(os.path.join(path, 'appearances.npy'), appearances)
+
+    snapshot.write_meta(path, graph_type, n_nodes, len(keys))
@@ -1,17 +1,20 @@
 """A python module with functions for constructing a comic-hero graph."""
 import itertools
 
+import numpy as np
 import pandas as pd
 import networkx as nx
 
 from backend.describe import GraphType
+from . import chunked
 from .preprocess import strip_trailing_characters, replace_hero
+from .snapshot import Snapshot
 from backend.domain import Comic
 
 _ACCEPTED_TYPES = {str, pd.DataFrame}
 
 
-def create_from(nodes=None, edges=None):
+def create_from(nodes=None, edges=None, parallel=False, max_workers=None):
     """Creates an undirected, unweighted comic-hero graph from the provided hero-comic nodes and hero-comic edges.
 
     Both inputs must be specified and must be of the same type, either strings or pandas DataFrames. When providing
@@ -21,6 +24,8 @@ def create_from(nodes=None, edges=None):
     :arg
     nodes (str | pd.DataFrame) - the path to a file with nodes or a pandas dataframe with the nodes.
     edges (str | pd.DataFrame) - the path to a file with edges or a pandas dataframe with the edges.
+    parallel (bool) - whether to read the edges csv file in parallel, in byte range chunks.
+    max_workers (int) - the number of processes when reading in parallel. If None, the number of CPUs.
 
     :return
     an undirected, unweighted networkx graph with comics and heroes as nodes, and its graph type.
@@ -43,8 +48,11 @@ def create_from(nodes=None, edges=None):
         replace_hero(nodes, 'SPIDER-MAN/PETER PARKERKER', 'SPIDER-MAN/PETER PARKER')
         nodes = [(node, {'type': node_type}) for node, node_type in zip(nodes.node, nodes.type)]
 
-        edges = pd.read_csv(edges)
-        strip_trailing_characters(edges)
+        if parallel:
+            edges = chunked.read_edges(edges, max_workers)
+        else:
+            edges = pd.read_csv(edges)
+            strip_trailing_characters(edges)
         edges = zip(edges.hero, edges.comic)
 
         graph = nx.Graph()
@@ -75,6 +83,9 @@ def get_subgraph_with(graph: nx.Graph, heroes: iter, neighbours=True):
     :return
     a networkx graph that is a subgraph of the given graph with all the provided heroes and the comics they appear in.
     """
+    if isinstance(graph, Snapshot):
+        return graph.subgraph(heroes, neighbours=neighbours)
+
     if neighbours:
         comics = list(itertools.chain(*set(graph.neighbors(hero) for hero in heroes)))
         return graph.subgraph(heroes + comics)
@@ -104,8 +115,7 @@ def get_n_heroes_per_comic(graph: nx.Graph):
     :return
     a pandas dataframe of comics and their number of heroes.
     """
-    comics = []
-    for comic in get_comic_nodes(graph):
-        comics.append([comic, graph.degree(comic)])
+    comics = get_comic_nodes(graph)
+    n_heroes = np.fromiter((degree for _, degree in graph.degree(comics)), dtype=np.int64, count=len(comics))
 
-    return pd.DataFrame(comics, columns=['comic', 'n_heroes'])
+    return pd.DataFrame({'comic': np.array(comics, dtype=object), 'n_heroes': n_heroes})
@@ -0,0 +1,240 @@
+"""A module for seeded samples of hero graphs and the estimates computed on them.
+
+Every sampler takes a graph, the number of nodes of the sample and a seed, and returns a subgraph. The same graph,
+size and seed always give the same sample:
+
+* node - the subgraph induced by nodes drawn uniformly at random.
+* edge - the subgraph of edges drawn uniformly at random, with their nodes.
+* random_walk - the subgraph induced by the nodes of a random walk that returns to its start with a probability.
+* forest_fire - the subgraph induced by the nodes of a forest fire: every burning node sets fire to a geometrically
+  distributed number of its neighbours.
+
+Only the node sampler draws nodes uniformly, so only its estimates of the statistics of the whole graph are unbiased.
+The others keep more of the structure around their start, e.g. its clustering and hubs.
+
+An estimate repeats the sampling with consecutive seeds, computes a statistic on every sample and reports the mean
+with a t confidence interval.
+"""
+import collections
+import random
+
+import networkx as nx
+import numpy as np
+from attr import dataclass
+
+from backend.describe import Estimate
+
+# The probability of a random walk to return to its start.
+RESTART = 0.15
+
+# The probability of a forest fire to spread, the mean number of neighbours burnt by a node is p / (1 - p).
+FORWARD_BURNING = 0.7
+
+
+def node_sample(graph: nx.Graph, size: int, seed=None, include: iter = ()):
+    """Samples the subgraph induced by nodes drawn uniformly at random.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    size (int) - the number of nodes of the sample.
+    seed (int) - the seed of the sample.
+    include (iter) - nodes that are always part of the sample.
+
+    :return
+    a networkx subgraph view.
+    """
+    include = list(include)
+    included = set(include)
+    others = [node for node in graph.nodes() if node not in included]
+    nodes = include + random.Random(seed).sample(others, max(0, min(size - len(include), len(others))))
+    return graph.subgraph(nodes)
+
+
+def edge_sample(graph: nx.Graph, size: int, seed=None, include: iter = ()):
+    """Samples edges uniformly at random until their nodes reach the size.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    size (int) - the number of nodes of the sample. The last edge may add one node more.
+    seed (int) - the seed of the sample.
+    include (iter) - nodes that are always part of the sample.
+
+    :return
+    a networkx graph with the sampled edges and their nodes, and the included nodes.
+    """
+    rng = random.Random(seed)
+    edges = list(graph.edges())
+
+    nodes, drawn = set(include), dict()
+    while len(nodes) < size and len(drawn) < len(edges):
+        i = rng.randrange(len(edges))
+        if i not in drawn:
+            drawn[i] = None
+            nodes.update(edges[i])
+    sampled = [edges[i] for i in drawn]
+
+    sample = nx.Graph(graph.edge_subgraph(sampled))
+    sample.add_nodes_from((node, graph.nodes[node]) for node in include)
+    return sample
+
+
+def random_walk_sample(graph: nx.Graph, size: int, seed=None, include: iter = (), restart=RESTART):
+    """Samples the nodes of a random walk. The walk starts at the first included node, or a random one, and returns to
+    its start with the restart probability. A walk that stops finding new nodes jumps to a random node.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    size (int) - the number of nodes of the sample.
+    seed (int) - the seed of the sample.
+    include (iter) - nodes that are always part of the sample.
+    restart (float) - the probability to return to the start at every step.
+
+    :return
+    a networkx subgraph view.
+    """
+    rng = random.Random(seed)
+    all_nodes = list(graph.nodes())
+    size = min(size, len(all_nodes))
+    visited = dict.fromkeys(include)
+    start = next(iter(visited)) if visited else rng.choice(all_nodes)
+    visited[start] = None
+
+    node, steps_without_new = start, 0
+    while len(visited) < size:
+        neighbours = list(graph.adj[node])
+        if steps_without_new > 10 * size:
+            # the component of the start is exhausted or hard to leave
+            start = node = rng.choice(all_nodes)
+            steps_without_new = 0
+        elif not neighbours or rng.random() < restart:
+            node = start
+        else:
+            node = rng.choice(neighbours)
+
+        steps_without_new += 1
+        if node not in visited:
+            visited[node] = None
+            steps_without_new = 0
+
+    return graph.subgraph(visited)
+
+
+def forest_fire_sample(graph: nx.Graph, size: int, seed=None, include: iter = (), forward=FORWARD_BURNING):
+    """Samples the nodes of a forest fire. The fire starts at the included nodes, or a random one. Every burning node
+    sets fire to a geometrically distributed number of its unburnt neighbours. A fire that dies out starts again at a
+    random unburnt node.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    size (int) - the number of nodes of the sample.
+    seed (int) - the seed of the sample.
+    include (iter) - nodes that are always part of the sample.
+    forward (float) - the forward burning probability.
+
+    :return
+    a networkx subgraph view.
+    """
+    rng = random.Random(seed)
+    all_nodes = list(graph.nodes())
+    size = min(size, len(all_nodes))
+    burnt = dict.fromkeys(include)
+    queue = collections.deque(burnt)
+    # the fire starts again at the next unburnt node of a random order
+    restarts = iter(rng.sample(all_nodes, len(all_nodes)))
+
+    while len(burnt) < size:
+        if not queue:
+            node = next(node for node in restarts if node not in burnt)
+            burnt[node] = None
+            queue.append(node)
+            continue
+
+        node = queue.popleft()
+        unburnt = [neighbour for neighbour in graph.adj[node] if neighbour not in burnt]
+        # the number of burnt neighbours is geometric with a mean of forward / (1 - forward)
+        n_burnt = 0
+        while rng.random() < forward:
+            n_burnt += 1
+        for neighbour in rng.sample(unburnt, min(n_burnt, len(unburnt))):
+            if len(burnt) >= size:
+                break
+            burnt[neighbour] = None
+            queue.append(neighbour)
+
+    return graph.subgraph(burnt)
+
+
+SAMPLERS = {'node': node_sample,
+            'edge': edge_sample,
+            'random_walk': random_walk_sample,
+            'forest_fire': forest_fire_sample}
+
+
+@dataclass(frozen=True)
+class SampleSpec:
+    """How to sample a graph for an estimate.
+
+    method - one of SAMPLERS.
+    size - the number of nodes of every sample. If None, the fraction is used.
+    fraction - the fraction of the nodes of the graph in every sample.
+    repeats - the number of samples.
+    seed - the seed of the first sample, the following samples use the next seeds.
+    confidence - the confidence level of the intervals.
+    """
+    method: str = 'node'
+    size: int = None
+    fraction: float = 0.1
+    repeats: int = 10
+    seed: int = 0
+    confidence: float = 0.95
+
+    @staticmethod
+    def of(spec):
+        """Creates a SampleSpec from a dictionary of its fields, or returns it as it is."""
+        spec = spec if isinstance(spec, SampleSpec) else SampleSpec(**spec)
+        if spec.method not in SAMPLERS:
+            raise ValueError(f'Invalid sampling method: {spec.method}. Valid methods: {list(SAMPLERS)}.')
+        if spec.repeats < 2:
+            raise ValueError(f'An estimate needs at least 2 samples. repeats: {spec.repeats}.')
+        return spec
+
+    def sample_size(self, graph):
+        """Returns the number of nodes of every sample of a graph."""
+        return self.size if self.size is not None else max(2, round(self.fraction * graph.number_of_nodes()))
+
+
+def samples(graph: nx.Graph, spec, include: iter = ()):
+    """Yields the samples of a spec.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    spec (SampleSpec, dict) - how to sample.
+    include (iter) - nodes that are part of every sample.
+    """
+    spec = SampleSpec.of(spec)
+    for i in range(spec.repeats):
+        yield SAMPLERS[spec.method](graph, spec.sample_size(graph), seed=spec.seed + i, include=include)
+
+
+def estimate(values: iter, confidence=0.95):
+    """Estimates the mean of values with a t confidence interval.
+
+    :arg
+    values (iter) - the values of a statistic, one per sample. None values are left out.
+    confidence (float) - the confidence level of the interval.
+
+    :return
+    an Estimate.
+    """
+    from scipy import stats
+
+    values = np.array([value for value in values if value is not None], dtype=float)
+    if not len(values):
+        return Estimate(float('nan'), float('nan'), float('nan'), 0)
+
+    mean = float(values.mean())
+    if len(values) < 2:
+        return Estimate(mean, float('nan'), float('nan'), 1)
+
+    half_width = float(stats.t.ppf((1 + confidence) / 2, len(values) - 1) * values.std(ddof=1) / np.sqrt(len(values)))
+    return Estimate(mean, mean - half_width, mean + half_width, len(values))
@@ -0,0 +1,210 @@
+"""A module for read-only, memory-mapped snapshots of the hero graphs.
+
+A snapshot stores a graph in compressed sparse row (CSR) form in a directory of .npy files:
+
+* names.npy - the name of every node, as fixed width strings. The position of a name is the id of its node.
+* offsets.npy - the neighbours of node i are neighbours[offsets[i]:offsets[i + 1]].
+* neighbours.npy - the ids of the neighbours of all nodes.
+* weights.npy, n_collabs.npy - the edge attributes of the collaborative graph, aligned with neighbours.
+* types.npy - the type of every node of the hero-comic graph, see NODE_TYPES.
+* appearances.npy - optional, the number of rows of every hero in the edges file, see the external module.
+* snapshot.json - the schema version, the graph type and the sizes.
+
+Opening a snapshot memory-maps the arrays, so it takes milliseconds and all processes that open the same snapshot share
+the same physical pages. Snapshots are pickled by path, so process pool workers re-open them instead of receiving a
+copy of the graph. Manager functions only ever need small subgraphs of the top N heroes, which snapshots build as
+networkx graphs on demand.
+"""
+import json
+import os
+
+import networkx as nx
+import numpy as np
+
+from backend.describe import GraphType
+
+SCHEMA_VERSION = 1
+
+# The node types of the hero-comic graph, by their code in types.npy.
+NODE_TYPES = ('hero', 'comic')
+
+_META_FILE = 'snapshot.json'
+
+
+def write(graph: nx.Graph, path: str, graph_type: GraphType):
+    """Writes a snapshot of a graph.
+
+    The nodes are stored by name, i.e. as strings.
+
+    :arg
+    graph (nx.Graph) - a collaborative or hero-comic networkx graph.
+    path (str) - the directory of the snapshot. It is created if it does not exist.
+    graph_type (GraphType) - the type of the graph.
+
+    :return
+    the path of the snapshot.
+    """
+    os.makedirs(path, exist_ok=True)
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    n_nodes, n_edges = len(nodes), graph.number_of_edges()
+
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    sources = np.concatenate([edges[:, 0], edges[:, 1]])
+    targets = np.concatenate([edges[:, 1], edges[:, 0]])
+    # a stable sort keeps the neighbours of every node in the order of the edges of the graph
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=offsets[1:])
+
+    np.save(os.path.join(path, 'names.npy'), np.array([str(node) for node in nodes], dtype=str).reshape(n_nodes))
+    np.save(os.path.join(path, 'offsets.npy'), offsets)
+    np.save(os.path.join(path, 'neighbours.npy'), targets[order].astype(np.int32))
+
+    if graph_type == GraphType.COLLABORATIVE:
+        for attribute, file_name, dtype in [('weight', 'weights.npy', np.float64),
+                                            ('n_collabs', 'n_collabs.npy', np.int32)]:
+            values = np.fromiter((value for *_, value in graph.edges(data=attribute, default=0)), dtype=dtype,
+                                 count=n_edges)
+            np.save(os.path.join(path, file_name), np.concatenate([values, values])[order])
+    else:
+        types = np.fromiter((NODE_TYPES.index(node_type) for _, node_type in graph.nodes(data='type', default='hero')),
+                            dtype=np.uint8, count=n_nodes)
+        np.save(os.path.join(path, 'types.npy'), types)
+
+    # the meta file is written last, so that a directory without it is an incomplete snapshot
+    write_meta(path, graph_type, n_nodes, n_edges)
+    return path
+
+
+def write_meta(path: str, graph_type: GraphType, n_nodes: int, n_edges: int):
+    """Writes the meta file of a snapshot, which completes it. The arrays must be written before."""
+    with open(os.path.join(path, _META_FILE), 'w') as file:
+        json.dump({'version': SCHEMA_VERSION, 'graph_type': graph_type.name, 'n_nodes': n_nodes, 'n_edges': n_edges},
+                  file, indent=2)
+
+
+def exists(path: str):
+    """Returns whether the directory contains a complete snapshot."""
+    return os.path.exists(os.path.join(path, _META_FILE))
+
+
+class Snapshot:
+    """A read-only, memory-mapped graph snapshot."""
+
+    def __init__(self, path: str):
+        """Opens a snapshot.
+
+        :arg
+        path (str) - the directory of the snapshot.
+        """
+        with open(os.path.join(path, _META_FILE)) as file:
+            meta = json.load(file)
+        if meta['version'] > SCHEMA_VERSION:
+            raise ValueError(f'The snapshot was written with the newer version {meta["version"]}. This version only '
+                             f'reads versions up to {SCHEMA_VERSION}.')
+
+        self.path = path
+        self.graph_type = GraphType[meta['graph_type']]
+        self.n_nodes, self.n_edges = meta['n_nodes'], meta['n_edges']
+        self.names = self._load('names.npy')
+        self.offsets = self._load('offsets.npy')
+        self.neighbours = self._load('neighbours.npy')
+        if self.graph_type == GraphType.COLLABORATIVE:
+            self.weights, self.n_collabs, self.types = self._load('weights.npy'), self._load('n_collabs.npy'), None
+        else:
+            self.weights, self.n_collabs, self.types = None, None, self._load('types.npy')
+        self.appearances = self._load('appearances.npy') if os.path.exists(os.path.join(path, 'appearances.npy')) \
+            else None
+        self._index = None
+
+    def __reduce__(self):
+        # workers re-open the snapshot and share its pages, instead of receiving a copy
+        return Snapshot, (self.path,)
+
+    def __len__(self):
+        return self.n_nodes
+
+    def __contains__(self, node):
+        return str(node) in self.index
+
+    @property
+    def index(self):
+        """A dictionary of node name to node id. It is built on first use."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names.tolist())}
+        return self._index
+
+    def number_of_nodes(self):
+        return self.n_nodes
+
+    def number_of_edges(self):
+        return self.n_edges
+
+    def nodes(self):
+        """Returns the names of all nodes."""
+        return self.names.tolist()
+
+    def degree(self, node):
+        """Returns the degree of a node."""
+        i = self.index[str(node)]
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    def neighbors(self, node):
+        """Returns the names of the neighbours of a node."""
+        i = self.index[str(node)]
+        return self.names[self.neighbours[self.offsets[i]:self.offsets[i + 1]]].tolist()
+
+    def subgraph(self, nodes, neighbours=False):
+        """Builds the subgraph that is induced by the nodes as a networkx graph.
+
+        :arg
+        nodes (iter) - the names of the nodes. Names that are not in the snapshot are ignored.
+        neighbours (bool) - whether the neighbours of the nodes are part of the subgraph, e.g. the comics of heroes.
+
+        :return
+        a networkx graph with the edge attributes of the snapshot, and the node types of hero-comic graphs.
+        """
+        ids = np.array(sorted({self.index[name] for name in map(str, nodes) if name in self.index}), dtype=np.int64)
+        if neighbours:
+            ids = np.union1d(ids, self.neighbours[self._positions(ids)])
+
+        mask = np.zeros(self.n_nodes, dtype=bool)
+        mask[ids] = True
+        positions = self._positions(ids)
+        sources = np.repeat(ids, self.offsets[ids + 1] - self.offsets[ids])
+        targets = self.neighbours[positions]
+        # every edge is stored in both directions, keep it once
+        keep = mask[targets] & (sources < targets)
+        sources, targets, positions = sources[keep], targets[keep], positions[keep]
+
+        subgraph = nx.Graph()
+        names = self.names[ids].tolist()
+        if self.types is None:
+            subgraph.add_nodes_from(names)
+            subgraph.add_edges_from(zip(self.names[sources].tolist(), self.names[targets].tolist(),
+                                        ({'weight': weight, 'n_collabs': n}
+                                         for weight, n in zip(self.weights[positions].tolist(),
+                                                              self.n_collabs[positions].tolist()))))
+        else:
+            subgraph.add_nodes_from((name, {'type': NODE_TYPES[code]})
+                                    for name, code in zip(names, self.types[ids].tolist()))
+            subgraph.add_edges_from(zip(self.names[sources].tolist(), self.names[targets].tolist()))
+
+        return subgraph
+
+    def to_networkx(self):
+        """Builds the whole graph as a networkx graph."""
+        return self.subgraph(self.names.tolist())
+
+    def _positions(self, ids):
+        """The positions of the neighbours of the nodes in the neighbours array, node after node."""
+        starts, counts = self.offsets[ids], self.offsets[ids + 1] - self.offsets[ids]
+        if not counts.sum():
+            return np.zeros(0, dtype=np.int64)
+        # the position of the j-th neighbour of the k-th node is starts[k] + j
+        first = np.cumsum(counts) - counts
+        return np.repeat(starts - first, counts) + np.arange(counts.sum())
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, name), mmap_mode='r')
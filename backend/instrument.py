@@ -0,0 +1,162 @@
+"""A module for instrumenting the stages of manager functions.
+
+Manager functions take a recorder from the `recorder` kwargs parameter and wrap each of their stages, e.g. the top N
+selection, the subgraph construction, the algorithm and the packing of the result, in `recorder.stage(name)`. When no
+recorder is provided the NULL_RECORDER is used, which does nothing.
+"""
+import contextlib
+import cProfile
+import time
+import tracemalloc
+
+from attr import dataclass
+
+
+@dataclass(frozen=True)
+class Stage:
+    """The time and the memory peak of a single stage of a manager function."""
+    name: str
+    seconds: float
+    peak_bytes: int
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """A structured record of a single run of a manager function."""
+    identifier: str
+    top_n: int
+    seconds: float
+    peak_bytes: int
+    stages: tuple
+    sizes: dict
+
+    def to_dict(self):
+        """Returns the record as a json serialisable dictionary."""
+        return {'identifier': self.identifier,
+                'top_n': self.top_n,
+                'seconds': self.seconds,
+                'peak_bytes': self.peak_bytes,
+                'stages': [{'name': stage.name, 'seconds': stage.seconds, 'peak_bytes': stage.peak_bytes}
+                           for stage in self.stages],
+                'sizes': {name: {'n_nodes': n_nodes, 'n_edges': n_edges}
+                          for name, (n_nodes, n_edges) in self.sizes.items()}}
+
+
+@dataclass(frozen=True)
+class InstrumentedResult:
+    """The result of a manager function together with the record of its run."""
+    result: any
+    record: RunRecord
+
+
+class Recorder:
+    """Records the duration, the tracemalloc peak and the graph sizes of the stages of a manager function."""
+
+    def __init__(self, trace_memory=True):
+        """Initialises the Recorder.
+
+        :arg
+        trace_memory (bool) - whether to trace the memory peak of every stage with tracemalloc.
+        """
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.sizes = {}
+        self.traced_peak = 0
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """A context manager that records the stage that runs inside of it.
+
+        :arg
+        name (str) - the name of the stage.
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            start_bytes, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = -1
+            if self.trace_memory:
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                self.traced_peak = max(self.traced_peak, traced_peak)
+                peak_bytes = traced_peak - start_bytes
+            self.stages.append(Stage(name, seconds, peak_bytes))
+
+    def size(self, name: str, graph):
+        """Records the number of nodes and edges of a graph.
+
+        :arg
+        name (str) - the name under which the size is recorded, e.g. 'subgraph'.
+        graph (nx.Graph) - a networkx graph.
+        """
+        self.sizes[name] = (graph.number_of_nodes(), graph.number_of_edges())
+
+
+class _NullRecorder:
+    """A recorder that records nothing. It is used when a manager function is not instrumented."""
+
+    _context = contextlib.nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def size(self, name: str, graph):
+        pass
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def run_instrumented(func, identifier: str, graph, top_n: int, trace_memory=True, profile=None, **kwargs):
+    """Runs a manager function with a recorder and, optionally, with cProfile.
+
+    :arg
+    func (function) - the manager function.
+    identifier (str) - the name of the manager function.
+    graph (nx.Graph) - the graph the function runs on.
+    top_n (int) - the top N heroes to consider.
+    trace_memory (bool) - whether to trace memory peaks with tracemalloc. This slows down the run considerably.
+    profile (str) - a path where the cProfile stats of the run are dumped. If None, the run is not profiled.
+    **kwargs - the kwargs of the manager function.
+
+    :return
+    an InstrumentedResult with the result of the function and the RunRecord of the run.
+    """
+    recorder = Recorder(trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if trace_memory:
+            tracemalloc.reset_peak()
+            start_bytes, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            result = func(graph, top_n, recorder=recorder, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+        seconds = time.perf_counter() - start
+
+        peak_bytes = -1
+        if trace_memory:
+            # the stages reset the tracemalloc peak, so the peak of the run is the highest of all stage peaks
+            peak_bytes = max(recorder.traced_peak, tracemalloc.get_traced_memory()[1]) - start_bytes
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    if profiler:
+        profiler.dump_stats(profile)
+
+    record = RunRecord(identifier, top_n, seconds, peak_bytes, tuple(recorder.stages), recorder.sizes)
+    return InstrumentedResult(result, record)
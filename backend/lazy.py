@@ -0,0 +1,37 @@
+"""A module for packages whose attributes are only imported when they are first accessed.
+
+Importing networkx, pandas and numpy takes a considerable amount of time, which processes that only count heroes
+should not have to pay. The packages of the backend therefore expose their attributes lazily, e.g.:
+
+    __getattr__, __dir__ = lazy.attach(__name__, {'Controller': ('.controller', 'Controller')})
+"""
+import importlib
+
+
+def attach(package: str, attributes: dict):
+    """Creates the module level __getattr__ and __dir__ functions of a package with lazy attributes.
+
+    :arg
+    package (str) - the name of the package, i.e. __name__.
+    attributes (dict) - a dictionary of attribute name to a tuple of (module, name). The module is relative to the
+    package. If the name is None, the attribute is the module itself.
+
+    :return
+    (function, function) - the __getattr__ and the __dir__ functions of the package.
+    """
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+        module_name, attribute = attributes[name]
+        module = importlib.import_module(module_name, package)
+        value = module if attribute is None else getattr(module, attribute)
+
+        # cache the attribute on the package, so that __getattr__ is only called once per attribute
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(attributes))
+
+    return __getattr__, __dir__
@@ -2,18 +2,104 @@
 
 import networkx as nx
 import numpy as np
-import pandas as pd
 
-from backend.graph import get_n_heroes_per_comic, get_subgraph_with, get_hero_collabs
-from backend.service import TopHeroService
-from .describe import GraphType, GraphFeatures, get_degree_dist, get_hubs, get_graph_mode
+from backend.graph import get_n_heroes_per_comic, get_subgraph_with, get_hero_collabs, core_numbers, BipartiteIndex, \
+    ComponentIndex, edge_betweenness, triangles, transitivity
+from backend.graph.sampling import SampleSpec, samples, estimate
+from backend.graph.snapshot import Snapshot
+from backend.service import TopHeroService, HeroRegistry
+from .describe import GraphType, GraphFeatures, SampledFeatures, get_degree_dist, get_hubs, get_graph_mode
 from .domain import Disconnection, Communities
+from .domain.compact import GraphRef, node_array, edge_array
+from .instrument import NULL_RECORDER
 
 hero_service = None
+hero_registry = None
 
 def create_hero_service(data, preprocess=True):
+    """Creates the hero service from the edges, as a path or a pandas dataframe, or from a snapshot of the hero-comic
+    graph."""
     global hero_service
-    hero_service = TopHeroService.create_from(data, preprocess)
+    if isinstance(data, Snapshot):
+        hero_service = TopHeroService.create_from_snapshot(data)
+    else:
+        hero_service = TopHeroService.create_from(data, preprocess)
+
+
+def create_hero_registry(*graphs):
+    """Creates the registry that resolves the hero names of the kwargs of all functions, e.g. 'spider-man/peter par'
+    to 'SPIDER-MAN/PETER PARKER'.
+
+    :arg
+    *graphs (nx.Graph) - the graphs with the names to register.
+    """
+    global hero_registry
+    hero_registry = HeroRegistry.from_graphs(*graphs)
+
+
+def resolve_hero(name):
+    """Resolves a hero name with the hero registry. Names are returned as they are if there is no registry or they
+    match no hero. Ambiguous names raise a ValueError with suggestions, see HeroRegistry.resolve."""
+    if hero_registry is None or not isinstance(name, str):
+        return name
+    return hero_registry.resolve(name, default=name)
+
+
+def select_top_n(graph: nx.Graph, top_n: int, neighbours=False, **kwargs):
+    """Selects the top N heroes and the subgraph of the graph that contains them.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    top_n (int) - the number of top heroes to select.
+    neighbours (bool) - whether the neighbours of the heroes (e.g. their comics) are part of the subgraph.
+    **ranking (str) - how the top heroes are ranked: 'appearances' (the default), 'weighted_degree', 'pagerank' or
+    'core_number'. The scores of the rankings other than 'appearances' are computed on the graph once and cached by
+    the hero service.
+    **min_score (float) - if given, only heroes with at least this score of the ranking are selected.
+    **min_core (int) - if given, the subgraph is reduced to the nodes of the min_core-core of the whole graph, i.e. the
+    nodes whose core number in the graph is at least min_core, and the top heroes outside of it are dropped. This
+    removes the periphery before costly algorithms run on the subgraph. The core numbers are computed once per graph
+    and cached, see core_numbers.
+    **selection_cache (dict) - a cache of selections on this graph that is shared between calls, e.g. by
+    Controller.run_batch. If provided, the top N heroes and the subgraph are only built once per top_n.
+    **recorder (Recorder) - records the 'top_n' and 'subgraph' stages and the size of the subgraph.
+
+    :return
+    (list, nx.Graph) - the top N heroes and the subgraph with them.
+    """
+    global hero_service
+    if not hero_service:
+        raise ValueError(f'The hero service must be created before calling any function.')
+
+    cache = kwargs.get('selection_cache')
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    ranking, min_score, min_core = kwargs.get('ranking', 'appearances'), kwargs.get('min_score'), kwargs.get('min_core')
+    key = (top_n, neighbours, ranking, min_score, min_core)
+    if cache is not None and key in cache:
+        recorder.size('subgraph', cache[key][1])
+        return cache[key]
+
+    with recorder.stage('top_n'):
+        if ranking == 'appearances' and min_score is None:
+            top_heroes = hero_service.top_n(top_n)
+        else:
+            top_heroes = hero_service.top_n(top_n, ranking=ranking, graph=graph, min_score=min_score)
+
+    with recorder.stage('subgraph'):
+        subgraph = get_subgraph_with(graph, top_heroes, neighbours=neighbours)
+        if min_core:
+            # the core numbers of the whole graph are cached, unlike those of the subgraph, which is new on every call
+            cores = core_numbers(graph)
+            subgraph = subgraph.subgraph([node for node in subgraph if cores.get(node, 0) >= min_core])
+            top_heroes = [hero for hero in top_heroes if hero in subgraph]
+        selection = top_heroes, subgraph
+
+    recorder.size('subgraph', selection[1])
+    if cache is not None:
+        cache[key] = selection
+
+    return selection
+
 
 def features(graph: nx.Graph, top_n: int, **kwargs):
     """Extracts the features of the graph.
@@ -22,9 +108,14 @@ def features(graph: nx.Graph, top_n: int, **kwargs):
     graph (nx.Graph) - a networkx graph.
     top_n (int) - the top N heroes of which data will be considered.
     **graph_type (GraphType) - the type of the graph. Either the collaborative or hero-comic graph.
+    **sample (dict, SampleSpec) - if given, the density, the average degree and the hub threshold are estimated from
+    samples of the subgraph instead, see the sampling module, e.g. {'method': 'node', 'fraction': 0.1}. Only the node
+    sampler draws nodes uniformly, so the other methods, whose estimates are biased, are rejected.
+    **clustering (bool) - whether to compute the global and average clustering coefficients and the triangles of every
+    hero, see the triangles module. Only the collaborative graph has triangles.
 
     :return
-    a GraphFeatures object.
+    a GraphFeatures object, or a SampledFeatures object when sampling.
     """
     graph_type = kwargs.get('graph_type')
 
@@ -33,46 +124,72 @@ def features(graph: nx.Graph, top_n: int, **kwargs):
     if not isinstance(graph_type, GraphType):
         raise ValueError(
             f'The provided graph_type kwargs parameter must be of type GraphType. type(graph_type): {type(graph_type)}.')
+    if kwargs.get('clustering') and graph_type != GraphType.COLLABORATIVE:
+        raise ValueError(f'Clustering is only computed for the collaborative graph, the {graph_type.name} graph is '
+                         f'bipartite and has no triangles.')
 
     hero_collabs = {}
     n_heroes_per_comic = []
+    bipartite_density, hero_degree_dist, comic_degree_dist = None, None, None
+    global_clustering, avg_clustering, hero_triangles = None, None, None
+    recorder = kwargs.get('recorder', NULL_RECORDER)
 
-    global hero_service
-    if not hero_service:
-        raise ValueError(f'The hero service must be created before calling any function.')
+    # the hero-comic subgraph also contains the comics of the top heroes
+    _, subgraph = select_top_n(graph, top_n, neighbours=graph_type == GraphType.HERO_COMIC, **kwargs)
 
-    top_heroes = hero_service.top_n(top_n)
+    if kwargs.get('sample') is not None:
+        spec = SampleSpec.of(kwargs['sample'])
+        if spec.method != 'node':
+            raise ValueError(f'Only the node method samples nodes uniformly, so only its estimates of the features are '
+                             f'unbiased. method: {spec.method}.')
 
-    if graph_type == GraphType.COLLABORATIVE:
-        subgraph = graph.subgraph(top_heroes)
-        hero_collabs = get_hero_collabs(subgraph)
+        with recorder.stage('algorithm'):
+            sampled = list(samples(subgraph, spec))
+            # the degrees of the sampled nodes are those in the whole subgraph
+            degrees = [np.array([degree for _, degree in subgraph.degree(sample.nodes)], dtype=float)
+                       for sample in sampled]
+            density = estimate((nx.density(sample) for sample in sampled), spec.confidence)
+            avg_degree = estimate((values.mean() for values in degrees if len(values)), spec.confidence)
+            hub_threshold = estimate((np.percentile(values, 95) for values in degrees if len(values)), spec.confidence)
 
-    elif graph_type == GraphType.HERO_COMIC:
-        subgraph = get_subgraph_with(graph, top_heroes)
-        n_heroes_per_comic = get_n_heroes_per_comic(subgraph)
+        return SampledFeatures(graph_type, subgraph.number_of_nodes(), spec, density, avg_degree, hub_threshold)
 
-    n_nodes = len(subgraph.nodes())
-    density = nx.density(subgraph)
-    degree_dist = get_degree_dist(subgraph)
+    with recorder.stage('algorithm'):
+        if graph_type == GraphType.COLLABORATIVE:
+            hero_collabs = get_hero_collabs(subgraph)
+            if kwargs.get('clustering'):
+                hero_triangles = triangles(subgraph).sort_values(['triangles', 'degree'], ascending=False,
+                                                                 kind='stable', ignore_index=True)
+                global_clustering = transitivity(hero_triangles)
+                avg_clustering = float(hero_triangles.clustering.mean()) if len(hero_triangles) else 0.0
 
-    avg_degree = sum(map(lambda node: subgraph.degree(node), subgraph.nodes)) / n_nodes
+        elif graph_type == GraphType.HERO_COMIC:
+            n_heroes_per_comic = get_n_heroes_per_comic(subgraph)
+            index = BipartiteIndex.of(subgraph)
+            bipartite_density = index.density()
+            hero_degree_dist, comic_degree_dist = index.degree_dists()
 
-    hubs = get_hubs(subgraph, 95)
+        n_nodes = len(subgraph.nodes())
+        density = nx.density(subgraph)
+        degree_dist = get_degree_dist(subgraph)
 
-    graph_mode = get_graph_mode(subgraph)
+        avg_degree = 2 * subgraph.number_of_edges() / n_nodes
 
-    return GraphFeatures(graph_type, n_nodes, hero_collabs, n_heroes_per_comic, density, degree_dist, avg_degree, hubs,
-                         graph_mode)
+        hubs = get_hubs(subgraph, 95)
 
+        graph_mode = get_graph_mode(subgraph)
 
-def shortest_order_route(graph: nx.Graph, N: int, **kwargs):
+    with recorder.stage('pack'):
+        return GraphFeatures(graph_type, n_nodes, hero_collabs, n_heroes_per_comic, density, degree_dist, avg_degree,
+                             hubs, graph_mode, bipartite_density, hero_degree_dist, comic_degree_dist,
+                             global_clustering, avg_clustering, hero_triangles)
 
-    initial_hero = kwargs.get('initial_hero')
-    final_hero = kwargs.get('final_hero')
-    superheroes = kwargs.get('superheroes')
-    hero_comic = kwargs.get('hero_comic')  # path of the .csv file
 
-    hero_comic = pd.read_csv(hero_comic)
+def shortest_order_route(graph: nx.Graph, N: int, **kwargs):
+
+    initial_hero = resolve_hero(kwargs.get('initial_hero'))
+    final_hero = resolve_hero(kwargs.get('final_hero'))
+    superheroes = [resolve_hero(hero) for hero in kwargs.get('superheroes')]
 
     if initial_hero == final_hero:
           return('You are already there!')
@@ -80,34 +197,30 @@ def shortest_order_route(graph: nx.Graph, N: int, **kwargs):
     # First of all, we initialize the list which will contain the shortes path
     path = []
 
-    global hero_service
-    if not hero_service:
-        raise ValueError(f'The hero service must be created before calling any function.')
-
-    top_heroes = hero_service.top_n(N)
     # Second, we have to focus on the top N nodes in the graph.
     # To do it, we first remove the nodes (and the edges, of course) that are not in the top-N nodes
-    subg = get_subgraph_with(graph, top_heroes)
+    _, subg = select_top_n(graph, N, neighbours=True, **kwargs)
 
     # Now we want to create a list containing all the superheroes we have to visit, inlcluding the starting one and the ending one
-    superheroes.insert(0, initial_hero)
-    superheroes.append(final_hero)
+    # (without modifying the caller's list, which may be reused for other runs)
+    superheroes = [initial_hero] + superheroes + [final_hero]
 
     # Now, we compute the shortest path between the first and the second, then between the second and the third, and so on,
     # until we visit (in order) all the nodes contained in the original list given as input
-    for h in range(len(superheroes) - 1):
-        try:
-            if superheroes[h] not in subg.nodes():
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    with recorder.stage('algorithm'):
+        # the search steps from heroes to heroes over their comics, unreachable heroes are rejected before it
+        index = BipartiteIndex.of(subg)
+        components = ComponentIndex.of(subg)
+        for hero in superheroes:
+            if hero not in index.hero_comics:
                 return('WARNING: this here is not in the graph! Try to change N or check if the spelling is correct')
 
-            a = nx.bidirectional_shortest_path(subg, superheroes[h], superheroes[h+1])
-            if len(a) == 0:
+        for h in range(len(superheroes) - 1):
+            if not components.connected(superheroes[h], superheroes[h+1]):
                 return("WARNING: There is no such path!")
-            path.append(a)
-            
-        except:
-            print('Sorry, there is no such path...') 
-            return   
+
+            path.append(index.shortest_path(superheroes[h], superheroes[h+1]))
 
     return(path)  
 
@@ -122,20 +235,12 @@ def disconnecting_graphs(graph: nx.Graph, top_n: int, **kwargs):
     **hero_b (str) - a hero to which the second subgraph is related.
 
     :return
-    (float, int, nx.Graph, nx.Graph) - The cumulative weight of the removed edges, the number of removed edges, the two
-    disconnected subgraphs.
+    a Disconnection with the removed edges, their cumulative weight and the nodes of the two disconnected subgraphs.
     """
+    hero_a = resolve_hero(kwargs.get('hero_a'))
+    hero_b = resolve_hero(kwargs.get('hero_b'))
 
-    def edge_is_bridge(edge, graph_a, graph_b):
-        start, end = edge
-        return (start in graph_a and end in graph_b) or (start in graph_b and end in graph_a)
-
-    hero_a = kwargs.get('hero_a')
-    hero_b = kwargs.get('hero_b')
-
-    hs = TopHeroService.create_from('data/edges.csv')
-    top_heroes = hs.top_n(top_n)
-    subgraph = nx.subgraph(graph, top_heroes)
+    top_heroes, subgraph = select_top_n(graph, top_n, **kwargs)
 
     if hero_a not in top_heroes:
         raise ValueError(f'The provided hero_a: {hero_a} is not part of the top_n: {top_n} heroes.')
@@ -143,16 +248,19 @@ def disconnecting_graphs(graph: nx.Graph, top_n: int, **kwargs):
     if hero_b not in top_heroes:
         raise ValueError(f'The provided hero_b: {hero_b} is not part of the top_n: {top_n} heroes.')
 
-    # First, find the min cut max flow using the networkx API. This will return the max flow (min possible weight) and
-    # the nodes of the two subgraphs
-    weight, nodes = nx.minimum_cut(subgraph, hero_a, hero_b, capacity='weight')
-    nodes_a, nodes_b = nodes
-
-    graph_a, graph_b = nx.subgraph(subgraph, nodes_a), nx.subgraph(subgraph, nodes_b)
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    with recorder.stage('algorithm'):
+        # First, find the min cut max flow using the networkx API. This will return the max flow (min possible weight)
+        # and the nodes of the two subgraphs
+        weight, nodes = nx.minimum_cut(subgraph, hero_a, hero_b, capacity='weight')
+        nodes_a, nodes_b = nodes
 
-    bridges = list(filter(lambda edge: edge_is_bridge(edge, graph_a, graph_b), subgraph.edges))
+    with recorder.stage('pack'):
+        # every node is on one of the two sides, so an edge is cut if its ends are on different sides
+        bridges = edge_array((u, v) for u, v in subgraph.edges if (u in nodes_a) != (v in nodes_a))
 
-    return Disconnection(bridges, weight, subgraph, hero_a, hero_b, graph_a, graph_b)
+        return Disconnection(bridges, weight, hero_a, hero_b, node_array(subgraph.nodes), node_array(nodes_a),
+                             node_array(nodes_b), GraphRef(graph))
 
 
 def metrics(graph: nx.Graph, top_n: int, **kwargs):
@@ -164,71 +272,83 @@ def metrics(graph: nx.Graph, top_n: int, **kwargs):
     **node (str) - the node to consider.
     **metric (str) - the metric to be applied. Possible metrics are: betweenness_centrality, pagerank,
     closeness_centrality, degree_centrality.
+    **sample (dict, SampleSpec) - if given, the betweenness_centrality is estimated from the shortest paths of sampled
+    source nodes, like nx.betweenness_centrality with k, and both values are Estimates. Every repeat of the spec
+    samples spec.sample_size sources uniformly, so the method of the spec must be 'node'. The estimates are unbiased
+    and the intervals cover the values of the whole subgraph. The other metrics of a sampled graph are not estimates of
+    their values on the whole subgraph, so they cannot be sampled.
 
     :return
     (int, float), (str, float) - a tuple with the mean metric value for the top n heroes, anda tuple the metric value
     for the specific node.
     """
 
-    node, metric = kwargs.get('node'), kwargs.get('metric')
-
-    global hero_service
-    if not hero_service:
-        raise ValueError(f'The hero service must be created before calling any function.')
-
-    top_heroes = hero_service.top_n(top_n)
+    node, metric = resolve_hero(kwargs.get('node')), kwargs.get('metric')
 
     if not node:
         raise ValueError(f'The node must not be None.')
 
+    top_heroes, subgraph = select_top_n(graph, top_n, **kwargs)
+
     if node not in top_heroes:
         raise ValueError(f'The node: {node} is not part of the top {top_n} heroes.')
 
-    subgraph = nx.subgraph(graph, top_heroes)
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    if kwargs.get('sample') is not None:
+        spec = SampleSpec.of(kwargs['sample'])
+        if metric != 'betweenness_centrality' or spec.method != 'node':
+            raise ValueError(f'Only the betweenness_centrality can be sampled, with the node method. metric: {metric}, '
+                             f'method: {spec.method}.')
+
+        with recorder.stage('algorithm'):
+            # every repeat is an unbiased estimate from its own uniformly sampled sources
+            n_sources = min(spec.sample_size(subgraph), subgraph.number_of_nodes())
+            sampled_values = [nx.betweenness_centrality(subgraph, k=n_sources, seed=spec.seed + i)
+                              for i in range(spec.repeats)]
+
+        with recorder.stage('pack'):
+            return (top_n, estimate((np.mean(list(values.values())) for values in sampled_values), spec.confidence)), \
+                (node, estimate((values[node] for values in sampled_values), spec.confidence))
+
+    with recorder.stage('algorithm'):
+        metric_values = _metric_values(subgraph, metric)
+
+    with recorder.stage('pack'):
+        # Get the metric value for the given node
+        node_metric_value = metric_values[node]
 
+        # Get the average metric value
+        mean_metric = np.array(list(metric_values.values())).mean()
+
+        return (top_n, mean_metric), (node, node_metric_value)
+
+
+def _metric_values(graph, metric):
     if metric == 'betweenness_centrality':
-        metric_values = nx.betweenness_centrality(subgraph)
+        return nx.betweenness_centrality(graph)
     elif metric == 'pagerank':
-        metric_values = nx.pagerank_numpy(subgraph)
+        return nx.pagerank(graph)
     elif metric == 'closeness_centrality':
-        metric_values = nx.closeness_centrality(subgraph)
+        return nx.closeness_centrality(graph)
     elif metric == 'degree_centrality':
-        metric_values = nx.degree_centrality(subgraph)
-    else:
-        raise ValueError(f'Invalid metric: {metric}.')
+        return nx.degree_centrality(graph)
 
-    # Get the metric value for the given node
-    node_metric_value = metric_values[node]
-
-    # Get the average metric value
-    mean_metric = np.array(list(metric_values.values())).mean()
-
-    return (top_n, mean_metric), (node, node_metric_value)
+    raise ValueError(f'Invalid metric: {metric}.')
 
 
 def _edge_to_remove(graph):
-    G_dict = nx.edge_betweenness_centrality(graph)
-    edge = ()
-
     # extract the edge with highest edge betweenness centrality score
-    for key, value in sorted(G_dict.items(), key=lambda item: item[1], reverse=True):
-        edge = key
-        break
-
-    return edge
+    return edge_betweenness(graph).top()
 
 
 def _girvan_newman(graph):
-    # find number of connected components
-    sg = nx.connected_components(graph)
-    sg_count = nx.number_connected_components(graph)
+    # the components are kept up to date while edges are removed, instead of being searched after every removal
+    components = ComponentIndex(graph)
 
-    while (sg_count == 1):
-        graph.remove_edge(_edge_to_remove(graph)[0], _edge_to_remove(graph)[1])
-        sg = nx.connected_components(graph)
-        sg_count = nx.number_connected_components(graph)
+    while len(components) == 1:
+        components.remove_edge(graph, *_edge_to_remove(graph))
 
-    return sg
+    return components.components()
 
 
 def extract_communities(graph: nx.Graph, top_n: int, **kwargs):
@@ -245,18 +365,14 @@ def extract_communities(graph: nx.Graph, top_n: int, **kwargs):
     two heroes are in the same community.
     """
 
-    hero_1, hero_2 = kwargs.get('hero_1'), kwargs.get('hero_2')
+    hero_1, hero_2 = resolve_hero(kwargs.get('hero_1')), resolve_hero(kwargs.get('hero_2'))
 
     if not hero_1:
         raise ValueError(f'The hero_1 kwargs needs to be set.')
     if not hero_2:
         raise ValueError(f'The hero_2 kwargs needs to be set.')
 
-    global hero_service
-    if not hero_service:
-        raise ValueError(f'The hero service must be created before calling any function.')
-
-    top_heroes = hero_service.top_n(top_n)
+    top_heroes, subgraph = select_top_n(graph, top_n, **kwargs)
 
     if hero_1 not in top_heroes:
         raise ValueError(f'The provided hero_1: {hero_1} is not part of the top_n: {top_n} heroes.')
@@ -264,20 +380,22 @@ def extract_communities(graph: nx.Graph, top_n: int, **kwargs):
     if hero_2 not in top_heroes:
         raise ValueError(f'The provided hero_2: {hero_2} is not part of the top_n: {top_n} heroes.')
 
-    subgraph = get_subgraph_with(graph, top_heroes, neighbours=False)
-
-    min_cut = nx.minimum_edge_cut(subgraph)
-
-    # Find the communities using girvan_newman function
-    unf = nx.Graph(subgraph)
-    communities = list(_girvan_newman(unf))
-
-    # Check if the hero_1 and hero_2 belong to the same community
-    same_community = False
-    for community in communities:
-        if hero_1 in community and hero_2 in community:
-            same_community = True
-            break
-
-    community_1, community_2 = communities
-    return Communities(min_cut, subgraph, hero_1, hero_2, community_1, community_2, same_community)
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    with recorder.stage('algorithm'):
+        min_cut = nx.minimum_edge_cut(subgraph)
+
+        # Find the communities using girvan_newman function
+        unf = nx.Graph(subgraph)
+        communities = list(_girvan_newman(unf))
+
+    with recorder.stage('pack'):
+        # Check if the hero_1 and hero_2 belong to the same community
+        same_community = False
+        for community in communities:
+            if hero_1 in community and hero_2 in community:
+                same_community = True
+                break
+
+        community_1, community_2 = communities
+        return Communities(edge_array(min_cut), hero_1, hero_2, node_array(subgraph.nodes), node_array(community_1),
+                           node_array(community_2), same_community, GraphRef(graph))
@@ -0,0 +1,170 @@
+"""A module for saving and loading the results of manager functions.
+
+A result is saved to a directory with a `result.json` file that holds the schema version, the type of the result and
+its scalar fields. Tables are stored as uncompressed Arrow IPC files and node and edge sets as .npy files, so results of
+batch jobs can be read by other processes without recomputing or unpickling them. The node and edge sets are
+memory-mapped when they are loaded: they are only read from disk when they are accessed. The tables of GraphFeatures
+are converted to pandas by load, which copies them. Use read_table for a zero-copy, memory-mapped Arrow table.
+
+    save(controller.run('disconnecting_graphs', 50, hero_a=..., hero_b=...), 'results/disconnection')
+    disconnection = load('results/disconnection').with_graph(graph)
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .describe import GraphFeatures, GraphType, GraphMode
+from .domain import Disconnection, Communities
+
+SCHEMA = 'marvel-result'
+
+# The version of the format. It is increased whenever the format changes, older versions are still read.
+# 1 - the first version.
+# 2 - GraphFeatures with bipartite_density, hero_degree_dist and comic_degree_dist.
+# 3 - GraphFeatures with global_clustering, avg_clustering and hero_triangles.
+SCHEMA_VERSION = 3
+
+_META_FILE = 'result.json'
+
+# The values of tables that a manager function did not compute, e.g. the comics of a collaborative graph.
+_ABSENT_TABLES = {'hero_collabs': dict, 'n_heroes_per_comic': list}
+
+_TABLES = ('hero_collabs', 'n_heroes_per_comic', 'degree_dist', 'hubs', 'hero_degree_dist', 'comic_degree_dist',
+           'hero_triangles')
+
+_ARRAYS = {Disconnection: ('links', 'nodes', 'nodes_a', 'nodes_b'),
+           Communities: ('links', 'nodes', 'community_1', 'community_2')}
+
+_SCALARS = {Disconnection: ('weight', 'hero_a', 'hero_b'),
+            Communities: ('hero_1', 'hero_2', 'same_community'),
+            GraphFeatures: ('n_nodes', 'density', 'avg_degree', 'bipartite_density', 'global_clustering',
+                            'avg_clustering')}
+
+
+def save(result, path: str):
+    """Saves a result to a directory.
+
+    :arg
+    result (GraphFeatures, Disconnection, Communities) - the result of a manager function.
+    path (str) - the directory to save the result to. It is created if it does not exist.
+
+    :return
+    the path of the directory.
+    """
+    result_type = type(result)
+    if result_type not in _SCALARS:
+        raise ValueError(f'Cannot save results of type {result_type.__name__}. Supported types: '
+                         f'{[supported.__name__ for supported in _SCALARS]}.')
+
+    os.makedirs(path, exist_ok=True)
+    meta = {'schema': SCHEMA, 'version': SCHEMA_VERSION, 'type': result_type.__name__,
+            'scalars': {name: _scalar(getattr(result, name)) for name in _SCALARS[result_type]}}
+
+    if result_type is GraphFeatures:
+        meta['scalars'].update(graph_type=result.graph_type.name, mode=result.mode.name)
+        meta['tables'] = [name for name in _TABLES if isinstance(getattr(result, name), pd.DataFrame)]
+        for name in meta['tables']:
+            _write_table(getattr(result, name), os.path.join(path, f'{name}.arrow'))
+    else:
+        for name in _ARRAYS[result_type]:
+            _write_array(getattr(result, name), os.path.join(path, f'{name}.npy'))
+
+    # the meta file is written last, so that a directory without it is an incomplete result
+    with open(os.path.join(path, _META_FILE), 'w') as file:
+        json.dump(meta, file, indent=2)
+
+    return path
+
+
+def load(path: str, mmap=True):
+    """Loads a result from a directory.
+
+    :arg
+    path (str) - the directory the result was saved to.
+    mmap (bool) - whether to memory-map the node and edge arrays instead of reading them into memory. The tables are
+    read from a memory map too, but always copied into pandas data frames, see read_table.
+
+    :return
+    the result. Disconnection and Communities are not attached to a graph, see their with_graph method.
+    """
+    with open(os.path.join(path, _META_FILE)) as file:
+        meta = json.load(file)
+
+    if meta.get('schema') != SCHEMA:
+        raise ValueError(f'The directory {path} does not contain a saved result. schema: {meta.get("schema")}.')
+    if meta['version'] > SCHEMA_VERSION:
+        raise ValueError(f'The result was saved with the newer schema version {meta["version"]}. This version only '
+                         f'reads versions up to {SCHEMA_VERSION}.')
+
+    scalars = meta['scalars']
+    if meta['type'] == GraphFeatures.__name__:
+        tables = {name: _read_table(os.path.join(path, f'{name}.arrow'), mmap) if name in meta['tables']
+                  else _ABSENT_TABLES.get(name, lambda: None)()
+                  for name in _TABLES}
+        return GraphFeatures(GraphType[scalars['graph_type']], scalars['n_nodes'], tables['hero_collabs'],
+                             tables['n_heroes_per_comic'], scalars['density'], tables['degree_dist'],
+                             scalars['avg_degree'], tables['hubs'], GraphMode[scalars['mode']],
+                             scalars.get('bipartite_density'), tables['hero_degree_dist'], tables['comic_degree_dist'],
+                             scalars.get('global_clustering'), scalars.get('avg_clustering'), tables['hero_triangles'])
+
+    result_type = {Disconnection.__name__: Disconnection, Communities.__name__: Communities}.get(meta['type'])
+    if not result_type:
+        raise ValueError(f'Unknown result type: {meta["type"]}.')
+
+    arrays = {name: _read_array(os.path.join(path, f'{name}.npy'), mmap) for name in _ARRAYS[result_type]}
+    return result_type(**arrays, **{name: scalars[name] for name in _SCALARS[result_type]})
+
+
+def read_table(path: str, name: str):
+    """Reads a table of saved GraphFeatures as a memory-mapped Arrow table, without converting it to pandas.
+
+    :arg
+    path (str) - the directory the features were saved to.
+    name (str) - the name of the table, e.g. 'hero_collabs'.
+
+    :return
+    a pyarrow Table whose buffers point into the memory-mapped file.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(os.path.join(path, f'{name}.arrow')) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _write_table(table, path):
+    import pyarrow as pa
+
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+
+
+def _read_table(path, mmap):
+    import pyarrow as pa
+
+    source = pa.memory_map(path) if mmap else pa.OSFile(path)
+    with source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _write_array(array, path):
+    # nodes are stored as fixed width strings or numbers, which can be memory-mapped unlike object arrays
+    shape = np.shape(array)
+    array = np.asarray(array.tolist() if isinstance(array, np.ndarray) else list(array))
+    if array.size == 0:
+        array = np.empty(shape, dtype='U1')
+    if array.dtype.kind not in 'Uiufb':
+        raise ValueError(f'Cannot save an array of nodes with dtype {array.dtype}. Nodes must be strings or numbers.')
+
+    np.save(path, array, allow_pickle=False)
+
+
+def _read_array(path, mmap):
+    return np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+
+def _scalar(value):
+    # numpy scalars are not json serialisable
+    return value.item() if hasattr(value, 'item') else value
@@ -0,0 +1,401 @@
+"""An asyncio HTTP/JSON server that answers controller queries for the Marvel hero graphs.
+
+The graphs are loaded once when the server starts and are read-only afterwards. Cheap queries are answered directly on
+the event loop, while CPU-heavy queries are offloaded to a process pool whose workers receive the graphs once, at
+start-up. Identical queries that arrive while one of them is still running are coalesced into a single computation.
+
+Run it with:
+
+    python -m backend.server --hero-network data/hero-network.csv --nodes data/nodes.csv --edges data/edges.csv
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+
+import attr
+
+from . import manager
+from .controller import Controller
+from .describe import GraphType, GraphFeatures, SampledFeatures, Estimate
+from .domain import Disconnection, Communities
+from .instrument import InstrumentedResult
+
+logging.basicConfig(format='%(asctime)s %(name)s - %(message)s', datefmt='%d-%b-%y %H:%M:%S')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Queries that are answered on the event loop. Everything else is sent to the process pool. features is not cheap: it
+# builds the collaborations of the whole subgraph and may sample or count triangles, which would block all connections.
+CHEAP_QUERIES = {'shortest_order_route'}
+
+# The graph that each query runs on, unless the request specifies a graph_type.
+DEFAULT_GRAPHS = {'features': GraphType.COLLABORATIVE,
+                  'shortest_order_route': GraphType.HERO_COMIC,
+                  'disconnecting_graphs': GraphType.COLLABORATIVE,
+                  'metrics': GraphType.COLLABORATIVE,
+                  'extract_communities': GraphType.COLLABORATIVE}
+
+# The fields that the body of a request to each query may contain. Everything else, in particular the kwargs of
+# Controller.run and the manager functions that write files or share state, e.g. profile, instrument, recorder or
+# selection_cache, is rejected.
+_SELECTION_FIELDS = {'top_n', 'graph_type', 'ranking', 'min_score', 'min_core'}
+ALLOWED_FIELDS = {'features': _SELECTION_FIELDS | {'sample', 'clustering'},
+                  'shortest_order_route': _SELECTION_FIELDS | {'initial_hero', 'final_hero', 'superheroes'},
+                  'disconnecting_graphs': _SELECTION_FIELDS | {'hero_a', 'hero_b'},
+                  'metrics': _SELECTION_FIELDS | {'node', 'metric', 'sample'},
+                  'extract_communities': _SELECTION_FIELDS | {'hero_1', 'hero_2'}}
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+# The controllers of a process pool worker, set once by _init_worker.
+_worker_controllers = {}
+
+
+class LatencyHistogram:
+    """A fixed-bucket histogram of request latencies."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, millis: float):
+        """Records a single latency.
+
+        :arg
+        millis (float) - the latency in milliseconds.
+        """
+        self.counts[bisect.bisect_left(self.buckets, millis)] += 1
+        self.count += 1
+        self.total += millis
+
+    def to_dict(self):
+        """Returns the histogram as a json serialisable dictionary."""
+        labels = [f'le_{bucket}' for bucket in self.buckets] + ['le_inf']
+        return {'count': self.count,
+                'mean_ms': self.total / self.count if self.count else 0.0,
+                'buckets': dict(zip(labels, self.counts))}
+
+
+class QueryServer:
+    """Serves controller queries over HTTP/JSON.
+
+    Requests are `POST /<identifier>` with a json body that contains `top_n` and the kwargs of the manager function,
+    e.g. `{"top_n": 50, "node": "WOLVERINE/LOGAN", "metric": "pagerank"}`. The optional `graph_type` field selects the
+    graph ("COLLABORATIVE" or "HERO_COMIC"). Fields that are not in ALLOWED_FIELDS are rejected. `GET /stats` returns
+    the latency histograms of every endpoint.
+    """
+
+    def __init__(self, graphs: dict, max_workers=None):
+        """Initialises the QueryServer.
+
+        :arg
+        graphs (dict) - a dictionary of GraphType to networkx graph or Snapshot. The graphs must not be modified
+        afterwards.
+        max_workers (int) - the number of processes for heavy queries. If 0, heavy queries run in a thread instead.
+        """
+        self.controllers = {graph_type: Controller(graph) for graph_type, graph in graphs.items()}
+        self.max_workers = max_workers
+        self.pool = None
+        self.histograms = {identifier: LatencyHistogram() for identifier in DEFAULT_GRAPHS}
+        self._in_flight = {}
+
+    def start_pool(self):
+        """Starts the process pool. Each worker receives the graphs, the hero service and the hero registry once.
+
+        The workers are started eagerly, before any socket is opened, so that forked workers do not inherit client
+        connections and keep them open.
+        """
+        if self.max_workers == 0 or self.pool:
+            return
+
+        graphs = {graph_type: controller.graph for graph_type, controller in self.controllers.items()}
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                        initargs=(graphs, manager.hero_service, manager.hero_registry))
+        self.pool.submit(_ping).result()
+
+    def close(self):
+        """Shuts down the process pool."""
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    async def query(self, identifier: str, request: dict):
+        """Answers a single query, sharing the computation with identical queries that are already running.
+
+        :arg
+        identifier (str) - the name of the manager function.
+        request (dict) - the decoded json body with top_n and the kwargs.
+
+        :return
+        the json serialisable result of the query.
+        """
+        if identifier not in DEFAULT_GRAPHS:
+            raise KeyError(identifier)
+        unknown = set(request) - ALLOWED_FIELDS[identifier]
+        if unknown:
+            raise ValueError(f'Unknown fields for {identifier}: {sorted(unknown)}. '
+                             f'Allowed fields: {sorted(ALLOWED_FIELDS[identifier])}.')
+
+        key = json.dumps([identifier, request], sort_keys=True)
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+            # the query that was computing the result was cancelled, e.g. its client disconnected, so this one computes
+            # the result instead
+            return await self.query(identifier, request)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        start = time.perf_counter()
+        try:
+            result = await self._dispatch(identifier, dict(request))
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # the exception is re-raised to this caller, mark it as retrieved for the coalesced ones
+            future.exception()
+            raise
+        finally:
+            # a cancelled query is not an Exception, its coalesced queries must not wait for it forever
+            if not future.done():
+                future.cancel()
+            del self._in_flight[key]
+            self.histograms[identifier].observe((time.perf_counter() - start) * 1000)
+
+    async def _dispatch(self, identifier, request):
+        top_n = request.pop('top_n', None)
+        if not isinstance(top_n, int):
+            raise ValueError(f'The request must contain an integer top_n. top_n: {top_n}.')
+
+        graph_type = GraphType[request.pop('graph_type', DEFAULT_GRAPHS[identifier].name)]
+        if graph_type not in self.controllers:
+            raise ValueError(f'The server has no graph of type {graph_type.name}.')
+
+        if identifier == 'features':
+            request['graph_type'] = graph_type
+
+        if identifier in CHEAP_QUERIES:
+            return to_json(self.controllers[graph_type].run(identifier, top_n, **request))
+
+        loop = asyncio.get_running_loop()
+        if self.pool:
+            return await loop.run_in_executor(self.pool, _run_in_worker, graph_type, identifier, top_n, request)
+
+        controller = self.controllers[graph_type]
+        return await loop.run_in_executor(None, lambda: to_json(controller.run(identifier, top_n, **request)))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handles a single HTTP connection."""
+        try:
+            status, body = await self._respond(reader)
+        except Exception as e:
+            logger.exception('Failed to answer the request.')
+            status, body = 500, {'error': str(e)}
+
+        payload = json.dumps(body).encode()
+        writer.write(f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+                     f'Content-Type: application/json\r\n'
+                     f'Content-Length: {len(payload)}\r\n'
+                     f'Connection: close\r\n\r\n'.encode() + payload)
+        await writer.drain()
+        writer.close()
+
+    async def _respond(self, reader):
+        request_line = (await reader.readline()).decode().split()
+        if len(request_line) < 2:
+            return 400, {'error': 'Malformed request line.'}
+        method, path = request_line[0], request_line[1]
+
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        raw_body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+        if path == '/stats':
+            return 200, {identifier: histogram.to_dict() for identifier, histogram in self.histograms.items()}
+
+        if method != 'POST':
+            return 405, {'error': f'Use POST for queries. method: {method}.'}
+
+        identifier = path.strip('/')
+        try:
+            request = json.loads(raw_body or b'{}')
+            if not isinstance(request, dict):
+                return 400, {'error': f'The body must be a json object. type: {type(request).__name__}.'}
+            return 200, {'result': await self.query(identifier, request)}
+        except KeyError as e:
+            return 404 if identifier not in DEFAULT_GRAPHS else 400, {'error': f'Unknown key: {e}.'}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        """Starts the process pool and serves requests until cancelled."""
+        self.start_pool()
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f'Serving hero graph queries on http://{host}:{port}.')
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+def to_json(result):
+    """Converts the result of a manager function into a json serialisable object.
+
+    :arg
+    result - the result of any manager function.
+
+    :return
+    dictionaries, lists, strings and numbers that represent the result.
+    """
+    if isinstance(result, InstrumentedResult):
+        return {'result': to_json(result.result), 'record': result.record.to_dict()}
+
+    if isinstance(result, GraphFeatures):
+        return {'graph_type': result.graph_type.name,
+                'n_nodes': result.n_nodes,
+                'hero_collabs': to_json(result.hero_collabs),
+                'n_heroes_per_comic': to_json(result.n_heroes_per_comic),
+                'density': result.density,
+                'degree_dist': to_json(result.degree_dist),
+                'avg_degree': result.avg_degree,
+                'hubs': to_json(result.hubs),
+                'mode': result.mode.name,
+                'bipartite_density': result.bipartite_density,
+                'hero_degree_dist': to_json(result.hero_degree_dist),
+                'comic_degree_dist': to_json(result.comic_degree_dist),
+                'global_clustering': result.global_clustering,
+                'avg_clustering': result.avg_clustering,
+                'hero_triangles': to_json(result.hero_triangles)}
+
+    if isinstance(result, SampledFeatures):
+        return {'graph_type': result.graph_type.name,
+                'n_nodes': result.n_nodes,
+                'sample': attr.asdict(result.sample),
+                'density': to_json(result.density),
+                'avg_degree': to_json(result.avg_degree),
+                'hub_threshold': to_json(result.hub_threshold)}
+
+    if isinstance(result, Estimate):
+        return attr.asdict(result)
+
+    if isinstance(result, Disconnection):
+        return {'links': to_json(result.links),
+                'weight': result.weight,
+                'hero_a': result.hero_a,
+                'hero_b': result.hero_b,
+                'nodes_a': sorted(result.nodes_a),
+                'nodes_b': sorted(result.nodes_b)}
+
+    if isinstance(result, Communities):
+        return {'links': to_json(result.links),
+                'hero_1': result.hero_1,
+                'hero_2': result.hero_2,
+                'community_1': sorted(result.community_1),
+                'community_2': sorted(result.community_2),
+                'same_community': result.same_community}
+
+    if hasattr(result, 'tolist'):
+        # numpy arrays and scalars
+        return to_json(result.tolist())
+
+    if hasattr(result, 'to_dict') and hasattr(result, 'columns'):
+        return result.to_dict(orient='records')
+
+    if isinstance(result, Enum):
+        return result.name
+
+    if isinstance(result, dict):
+        return {str(key): to_json(value) for key, value in result.items()}
+
+    if isinstance(result, (list, tuple, set, frozenset)):
+        return [to_json(value) for value in result]
+
+    return result
+
+
+def _init_worker(graphs, hero_service, hero_registry=None):
+    global _worker_controllers
+    _worker_controllers = {graph_type: Controller(graph) for graph_type, graph in graphs.items()}
+    manager.hero_service = hero_service
+    manager.hero_registry = hero_registry
+
+
+def _ping():
+    return True
+
+
+def _run_in_worker(graph_type, identifier, top_n, kwargs):
+    return to_json(_worker_controllers[graph_type].run(identifier, top_n, **kwargs))
+
+
+def _load_graphs(args):
+    from .graph import collaborative, hero_comic, snapshot, external
+
+    out_of_core = {GraphType.COLLABORATIVE: lambda path: external.create_collaborative(args.hero_network, path),
+                   GraphType.HERO_COMIC: lambda path: external.create_hero_comic(args.nodes, args.edges, path)}
+    graphs = {}
+    for graph_type, create in [(GraphType.COLLABORATIVE, lambda: collaborative.create_from(data=args.hero_network)),
+                               (GraphType.HERO_COMIC, lambda: hero_comic.create_from(nodes=args.nodes,
+                                                                                      edges=args.edges))]:
+        if not args.snapshots:
+            graphs[graph_type], _ = create()
+            continue
+
+        # the snapshots are written once and memory-mapped by the server and all of its workers
+        path = os.path.join(args.snapshots, graph_type.name.lower())
+        if not snapshot.exists(path) and args.out_of_core:
+            out_of_core[graph_type](path)
+        elif not snapshot.exists(path):
+            snapshot.write(create()[0], path, graph_type)
+        graphs[graph_type] = snapshot.Snapshot(path)
+
+    return graphs
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Serves Marvel hero graph queries over HTTP/JSON.')
+    parser.add_argument('--hero-network', default='data/hero-network.csv')
+    parser.add_argument('--nodes', default='data/nodes.csv')
+    parser.add_argument('--edges', default='data/edges.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--snapshots', help='a directory of graph snapshots. Missing snapshots are written first.')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='write missing snapshots without loading the csv files into memory, and rank the heroes '
+                             'on the hero-comic snapshot. Needs --snapshots.')
+    args = parser.parse_args()
+    if args.out_of_core and not args.snapshots:
+        parser.error('--out-of-core needs --snapshots.')
+
+    graphs = _load_graphs(args)
+    manager.create_hero_service(graphs[GraphType.HERO_COMIC] if args.out_of_core else args.edges)
+    manager.create_hero_registry(*graphs.values())
+    server = QueryServer(graphs, max_workers=args.workers)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,7 @@
-from .hero import TopHeroService
+from backend import lazy
+
+__all__ = ['TopHeroService', 'HeroRegistry', 'PairIndex']
+
+__getattr__, __dir__ = lazy.attach(__name__, {'TopHeroService': ('.hero', 'TopHeroService'),
+                                                  'HeroRegistry': ('.registry', 'HeroRegistry'),
+                                                  'PairIndex': ('.pairs', 'PairIndex')})
@@ -1,20 +1,30 @@
 """A hero service that provides information about marvel heroes."""
+import weakref
 from collections import Counter
 
-import pandas as pd
-
-from backend.graph.preprocess import strip_trailing_characters, replace_hero
+# The default ranking, by the number of comics a hero appeared in.
+APPEARANCES = 'appearances'
 
 
 class TopHeroService:
     """A service class that provides hero information about top heroes.
 
-    A top hero is a hero that has appeared in many comics.
+    A top hero is a hero that has appeared in many comics. Heroes can also be ranked by scores that are computed on a
+    graph, see the ranking module. These scores are computed once per graph and ranking, and cached.
     """
 
     def __init__(self, heroes):
         self.heroes = heroes
         self.hero_counts = None
+        self._indexes = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        # the cached indexes are bound to graphs of this process
+        return {'heroes': self.heroes, 'hero_counts': self.hero_counts}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._indexes = weakref.WeakKeyDictionary()
 
     @staticmethod
     def create_from(data, preprocess=True):
@@ -29,6 +39,10 @@ class TopHeroService:
         :return
         an instance of the HeroService.
         """
+        # pandas is only needed to read the data, counting the top heroes works without it
+        import pandas as pd
+        from backend.graph.preprocess import strip_trailing_characters, replace_hero
+
         if not (isinstance(data, str) or isinstance(data, pd.DataFrame)):
             raise ValueError(f'The data must either be of type string or a pandas DataFrame. Received type: {type(data)}')
         if isinstance(data, str):
@@ -42,19 +56,89 @@ class TopHeroService:
 
         return TopHeroService(data)
 
-    def top_n(self, n):
+    @staticmethod
+    def create_from_snapshot(snapshot):
+        """Creates the hero service from a snapshot of the hero-comic graph, without reading the edges.
+
+        The heroes are ranked by the appearances that the snapshot stores, see the external module, or else by their
+        number of comics.
+
+        :arg
+        snapshot (Snapshot) - a snapshot of the hero-comic graph.
+
+        :return
+        an instance of the HeroService. Its heroes are None, only the counts of the heroes are known.
+        """
+        import numpy as np
+
+        counts = snapshot.appearances if snapshot.appearances is not None else np.diff(snapshot.offsets)
+        heroes = np.flatnonzero((np.asarray(snapshot.types) == 0) & (np.asarray(counts) > 0))
+
+        service = TopHeroService(None)
+        service.hero_counts = Counter(dict(zip(snapshot.names[heroes].tolist(), np.asarray(counts)[heroes].tolist())))
+        return service
+
+    def top_n(self, n, ranking=APPEARANCES, graph=None, min_score=None):
         """Returns the top n heroes.
 
-        The top N heroes are those who have appeared in the most number of comics.
+        The top N heroes are those who have appeared in the most number of comics, or those with the highest scores of
+        another ranking.
 
         :arg
         n (int) - the number of heroes. If none, all heroes are returned.
+        ranking (str) - either 'appearances' or one of the rankings of the ranking module: 'weighted_degree',
+        'pagerank' or 'core_number'.
+        graph (nx.Graph) - the graph the scores of the ranking are computed on. Not needed for 'appearances'.
+        min_score (float) - if given, only heroes with at least this score are returned. Not supported for
+        'appearances'.
 
         :return
         a list of the top n heroes.
         """
+        if ranking != APPEARANCES or min_score is not None:
+            return self.score_index(ranking, graph).top_n(n, min_score)
+
         if not self.hero_counts:
             self.hero_counts = Counter(self.heroes)
 
         top_n = list(zip(*self.hero_counts.most_common(n)))[0]
         return list(top_n)
+
+    def score_index(self, ranking: str, graph):
+        """Returns the heroes of a graph sorted by the scores of a ranking. The index is computed once per graph and
+        ranking.
+
+        :arg
+        ranking (str) - 'weighted_degree', 'pagerank' or 'core_number'.
+        graph (nx.Graph, Snapshot) - the graph to compute the scores on.
+
+        :return
+        a ScoreIndex.
+        """
+        from .ranking import RANKINGS, ScoreIndex
+
+        if ranking not in RANKINGS:
+            raise ValueError(f'Invalid ranking: {ranking}. Valid rankings: {[APPEARANCES, *RANKINGS]}.')
+        if graph is None:
+            raise ValueError(f'The ranking {ranking} needs a graph.')
+
+        indexes = self._indexes.setdefault(graph, {})
+        if ranking not in indexes:
+            # snapshots are ranked on the networkx graph they contain
+            scored = graph.to_networkx() if hasattr(graph, 'to_networkx') else graph
+            indexes[ranking] = ScoreIndex(RANKINGS[ranking](scored))
+
+        return indexes[ranking]
+
+    def top_by_score(self, min_score: float, ranking: str, graph):
+        """Returns all heroes with at least a given score, in decreasing order of their scores.
+
+        :arg
+        min_score (float) - the lowest score of a returned hero.
+        ranking (str) - 'weighted_degree', 'pagerank' or 'core_number'.
+        graph (nx.Graph, Snapshot) - the graph to compute the scores on.
+
+        :return
+        a list of heroes.
+        """
+        return self.score_index(ranking, graph).top_n(None, min_score)
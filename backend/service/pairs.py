@@ -0,0 +1,148 @@
+"""A persisted index of the number of collaborations of every pair of heroes.
+
+The index is a directory of .npy files that are memory-mapped when it is opened:
+
+* names.npy - the names of the heroes, sorted. The position of a name is the id of its hero.
+* keys.npy - the key of every pair, sorted: the smaller id in the high 32 bits and the larger one in the low bits.
+* n_collabs.npy - the number of collaborations of every pair, aligned with keys.
+* by_count.npy - the positions of the pairs sorted by their number of collaborations, in decreasing order.
+* offsets.npy, partner_ids.npy, partner_collabs.npy - the partners of every hero and their number of collaborations, in
+  decreasing order, with the partners of hero i at offsets[i]:offsets[i + 1].
+* pairs.json - the schema version and the sizes.
+
+Pair lookups are binary searches on the names and the keys, and the top pairs and top partners are slices, so no query
+loads a graph or the whole index. Pairs with the same number of collaborations are sorted by name.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = 1
+
+_META_FILE = 'pairs.json'
+
+
+def create_from(data, path: str, max_workers=None):
+    """Creates a pair index from a hero-network csv file or from pair counts.
+
+    :arg
+    data (str, pd.DataFrame) - the path of a hero-network csv file, which is preprocessed and counted like
+    collaborative.create_from does, or a dataframe with the columns hero_1, hero_2 and n_collabs, e.g. the hero_collabs
+    of GraphFeatures.
+    path (str) - the directory of the index. It is created if it does not exist.
+    max_workers (int) - the number of processes that count the pairs of a csv file. If None, the number of CPUs.
+
+    :return
+    the opened PairIndex.
+    """
+    if isinstance(data, str):
+        from backend.graph.chunked import count_hero_pairs
+
+        data = count_hero_pairs(data, max_workers)
+    if not isinstance(data, pd.DataFrame):
+        raise ValueError(f'The data must either be of type string or a pandas DataFrame. Received type: {type(data)}')
+
+    os.makedirs(path, exist_ok=True)
+    names, ids = np.unique(np.concatenate([data.hero_1.values, data.hero_2.values]).astype(str), return_inverse=True)
+    first, second = ids[:len(data)].astype(np.int64), ids[len(data):].astype(np.int64)
+    keys = (np.minimum(first, second) << 32) | np.maximum(first, second)
+
+    # pairs that occur more than once, e.g. in both orders, are summed
+    keys, inverse = np.unique(keys, return_inverse=True)
+    n_collabs = np.bincount(inverse, weights=data.n_collabs.values, minlength=len(keys)).astype(np.int64)
+    by_count = np.lexsort((keys, -n_collabs))
+
+    # the partners of every hero, the pairs are in both directions
+    heroes = np.concatenate([keys >> 32, keys & 0xFFFFFFFF])
+    partners = np.concatenate([keys & 0xFFFFFFFF, keys >> 32])
+    partner_collabs = np.concatenate([n_collabs, n_collabs])
+    order = np.lexsort((partners, -partner_collabs, heroes))
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heroes, minlength=len(names)), out=offsets[1:])
+
+    for name, array in [('names', names), ('keys', keys), ('n_collabs', n_collabs), ('by_count', by_count),
+                        ('offsets', offsets), ('partner_ids', partners[order]),
+                        ('partner_collabs', partner_collabs[order])]:
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+    # the meta file is written last, so that a directory without it is an incomplete index
+    with open(os.path.join(path, _META_FILE), 'w') as file:
+        json.dump({'version': SCHEMA_VERSION, 'n_heroes': len(names), 'n_pairs': len(keys)}, file, indent=2)
+
+    return PairIndex(path)
+
+
+class PairIndex:
+    """A read-only, memory-mapped index of the number of collaborations of every pair of heroes."""
+
+    def __init__(self, path: str):
+        """Opens a pair index.
+
+        :arg
+        path (str) - the directory of the index.
+        """
+        with open(os.path.join(path, _META_FILE)) as file:
+            meta = json.load(file)
+        if meta['version'] > SCHEMA_VERSION:
+            raise ValueError(f'The pair index was written with the newer version {meta["version"]}. This version only '
+                             f'reads versions up to {SCHEMA_VERSION}.')
+
+        self.path = path
+        for name in ['names', 'keys', 'n_collabs', 'by_count', 'offsets', 'partner_ids', 'partner_collabs']:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+    def __reduce__(self):
+        return PairIndex, (self.path,)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def hero_id(self, hero: str):
+        """Returns the id of a hero, or None if the hero has no collaborations."""
+        i = int(np.searchsorted(self.names, hero))
+        return i if i < len(self.names) and self.names[i] == hero else None
+
+    def collaborations(self, hero_1: str, hero_2: str):
+        """Returns the number of collaborations of two heroes, in either order. Heroes that never collaborated have 0
+        collaborations."""
+        first, second = self.hero_id(hero_1), self.hero_id(hero_2)
+        if first is None or second is None:
+            return 0
+
+        key = (min(first, second) << 32) | max(first, second)
+        i = int(np.searchsorted(self.keys, key))
+        return int(self.n_collabs[i]) if i < len(self.keys) and self.keys[i] == key else 0
+
+    def partners(self, hero: str, k: int = None):
+        """Returns the heroes that collaborated most often with a hero.
+
+        :arg
+        hero (str) - the hero.
+        k (int) - the number of partners. If None, all partners are returned.
+
+        :return
+        a list of (partner, n_collabs) tuples, in decreasing order of collaborations.
+        """
+        i = self.hero_id(hero)
+        if i is None:
+            return []
+
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        end = end if k is None else min(end, start + k)
+        return list(zip(self.names[self.partner_ids[start:end]].tolist(), self.partner_collabs[start:end].tolist()))
+
+    def top_pairs(self, k: int):
+        """Returns the pairs of heroes that collaborated most often.
+
+        :arg
+        k (int) - the number of pairs.
+
+        :return
+        a list of (hero_1, hero_2, n_collabs) tuples, in decreasing order of collaborations, where hero_1 < hero_2.
+        """
+        positions = np.asarray(self.by_count[:k])
+        keys = np.asarray(self.keys[positions])
+        return list(zip(self.names[keys >> 32].tolist(), self.names[keys & 0xFFFFFFFF].tolist(),
+                        self.n_collabs[positions].tolist()))
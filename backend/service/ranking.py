@@ -0,0 +1,78 @@
+"""A module for ranking heroes by scores that are computed on a graph.
+
+Every ranking function takes a collaborative or hero-comic graph and returns a dictionary of hero to score. Only heroes
+are scored: nodes with a 'type' attribute other than 'hero', i.e. comics, are left out.
+"""
+import networkx as nx
+import numpy as np
+
+
+class ScoreIndex:
+    """Heroes sorted by a score, in decreasing order. Heroes with the same score are sorted by name, so that the order
+    is reproducible."""
+
+    def __init__(self, scores: dict):
+        """Initialises the ScoreIndex.
+
+        :arg
+        scores (dict) - a dictionary of hero to score.
+        """
+        order = sorted(scores, key=lambda hero: (-scores[hero], str(hero)))
+        self.heroes = order
+        self.scores = np.array([scores[hero] for hero in order], dtype=float)
+        self.positions = {hero: i for i, hero in enumerate(order)}
+
+    def __len__(self):
+        return len(self.heroes)
+
+    def top_n(self, n: int, min_score=None):
+        """Returns the n heroes with the highest scores.
+
+        :arg
+        n (int) - the number of heroes. If None, all heroes are returned.
+        min_score (float) - if given, only heroes with at least this score are returned.
+
+        :return
+        a list of at most n heroes.
+        """
+        end = len(self.heroes) if min_score is None else self.count_above(min_score)
+        return self.heroes[:end if n is None else min(n, end)]
+
+    def count_above(self, min_score: float):
+        """Returns the number of heroes with at least the given score."""
+        # the scores are sorted in decreasing order, so their negation is sorted in increasing order
+        return int(np.searchsorted(-self.scores, -min_score, side='right'))
+
+    def score(self, hero):
+        """Returns the score of a hero."""
+        return self.scores[self.positions[hero]]
+
+
+def weighted_degree(graph):
+    """Scores heroes by the number of their collaborations, i.e. the sum of the 'n_collabs' of their edges. Edges
+    without 'n_collabs', e.g. those of the hero-comic graph, count once."""
+    return {hero: score for hero, score in graph.degree(weight='n_collabs') if _is_hero(graph, hero)}
+
+
+def pagerank(graph):
+    """Scores heroes by their PageRank, with the number of collaborations as edge weights."""
+    return {hero: score for hero, score in nx.pagerank(graph, weight='n_collabs').items() if _is_hero(graph, hero)}
+
+
+def core_number(graph):
+    """Scores heroes by their core number, the largest k such that the hero is part of the k-core of the graph.
+    Self loops are ignored."""
+    from backend.graph.core import core_numbers
+
+    return {hero: score for hero, score in core_numbers(graph).items() if _is_hero(graph, hero)}
+
+
+# The rankings that are computed on a graph. The 'appearances' ranking of the TopHeroService counts the appearances of
+# the heroes in comics instead and does not need a graph.
+RANKINGS = {'weighted_degree': weighted_degree,
+            'pagerank': pagerank,
+            'core_number': core_number}
+
+
+def _is_hero(graph, node):
+    return graph.nodes[node].get('type', 'hero') == 'hero'
@@ -0,0 +1,216 @@
+"""A registry that interns hero and comic names and resolves user input to them.
+
+Every name is interned to an integer id once. Names are looked up by a normalised key: upper case, with collapsed
+whitespace and without trailing characters that are not alphanumeric, like the preprocessing of the data does. Known
+spelling variants of the data are registered as aliases. Input that does not match a name or alias exactly is resolved
+by a unique prefix. Input that is the prefix of several names or only similar to names, by their trigrams, is not
+resolved, because e.g. 'IRON MAN' is as close to 'IRON MAN IV/JAMES R.' as to 'IRON MAN/TONY STARK'. It raises an error
+with suggestions instead.
+"""
+import bisect
+import re
+import sys
+
+import numpy as np
+
+# The spelling variants of the data, see the preprocess module.
+DEFAULT_ALIASES = {'SPIDER-MAN/PETER PAR': 'SPIDER-MAN/PETER PARKER',
+                   'SPIDER-MAN/PETER PARKERKER': 'SPIDER-MAN/PETER PARKER'}
+
+# The lowest trigram similarity of a fuzzy match, between 0 and 1.
+MIN_SIMILARITY = 0.5
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING = re.compile(r'[^0-9A-Z]+$')
+
+
+def normalise(name: str):
+    """Returns the key of a name: upper case, with collapsed whitespace and without trailing non alphanumeric
+    characters."""
+    return _TRAILING.sub('', _WHITESPACE.sub(' ', str(name).strip().upper()))
+
+
+class HeroRegistry:
+    """Interns hero and comic names to integer ids and resolves user input to names."""
+
+    def __init__(self, names: iter = (), aliases: dict = None):
+        """Initialises the HeroRegistry.
+
+        :arg
+        names (iter) - the names to intern.
+        aliases (dict) - a dictionary of alias to name. Defaults to DEFAULT_ALIASES.
+        """
+        self.names = []
+        self.ids = {}
+        self._keys = {}
+        self._prefix_index = None
+        self._trigram_index = None
+        self._key_ids = None
+        for name in names:
+            self.intern(name)
+        for alias, name in (DEFAULT_ALIASES if aliases is None else aliases).items():
+            if name in self.ids:
+                self.add_alias(alias, name)
+
+    @staticmethod
+    def from_graphs(*graphs):
+        """Creates a registry with the names of the heroes of the graphs. Comics are left out, so that hero input never
+        resolves to a comic.
+
+        :arg
+        *graphs (nx.Graph, Snapshot) - networkx graphs or graph snapshots, e.g. the collaborative and the hero-comic
+        graph. Nodes without a type are heroes.
+
+        :return
+        a HeroRegistry.
+        """
+        return HeroRegistry(hero for graph in graphs for hero in _heroes(graph))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def intern(self, name: str):
+        """Interns a name.
+
+        :arg
+        name (str) - a hero or comic name.
+
+        :return
+        the id of the name.
+        """
+        if name in self.ids:
+            return self.ids[name]
+
+        name = sys.intern(name)
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+        self._keys.setdefault(normalise(name), self.ids[name])
+        self._prefix_index = self._trigram_index = None
+        return self.ids[name]
+
+    def add_alias(self, alias: str, name: str):
+        """Registers an alternative spelling of a name.
+
+        :arg
+        alias (str) - the alternative spelling.
+        name (str) - the interned name.
+        """
+        self._keys[normalise(alias)] = self.ids[name]
+        self._prefix_index = self._trigram_index = None
+
+    def resolve(self, query: str, default=None):
+        """Resolves user input to a name.
+
+        The input is matched against the names and aliases, then against the prefixes of the names, where it has to be
+        the prefix of exactly one name. Input that is the prefix of several names, or that is at least MIN_SIMILARITY
+        similar to a name, is ambiguous: resolving it silently could run an analysis on a different hero. It raises a
+        ValueError that lists the suggestions for it.
+
+        :arg
+        query (str) - the user input.
+        default - the value to return when the input matches no name at all.
+
+        :return
+        the interned name, or the default.
+        """
+        if query in self.ids:
+            return self.names[self.ids[query]]
+
+        key = normalise(query)
+        if key in self._keys:
+            return self.names[self._keys[key]]
+
+        matches = self.prefixed(key, limit=2)
+        if len(matches) == 1:
+            return matches[0]
+
+        suggestions = self.suggest(query)
+        if len(matches) > 1 or (suggestions and suggestions[0][1] >= MIN_SIMILARITY):
+            raise ValueError(f'The hero {query!r} is ambiguous. Did you mean one of: '
+                             f'{[name for name, _ in suggestions]}?')
+
+        return default
+
+    def prefixed(self, prefix: str, limit=None):
+        """Returns the names whose keys start with a prefix, in the order of their keys. A name whose key and aliases
+        start with the prefix is returned once.
+
+        :arg
+        prefix (str) - the prefix. It is normalised like the names.
+        limit (int) - the maximum number of names to return.
+
+        :return
+        a list of names.
+        """
+        keys, ids = self._prefixes()
+        prefix = normalise(prefix)
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + '\uffff', lo=start)
+        found = {}
+        for i in range(start, end):
+            if limit is not None and len(found) >= limit:
+                break
+            found.setdefault(ids[i], None)
+        return [self.names[name_id] for name_id in found]
+
+    def suggest(self, query: str, k=5):
+        """Returns the names that are most similar to the input, by the Dice coefficient of their trigrams. The
+        similarity of a name is that of its most similar key or alias.
+
+        :arg
+        query (str) - the user input.
+        k (int) - the number of suggestions.
+
+        :return
+        a list of (name, similarity) tuples, in decreasing order of similarity.
+        """
+        postings, sizes = self._trigrams()
+        trigrams = [postings[trigram] for trigram in _trigrams(normalise(query)) if trigram in postings]
+        if not trigrams:
+            return []
+
+        shared = np.bincount(np.concatenate(trigrams), minlength=len(sizes))
+        similarity = 2 * shared / (len(_trigrams(normalise(query))) + sizes)
+        best = {}
+        for i in np.argsort(-similarity, kind='stable'):
+            if not shared[i] or len(best) >= k:
+                break
+            best.setdefault(self._key_ids[i], float(similarity[i]))
+        return [(self.names[name_id], score) for name_id, score in best.items()]
+
+    def _prefixes(self):
+        if self._prefix_index is None:
+            keys = sorted(self._keys)
+            self._prefix_index = keys, [self._keys[key] for key in keys]
+        return self._prefix_index
+
+    def _trigrams(self):
+        """The postings of every trigram, as arrays of key positions, and the number of trigrams of every key."""
+        if self._trigram_index is None:
+            keys = list(self._keys)
+            self._key_ids = [self._keys[key] for key in keys]
+            postings = {}
+            sizes = np.empty(len(keys), dtype=np.int64)
+            for i, key in enumerate(keys):
+                trigrams = _trigrams(key)
+                sizes[i] = len(trigrams)
+                for trigram in trigrams:
+                    postings.setdefault(trigram, []).append(i)
+            self._trigram_index = {trigram: np.array(ids, dtype=np.int64) for trigram, ids in postings.items()}, sizes
+        return self._trigram_index
+
+
+def _heroes(graph):
+    """The names of the hero nodes of a networkx graph or a graph snapshot."""
+    if hasattr(graph, 'types'):
+        names = graph.names.tolist()
+        return names if graph.types is None else [name for name, code in zip(names, graph.types.tolist()) if code == 0]
+    return [node for node, node_type in graph.nodes(data='type', default='hero') if node_type == 'hero']
+
+
+def _trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
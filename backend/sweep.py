@@ -0,0 +1,94 @@
+"""A module for running analyses over increasing numbers of top heroes.
+
+The top N heroes of a smaller N are part of the top heroes of every larger N. A sweep therefore selects the heroes of
+the largest N once and grows a single subgraph from one N to the next, adding the nodes and edges of the next heroes
+only. The connected components are kept up to date while the subgraph grows, see the ComponentIndex.
+"""
+import time
+
+import networkx as nx
+import pandas as pd
+
+from . import manager
+from .graph import ComponentIndex
+from .instrument import NULL_RECORDER
+
+
+def run(graph, sizes: iter, analyses: dict = None, neighbours=False, **kwargs):
+    """Runs analyses for increasing numbers of top heroes.
+
+    Every step reports the size, density, average degree and connected components of the subgraph of the top N heroes,
+    and the results of the analyses.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a graph snapshot.
+    sizes (iter) - the numbers of top heroes, e.g. [50, 100, 200]. Sizes above the number of heroes are left out.
+    analyses (dict) - a dictionary of name to function. Every function is called with the subgraph and the top heroes
+    of every step, and returns a value or a dictionary of column to value. The subgraph grows in place, so the functions
+    must not modify it.
+    neighbours (bool) - whether the neighbours of the heroes (e.g. their comics) are part of the subgraph.
+    **kwargs - the kwargs of the selection of the top heroes, e.g. ranking and min_score, see manager.select_top_n.
+    min_core is not supported, because the cores of nested subgraphs are not nested.
+    **recorder (Recorder) - records the 'top_n', 'subgraph' and 'algorithm' stages.
+
+    :return
+    a pandas dataframe with one row per size.
+    """
+    if kwargs.get('min_core'):
+        raise ValueError('min_core is not supported by sweeps, because the cores of nested subgraphs are not nested.')
+
+    sizes = sorted(set(sizes))
+    analyses = analyses or {}
+    recorder = kwargs.get('recorder', NULL_RECORDER)
+    if not sizes:
+        return pd.DataFrame()
+
+    # the subgraph of the largest N contains all edges that the sweep can add
+    top_heroes, source = manager.select_top_n(graph, sizes[-1], neighbours=neighbours, **kwargs)
+
+    subgraph = nx.Graph()
+    components = ComponentIndex(subgraph)
+    rows, added = [], 0
+    for top_n in sizes:
+        if top_n > len(top_heroes):
+            break
+
+        start = time.perf_counter()
+        with recorder.stage('subgraph'):
+            for hero in top_heroes[added:top_n]:
+                _add_node(subgraph, components, source, hero)
+                if neighbours and hero in source:
+                    for neighbour in source.adj[hero]:
+                        _add_node(subgraph, components, source, neighbour)
+            added = top_n
+
+        with recorder.stage('algorithm'):
+            n_nodes, n_edges = subgraph.number_of_nodes(), subgraph.number_of_edges()
+            row = {'top_n': top_n,
+                   'n_nodes': n_nodes,
+                   'n_edges': n_edges,
+                   'density': nx.density(subgraph),
+                   'avg_degree': 2 * n_edges / n_nodes if n_nodes else 0.0,
+                   'n_components': len(components),
+                   'largest_component': max(map(len, components.members.values()), default=0)}
+
+            for name, analysis in analyses.items():
+                value = analysis(subgraph, top_heroes[:top_n])
+                row.update({f'{name}_{column}': item for column, item in value.items()} if isinstance(value, dict)
+                           else {name: value})
+
+        row['seconds'] = time.perf_counter() - start
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def _add_node(subgraph, components, source, node):
+    """Adds a node of the source graph to the subgraph, with its edges to the nodes that are already part of it. Nodes
+    that are not part of the source graph are left out, like in its subgraphs."""
+    if node in subgraph or node not in source:
+        return
+
+    components.add_node(subgraph, node, **source.nodes[node])
+    components.add_edges_from(subgraph, [(node, neighbour, attributes)
+                                         for neighbour, attributes in source.adj[node].items() if neighbour in subgraph])
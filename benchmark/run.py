@@ -0,0 +1,218 @@
+"""Benchmarks the graph construction, the hero service and all controller functions on synthetic data.
+
+Run it from the repository root:
+
+    python -m benchmark.run --sizes 10 50 100 500 1000 6000 --output bench.json --baseline benchmark/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from backend import Controller, manager
+from backend.describe import GraphType
+from backend.graph import collaborative, hero_comic
+from backend.instrument import run_instrumented
+from backend.service import TopHeroService
+from . import synthetic
+
+DEFAULT_SIZES = (10, 50, 100, 500, 1000, 2000, 6000)
+
+# The largest top_n that each function is benchmarked with unless --full is given. Girvan-Newman and the min cut grow
+# much faster than the other functions and would dominate the run time of the whole suite.
+DEFAULT_LIMITS = {'disconnecting_graphs': 1000,
+                  'extract_communities': 50}
+
+
+def measure(func, repeat=1, trace_memory=True):
+    """Measures the best time out of a number of runs and the memory peak of a function.
+
+    :arg
+    func (function) - a function without parameters.
+    repeat (int) - the number of timed runs.
+    trace_memory (bool) - whether to make an extra run with tracemalloc to measure the memory peak.
+
+    :return
+    (any, float, int) - the result of the last run, the best time in seconds and the memory peak in bytes, or -1.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_bytes = -1
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result, seconds, peak_bytes
+
+
+def _entry(name, top_n, seconds, peak_bytes, items, unit, stages=None):
+    return {'name': name,
+            'top_n': top_n,
+            'seconds': seconds,
+            'peak_bytes': peak_bytes,
+            'items': items,
+            'unit': unit,
+            'throughput': items / seconds if seconds else None,
+            'stages': stages or {}}
+
+
+def _jobs(top_heroes):
+    """The controller jobs of the benchmark, with kwargs taken from the top heroes."""
+    first, second, third = top_heroes[0], top_heroes[1], top_heroes[min(2, len(top_heroes) - 1)]
+    return {'features': (GraphType.COLLABORATIVE, {'graph_type': GraphType.COLLABORATIVE}),
+            'features[hero_comic]': (GraphType.HERO_COMIC, {'graph_type': GraphType.HERO_COMIC}),
+            'metrics': (GraphType.COLLABORATIVE, {'node': first, 'metric': 'closeness_centrality'}),
+            'shortest_order_route': (GraphType.HERO_COMIC, {'initial_hero': first, 'final_hero': third,
+                                                            'superheroes': [second]}),
+            'disconnecting_graphs': (GraphType.COLLABORATIVE, {'hero_a': first, 'hero_b': second}),
+            'extract_communities': (GraphType.COLLABORATIVE, {'hero_1': first, 'hero_2': second})}
+
+
+def run(directory, sizes=DEFAULT_SIZES, functions=None, repeat=1, trace_memory=True, full=False):
+    """Runs the benchmark suite on the data in the directory.
+
+    :arg
+    directory (str) - a directory with hero-network.csv, edges.csv and nodes.csv.
+    sizes (iter) - the top_n values to benchmark the controller functions with.
+    functions (iter) - the controller functions to benchmark. If None, all of them.
+    repeat (int) - the number of timed runs of each benchmark. The best time is reported.
+    trace_memory (bool) - whether to measure memory peaks.
+    full (bool) - whether to ignore DEFAULT_LIMITS.
+
+    :return
+    a list of benchmark entries.
+    """
+    hero_network_path, edges_path, nodes_path = (os.path.join(directory, name)
+                                                 for name in ['hero-network.csv', 'edges.csv', 'nodes.csv'])
+    results = []
+    n_pairs = sum(1 for _ in open(hero_network_path)) - 1
+    n_appearances = sum(1 for _ in open(edges_path)) - 1
+
+    (collab_graph, _), seconds, peak = measure(lambda: collaborative.create_from(data=hero_network_path), repeat,
+                                               trace_memory)
+    results.append(_entry('collaborative.create_from', None, seconds, peak, n_pairs, 'rows'))
+
+    (hero_comic_graph, _), seconds, peak = measure(lambda: hero_comic.create_from(nodes=nodes_path, edges=edges_path),
+                                                   repeat, trace_memory)
+    results.append(_entry('hero_comic.create_from', None, seconds, peak, n_appearances, 'rows'))
+
+    hero_service, seconds, peak = measure(lambda: TopHeroService.create_from(edges_path), repeat, trace_memory)
+    results.append(_entry('TopHeroService.create_from', None, seconds, peak, n_appearances, 'rows'))
+
+    for top_n in sizes:
+        _, seconds, peak = measure(lambda: TopHeroService(hero_service.heroes).top_n(top_n), repeat, trace_memory)
+        results.append(_entry('TopHeroService.top_n', top_n, seconds, peak, n_appearances, 'rows'))
+
+    manager.hero_service = hero_service
+    controllers = {GraphType.COLLABORATIVE: Controller(collab_graph), GraphType.HERO_COMIC: Controller(hero_comic_graph)}
+    sizes = [top_n for top_n in sizes if top_n <= len(set(hero_service.heroes))]
+
+    for top_n in sizes:
+        top_heroes = hero_service.top_n(top_n)
+        for name, (graph_type, kwargs) in _jobs(top_heroes).items():
+            identifier = name.split('[')[0]
+            if functions and identifier not in functions:
+                continue
+            if not full and top_n > DEFAULT_LIMITS.get(identifier, top_n):
+                continue
+
+            controller = controllers[graph_type]
+            _, seconds, _ = measure(lambda: controller.run(identifier, top_n, **kwargs), repeat, trace_memory=False)
+
+            instrumented = run_instrumented(controller.funcs[identifier], identifier, controller.graph, top_n,
+                                            trace_memory=trace_memory, **kwargs)
+            record = instrumented.record
+            n_nodes, n_edges = record.sizes.get('subgraph', (0, 0))
+            stages = {stage.name: stage.seconds for stage in record.stages}
+            results.append(_entry(name, top_n, seconds, record.peak_bytes, n_nodes + n_edges, 'nodes+edges', stages))
+            print(f'{name:<28} top_n={top_n:<6} {seconds:10.4f}s', file=sys.stderr)
+
+    return results
+
+
+def compare(results, baseline, tolerance=1.5):
+    """Compares benchmark results against a baseline.
+
+    :arg
+    results (list) - the benchmark entries of this run.
+    baseline (list) - the benchmark entries of the baseline.
+    tolerance (float) - the factor by which a benchmark may be slower than its baseline before it is a regression.
+
+    :return
+    a list of comparisons with the name, top_n, seconds, baseline seconds, the ratio and whether it regressed.
+    """
+    baseline = {(entry['name'], entry['top_n']): entry for entry in baseline}
+    comparisons = []
+    for entry in results:
+        base = baseline.get((entry['name'], entry['top_n']))
+        if not base or not base['seconds']:
+            continue
+
+        ratio = entry['seconds'] / base['seconds']
+        comparisons.append({'name': entry['name'],
+                            'top_n': entry['top_n'],
+                            'seconds': entry['seconds'],
+                            'baseline_seconds': base['seconds'],
+                            'ratio': ratio,
+                            'regression': ratio > tolerance})
+
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the Marvel hero graphs on synthetic data.')
+    parser.add_argument('--data', help='a directory with the csv files. If not given, synthetic data is generated.')
+    parser.add_argument('--heroes', type=int, default=6439)
+    parser.add_argument('--comics', type=int, default=12651)
+    parser.add_argument('--exponent', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--functions', nargs='+', help='the controller functions to benchmark. Defaults to all.')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='do not measure memory peaks.')
+    parser.add_argument('--full', action='store_true', help=f'ignore the top_n limits: {DEFAULT_LIMITS}.')
+    parser.add_argument('--output', help='the path of the json report. Defaults to stdout.')
+    parser.add_argument('--baseline', help='the path of a json report to compare against.')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    config = {key: value for key, value in vars(args).items() if key not in {'output', 'baseline'}}
+    config['python'] = platform.python_version()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.data:
+            synthetic.write(directory, n_heroes=args.heroes, n_comics=args.comics, exponent=args.exponent,
+                            seed=args.seed)
+        results = run(args.data or directory, args.sizes, args.functions, args.repeat, not args.no_memory, args.full)
+
+    report = {'config': config, 'results': results}
+    if args.baseline:
+        with open(args.baseline) as file:
+            report['comparison'] = compare(results, json.load(file)['results'], args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if any(comparison['regression'] for comparison in report.get('comparison', [])):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""A generator of synthetic Marvel-like hero and comic data.
+
+Every hero appears in a number of comics that follows a power law, so that a few heroes appear in very many comics,
+like CAPTAIN AMERICA or SPIDER-MAN/PETER PARKER, and most heroes appear in only a handful. Comics are picked with
+heavy-tailed popularity as well. The generated data has the same columns as the Kaggle files:
+
+* hero-network.csv - hero1, hero2: one row per pair of heroes that appear in the same comic.
+* edges.csv - hero, comic: one row per appearance of a hero in a comic.
+* nodes.csv - node, type: one row per hero or comic.
+"""
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def generate(n_heroes=6439, n_comics=12651, exponent=2.0, max_appearances=None, seed=0):
+    """Generates synthetic hero-comic data.
+
+    :arg
+    n_heroes (int) - the number of heroes.
+    n_comics (int) - the number of comics.
+    exponent (float) - the exponent of the power law of the number of appearances per hero. Lower is heavier-tailed.
+    max_appearances (int) - the maximum number of comics of a single hero. Defaults to a tenth of the comics.
+    seed (int) - the seed of the random generator.
+
+    :return
+    (pd.DataFrame, pd.DataFrame, pd.DataFrame) - the hero network, the edges and the nodes.
+    """
+    rng = np.random.default_rng(seed)
+    max_appearances = max_appearances or max(1, n_comics // 10)
+
+    heroes = np.array([f'HERO {i:06d}' for i in range(n_heroes)], dtype=object)
+    comics = np.array([f'COMIC {i:06d}' for i in range(n_comics)], dtype=object)
+
+    appearances = np.minimum(rng.zipf(exponent, n_heroes), max_appearances)
+    popularity = rng.pareto(1.5, n_comics) + 1
+    popularity /= popularity.sum()
+
+    hero_ids, comic_ids = [], []
+    for hero_id, n_appearances in enumerate(appearances):
+        hero_comics = np.unique(rng.choice(n_comics, size=n_appearances, p=popularity))
+        hero_ids.append(np.full(len(hero_comics), hero_id))
+        comic_ids.append(hero_comics)
+
+    hero_ids, comic_ids = np.concatenate(hero_ids), np.concatenate(comic_ids)
+    edges = pd.DataFrame({'hero': heroes[hero_ids], 'comic': comics[comic_ids]})
+
+    order = np.argsort(comic_ids, kind='stable')
+    sorted_heroes, sorted_comics = hero_ids[order], comic_ids[order]
+    boundaries = np.flatnonzero(np.diff(sorted_comics)) + 1
+    pairs = [pair for comic_heroes in np.split(sorted_heroes, boundaries)
+             for pair in itertools.combinations(comic_heroes, 2)]
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    hero_network = pd.DataFrame({'hero1': heroes[pairs[:, 0]], 'hero2': heroes[pairs[:, 1]]})
+
+    nodes = pd.DataFrame({'node': np.concatenate([heroes, comics]),
+                          'type': ['hero'] * n_heroes + ['comic'] * n_comics})
+
+    return hero_network, edges, nodes
+
+
+def write(directory: str, **kwargs):
+    """Generates synthetic hero-comic data and writes it as csv files.
+
+    :arg
+    directory (str) - the directory to write hero-network.csv, edges.csv and nodes.csv to.
+    **kwargs - the parameters of generate.
+
+    :return
+    (str, str, str) - the paths of the hero network, the edges and the nodes files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = tuple(os.path.join(directory, name) for name in ['hero-network.csv', 'edges.csv', 'nodes.csv'])
+
+    for data, path in zip(generate(**kwargs), paths):
+        data.to_csv(path, index=False)
+
+    return paths
@@ -1 +1,6 @@
-from .visualisations import visualise_disconnected_graph, visualise_metrics, visualise_communities, visualise_features, visualize_shortest_path
+from backend import lazy
+
+__all__ = ['visualise_disconnected_graph', 'visualise_metrics', 'visualise_communities', 'visualise_features',
+           'visualize_shortest_path']
+
+__getattr__, __dir__ = lazy.attach(__name__, {name: ('.visualisations', name) for name in __all__})
@@ -0,0 +1,208 @@
+"""Module for exporting graphs to vis.js JSON and HTML files.
+
+pyvis keeps every node and edge as a Python dictionary and renders the whole HTML page in memory, which needs gigabytes
+for the full hero-comic graph. The functions of this module stream the nodes and edges straight from the graph into the
+file instead, a chunk at a time, so the memory use is bounded by the chunk size and the positions of the nodes.
+Snapshots are read straight from their memory-mapped arrays, a chunk of nodes at a time, without building the networkx
+graph. They are not laid out, so their positions have to be given.
+
+The nodes have fixed positions and physics is disabled, so that browsers can show graphs with tens of thousands of
+nodes without simulating them.
+"""
+import html
+import json
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+
+from backend.graph.snapshot import Snapshot
+from .layout import compute_layout
+
+# The number of nodes or edges that are encoded and written at once.
+CHUNK_SIZE = 10000
+
+DEFAULT_COLOR = '#97c2fc'
+
+VIS_NETWORK_JS = 'https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js'
+
+_OPTIONS = {'physics': {'enabled': False},
+            'edges': {'smooth': False, 'color': {'inherit': True}},
+            'interaction': {'hideEdgesOnDrag': True, 'tooltipDelay': 200}}
+
+_HTML_HEAD = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{script}"></script>
+<style>
+body {{ margin: 0; }}
+#network {{ width: 100%; height: {height}; }}
+</style>
+</head>
+<body>
+<div id="network"></div>
+<script type="application/json" id="data">
+'''
+
+_HTML_TAIL = '''
+</script>
+<script>
+var data = JSON.parse(document.getElementById("data").textContent);
+var network = new vis.Network(document.getElementById("network"),
+                              {{nodes: new vis.DataSet(data.nodes), edges: new vis.DataSet(data.edges)}},
+                              {options});
+</script>
+</body>
+</html>
+'''
+
+
+def iter_nodes(graph: nx.Graph, positions: dict = None, colors: dict = None, size=10, chunk_size=CHUNK_SIZE):
+    """Generates the vis.js nodes of a graph.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a snapshot.
+    positions (dict) - a dictionary of node to (x, y) position. If None, vis.js places the nodes itself.
+    colors (dict) - a dictionary of node to color. Nodes that are not in it have the default color.
+    size (int) - the size of the nodes.
+    chunk_size (int) - the number of names that are read from a snapshot at once.
+
+    :return
+    a generator of vis.js node dictionaries.
+    """
+    colors = colors or {}
+    nodes = _snapshot_nodes(graph, chunk_size) if isinstance(graph, Snapshot) else graph.nodes()
+    for node in nodes:
+        vis_node = {'id': _id(node), 'label': str(node), 'color': colors.get(node, DEFAULT_COLOR), 'size': size,
+                    'shape': 'dot'}
+        if positions is not None:
+            x, y = positions[node]
+            # the minus is needed here to respect the networkx y-axis convention
+            vis_node['x'], vis_node['y'] = round(float(x), 2), -round(float(y), 2)
+        yield vis_node
+
+
+def iter_edges(graph: nx.Graph, chunk_size=CHUNK_SIZE):
+    """Generates the vis.js edges of a graph. The weight of an edge is its width, unless it is 1.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a snapshot.
+    chunk_size (int) - the number of nodes whose edges are read from a snapshot at once.
+
+    :return
+    a generator of vis.js edge dictionaries.
+    """
+    edges = _snapshot_edges(graph, chunk_size) if isinstance(graph, Snapshot) else graph.edges(data='weight', default=1)
+    for u, v, weight in edges:
+        edge = {'from': _id(u), 'to': _id(v)}
+        if weight != 1:
+            edge['width'] = float(weight)
+        yield edge
+
+
+def write_json(graph: nx.Graph, path: str, positions: dict = None, colors: dict = None, size=10,
+               chunk_size=CHUNK_SIZE, layout=True):
+    """Writes a graph to a vis.js compatible JSON file of the form {"nodes": [...], "edges": [...]}.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a snapshot.
+    path (str) - the path of the JSON file.
+    positions (dict) - a dictionary of node to (x, y) position. If None, it is computed with compute_layout, except
+    for snapshots.
+    colors (dict) - a dictionary of node to color.
+    size (int) - the size of the nodes.
+    chunk_size (int) - the number of nodes or edges that are encoded and written at once.
+    layout (bool) - whether to compute positions when none are given.
+
+    :return
+    the path of the JSON file.
+    """
+    if positions is None and layout and not isinstance(graph, Snapshot):
+        positions = compute_layout(graph)
+
+    with open(path, 'w', encoding='utf-8') as file:
+        _write_data(file, graph, positions, colors, size, chunk_size)
+
+    return path
+
+
+def write_html(graph: nx.Graph, path: str, positions: dict = None, colors: dict = None, size=10, height='1080px',
+               title='Marvel heroes', chunk_size=CHUNK_SIZE, layout=True):
+    """Writes a graph to a standalone vis.js HTML page.
+
+    :arg
+    graph (nx.Graph, Snapshot) - a networkx graph or a snapshot.
+    path (str) - the path of the HTML file.
+    positions (dict) - a dictionary of node to (x, y) position. If None, it is computed with compute_layout, except
+    for snapshots.
+    colors (dict) - a dictionary of node to color.
+    size (int) - the size of the nodes.
+    height (str) - the CSS height of the network.
+    title (str) - the title of the page.
+    chunk_size (int) - the number of nodes or edges that are encoded and written at once.
+    layout (bool) - whether to compute positions when none are given.
+
+    :return
+    the path of the HTML file.
+    """
+    if positions is None and layout and not isinstance(graph, Snapshot):
+        positions = compute_layout(graph)
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(_HTML_HEAD.format(title=html.escape(title), script=VIS_NETWORK_JS, height=height))
+        _write_data(file, graph, positions, colors, size, chunk_size, escape=True)
+        file.write(_HTML_TAIL.format(options=json.dumps(_OPTIONS)))
+
+    return path
+
+
+def _write_data(file, graph, positions, colors, size, chunk_size, escape=False):
+    file.write('{"nodes": [')
+    _write_items(file, iter_nodes(graph, positions, colors, size, chunk_size), chunk_size, escape)
+    file.write('], "edges": [')
+    _write_items(file, iter_edges(graph, chunk_size), chunk_size, escape)
+    file.write(']}')
+
+
+def _write_items(file, items, chunk_size, escape):
+    """Writes the items as comma separated JSON, encoding a chunk of items at a time."""
+    first = True
+    while chunk := list(islice(items, chunk_size)):
+        encoded = ', '.join(json.dumps(item, default=_default) for item in chunk)
+        if escape:
+            # a '</' inside of the data would end the script element of the page
+            encoded = encoded.replace('</', '<\\/')
+        file.write(encoded if first else ', ' + encoded)
+        first = False
+
+
+def _snapshot_nodes(snapshot, chunk_size):
+    for start in range(0, snapshot.n_nodes, chunk_size):
+        yield from snapshot.names[start:start + chunk_size].tolist()
+
+
+def _snapshot_edges(snapshot, chunk_size):
+    """Generates the (u, v, weight) edges of a snapshot, reading the neighbours of a chunk of nodes at a time."""
+    for start in range(0, snapshot.n_nodes, chunk_size):
+        end = min(start + chunk_size, snapshot.n_nodes)
+        offsets = np.asarray(snapshot.offsets[start:end + 1])
+        sources = np.repeat(np.arange(start, end), np.diff(offsets))
+        targets = np.asarray(snapshot.neighbours[offsets[0]:offsets[-1]])
+        # every edge is stored in both directions, keep it once
+        keep = sources < targets
+        weights = np.ones(keep.sum()) if snapshot.weights is None \
+            else np.asarray(snapshot.weights[offsets[0]:offsets[-1]])[keep]
+        yield from zip(snapshot.names[sources[keep]].tolist(), snapshot.names[targets[keep]].tolist(), weights.tolist())
+
+
+def _id(node):
+    # numpy scalars are not json serialisable
+    return node.item() if hasattr(node, 'item') else node
+
+
+def _default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
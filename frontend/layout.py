@@ -0,0 +1,381 @@
+"""Module for computing node positions of graph visualisations.
+
+Spring layouts cost O(n²) per iteration, which makes them unusable beyond a few hundred nodes. Large graphs are laid
+out with pivot MDS instead, a sparse stress layout that needs one breadth first search per pivot and a small SVD. Every
+connected component is laid out on its own and the components are packed next to each other.
+
+Layouts are cached by the fingerprint of the graph, so the same graph is only laid out once, even if it is rendered
+with different colours. A PositionStore also persists the positions on disk, so that they are reused by later
+processes. Graphs that were not laid out before, but share most of their nodes with earlier layouts, are warm-started
+from the stored positions of these nodes, which keeps the layouts stable from one render to the next.
+"""
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import networkx as nx
+import numpy as np
+
+# Graphs with at most this many nodes are laid out with a spring layout when the method is 'auto'.
+SPRING_MAX_NODES = 200
+
+# The maximum number of layouts that are kept in memory.
+CACHE_SIZE = 32
+
+# The minimum share of nodes with stored positions for a layout to be warm-started from them.
+WARM_START_MIN_OVERLAP = 0.5
+
+# The number of spring or stress iterations that move the new nodes of a warm-started layout.
+WARM_START_ITERATIONS = 20
+
+# The number of hops around a new node of a warm-started stress layout whose distances it is placed by.
+WARM_START_RADIUS = 3
+
+# The maximum number of last known node positions that a PositionStore keeps per layout method and scale. The least
+# recently saved nodes are dropped first.
+KNOWN_MAX_NODES = 100_000
+
+# The environment variable with the directory of the default PositionStore.
+STORE_ENV = 'MARVEL_LAYOUT_STORE'
+
+_cache = OrderedDict()
+
+
+def fingerprint(graph: nx.Graph):
+    """Computes a fingerprint of the nodes and edges of a graph, independent of their order.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+
+    :return
+    a hex string that is the same for graphs with the same nodes and edges.
+    """
+    digest = hashlib.sha1()
+    for node in sorted(map(str, graph.nodes())):
+        digest.update(node.encode())
+        digest.update(b'\0')
+
+    digest.update(b'\1')
+    for edge in sorted('\0'.join(sorted((str(u), str(v)))) for u, v in graph.edges()):
+        digest.update(edge.encode())
+        digest.update(b'\1')
+
+    return digest.hexdigest()
+
+
+class PositionStore:
+    """Persists node positions on disk, keyed by the fingerprint of the graph.
+
+    Every layout is stored in its own .npz file. Additionally, the last known position of every node is kept per
+    layout method and scale, which is used to warm-start the layouts of graphs that were not laid out before.
+    """
+
+    def __init__(self, directory: str):
+        """Initialises the PositionStore.
+
+        :arg
+        directory (str) - the directory where the positions are stored. It is created if it does not exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, key: str):
+        return os.path.exists(os.path.join(self.directory, f'{key}.npz'))
+
+    def load(self, graph: nx.Graph, key: str):
+        """Loads the positions of a graph.
+
+        :arg
+        graph (nx.Graph) - the graph the positions belong to.
+        key (str) - the key of the layout, see _layout_key.
+
+        :return
+        a dictionary of node to an (x, y) numpy array, or None if there are no positions for the key.
+        """
+        path = os.path.join(self.directory, f'{key}.npz')
+        if not os.path.exists(path):
+            return None
+
+        return _positions_of(graph, *self._read(path))
+
+    def known(self, graph: nx.Graph, method: str, scale: float):
+        """Loads the last known positions of the nodes of a graph.
+
+        :arg
+        graph (nx.Graph) - a networkx graph.
+        method (str) - the layout method.
+        scale (float) - the scale of the layout.
+
+        :return
+        a dictionary of node to an (x, y) numpy array with all nodes of the graph that have a known position.
+        """
+        path = self._known_path(method, scale)
+        if not os.path.exists(path):
+            return {}
+
+        return _positions_of(graph, *self._read(path))
+
+    def save(self, key: str, method: str, scale: float, positions: dict):
+        """Saves the positions of a layout and updates the last known positions of its nodes. The last known positions
+        are capped at KNOWN_MAX_NODES. Concurrent saves may overwrite each other's last known positions, which only
+        loses warm-start hints, never a stored layout.
+
+        :arg
+        key (str) - the key of the layout, see _layout_key.
+        method (str) - the layout method.
+        scale (float) - the scale of the layout.
+        positions (dict) - a dictionary of node to (x, y) position.
+        """
+        names = np.array([str(node) for node in positions], dtype=str)
+        coordinates = np.array(list(positions.values()), dtype=float).reshape(-1, 2)
+        self._write(os.path.join(self.directory, f'{key}.npz'), names, coordinates)
+
+        path = self._known_path(method, scale)
+        known = dict(zip(*self._read(path))) if os.path.exists(path) else {}
+        # the saved nodes move to the end, so that the least recently saved nodes are dropped first
+        for name in names:
+            known.pop(name, None)
+        known.update(zip(names, coordinates))
+        kept = list(known.items())[-KNOWN_MAX_NODES:]
+        self._write(path, np.array([name for name, _ in kept], dtype=str),
+                    np.array([coordinate for _, coordinate in kept], dtype=float).reshape(-1, 2))
+
+    def _known_path(self, method, scale):
+        return os.path.join(self.directory, f'known-{method}-{scale}.npz')
+
+    @staticmethod
+    def _read(path):
+        with np.load(path) as data:
+            return data['names'], data['coordinates']
+
+    @staticmethod
+    def _write(path, names, coordinates):
+        # write to a temporary file first, so that concurrent readers never see a partially written file
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp.npz', delete=False) as file:
+            np.savez(file, names=names, coordinates=coordinates)
+        os.replace(file.name, path)
+
+
+def default_store():
+    """Returns a PositionStore in the directory of the MARVEL_LAYOUT_STORE environment variable, or None if it is not
+    set."""
+    directory = os.environ.get(STORE_ENV)
+    return PositionStore(directory) if directory else None
+
+
+def compute_layout(graph: nx.Graph, method='auto', scale=1000, seed=0, store: PositionStore = None):
+    """Computes the positions of the nodes of a graph.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    method (str) - either 'spring', 'stress' or 'auto'. 'auto' uses the spring layout for small graphs and the stress
+    layout for large graphs.
+    scale (float) - the scale of the positions.
+    seed (int) - the seed of the random choices of the layout.
+    store (PositionStore) - a store of positions on disk. If given, stored positions are reused or used to warm-start
+    the layout, and the positions are stored, also when they were cached in memory before.
+
+    :return
+    a dictionary of node to an (x, y) numpy array.
+    """
+    if method == 'auto':
+        method = 'spring' if graph.number_of_nodes() <= SPRING_MAX_NODES else 'stress'
+    if method not in {'spring', 'stress'}:
+        raise ValueError(f'Invalid layout method: {method}.')
+
+    key = _layout_key(graph, method, scale, seed)
+    if key in _cache:
+        _cache.move_to_end(key)
+        if store and key not in store:
+            store.save(key, method, scale, _cache[key])
+        return _cache[key]
+
+    positions = store.load(graph, key) if store else None
+    if positions is None:
+        known = store.known(graph, method, scale) if store else {}
+        if graph.number_of_nodes() and len(known) >= WARM_START_MIN_OVERLAP * graph.number_of_nodes():
+            positions = warm_start_layout(graph, known, method, seed)
+        elif method == 'spring':
+            positions = nx.spring_layout(graph, scale=scale, seed=seed)
+        else:
+            positions = stress_layout(graph, scale=scale, seed=seed)
+
+        if store:
+            store.save(key, method, scale, positions)
+
+    _cache[key] = positions
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return positions
+
+
+def warm_start_layout(graph: nx.Graph, known: dict, method='stress', seed=0):
+    """Computes a layout that keeps the known positions and places the other nodes around them.
+
+    The other nodes are placed at the mean position of their placed neighbours, with a small seeded offset. Only these
+    nodes are then moved with a few iterations: of the spring layout, or of stress majorization towards their graph
+    distances to the nodes within WARM_START_RADIUS hops, so that e.g. a new leaf does not sit on its neighbour.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    known (dict) - a dictionary of node to known (x, y) position.
+    method (str) - either 'spring' or 'stress'.
+    seed (int) - the seed of the offsets of the new nodes.
+
+    :return
+    a dictionary of node to an (x, y) numpy array.
+    """
+    positions = {node: np.asarray(position, dtype=float) for node, position in known.items() if node in graph}
+    missing = new = [node for node in graph.nodes() if node not in positions]
+    rng = np.random.default_rng(seed)
+    unit = _edge_length(graph, positions)
+
+    # every round places the nodes that have a placed neighbour, so chains of new nodes are placed one hop per round
+    while missing:
+        placed = {}
+        for node in missing:
+            neighbours = [positions[neighbour] for neighbour in graph.neighbors(node) if neighbour in positions]
+            if neighbours:
+                placed[node] = np.mean(neighbours, axis=0) + rng.normal(size=2) * 0.1 * unit
+
+        if not placed:
+            break
+        positions.update(placed)
+        missing = [node for node in missing if node not in placed]
+
+    # nodes without any placed neighbour are scattered around the center of the known positions
+    if missing:
+        coordinates = np.array(list(positions.values()))
+        center, spread = coordinates.mean(axis=0), coordinates.std(axis=0) + 1
+        for node in missing:
+            positions[node] = center + rng.normal(size=2) * spread
+
+    if method == 'spring':
+        fixed = [node for node in known if node in graph]
+        if len(fixed) < graph.number_of_nodes():
+            positions = nx.spring_layout(graph, pos=positions, fixed=fixed, iterations=WARM_START_ITERATIONS, seed=seed)
+    elif new:
+        _refine_stress(graph, positions, new, unit)
+
+    return positions
+
+
+def _edge_length(graph, positions):
+    """The mean length of the edges between positioned nodes, or 1 if there are none."""
+    lengths = [np.linalg.norm(positions[u] - positions[v]) for u, v in graph.edges()
+               if u in positions and v in positions and u != v]
+    length = np.mean(lengths) if lengths else 0.0
+    return length if length > 0 else 1.0
+
+
+def _refine_stress(graph, positions, nodes, unit):
+    """Moves only the nodes by stress majorization, towards their hop distances times the unit to the nodes within
+    WARM_START_RADIUS hops. The other positions are kept."""
+    targets = []
+    for node in nodes:
+        hops = nx.single_source_shortest_path_length(graph, node, cutoff=WARM_START_RADIUS)
+        others = [other for other in hops if other != node]
+        distances = np.array([hops[other] for other in others], dtype=float) * unit
+        targets.append((node, others, distances, distances ** -2))
+
+    for _ in range(WARM_START_ITERATIONS):
+        for node, others, distances, weights in targets:
+            if not others:
+                continue
+            coordinates = np.array([positions[other] for other in others])
+            differences = positions[node] - coordinates
+            norms = np.maximum(np.linalg.norm(differences, axis=1), 1e-9 * unit)
+            updates = coordinates + differences * (distances / norms)[:, None]
+            positions[node] = (weights[:, None] * updates).sum(axis=0) / weights.sum()
+
+
+def _layout_key(graph, method, scale, seed):
+    return f'{fingerprint(graph)}-{method}-{scale}-{seed}'
+
+
+def _positions_of(graph, names, coordinates):
+    """Maps stored node names back to the nodes of the graph."""
+    nodes = {str(node): node for node in graph.nodes()}
+    return {nodes[name]: coordinate for name, coordinate in zip(names, coordinates) if name in nodes}
+
+
+def stress_layout(graph: nx.Graph, n_pivots=50, scale=1000, seed=0):
+    """Computes a pivot MDS layout of every connected component and packs the components next to each other.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    n_pivots (int) - the number of pivots of every component. More pivots are slower and more precise.
+    scale (float) - the scale of the positions.
+    seed (int) - the seed of the choice of the first pivot.
+
+    :return
+    a dictionary of node to an (x, y) numpy array.
+    """
+    rng = np.random.default_rng(seed)
+    components = sorted((list(component) for component in nx.connected_components(graph)), key=len, reverse=True)
+    layouts = [_pivot_mds(graph.subgraph(component), component, n_pivots, rng) for component in components]
+
+    # pack the components into rows that are roughly as wide as the square root of the total area
+    widths = [layout.max(axis=0) - layout.min(axis=0) + 1 if len(layout) else np.ones(2) for layout in layouts]
+    row_width = np.sqrt(sum(width[0] * width[1] for width in widths)) * 1.2
+    positions = {}
+    x, y, row_height = 0.0, 0.0, 0.0
+    for component, layout, width in zip(components, layouts, widths):
+        if x > 0 and x + width[0] > row_width:
+            x, y, row_height = 0.0, y + row_height + 1, 0.0
+
+        offset = np.array([x, y]) - layout.min(axis=0)
+        for node, position in zip(component, layout + offset):
+            positions[node] = position
+
+        x += width[0] + 1
+        row_height = max(row_height, width[1])
+
+    return _rescale(positions, scale)
+
+
+def _pivot_mds(graph, nodes, n_pivots, rng):
+    """Computes the pivot MDS layout of a connected graph, with one unit per hop."""
+    from scipy.sparse.csgraph import shortest_path
+
+    n = len(nodes)
+    if n <= 2:
+        return np.array([[i, 0.0] for i in range(n)])
+
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=None, format='csr')
+    n_pivots = min(n_pivots, n)
+
+    # max-min pivot selection: every pivot is the node that is farthest from all previous pivots
+    distances = np.empty((n, n_pivots))
+    closest = np.full(n, np.inf)
+    pivot = rng.integers(n)
+    for i in range(n_pivots):
+        distances[:, i] = shortest_path(adjacency, unweighted=True, indices=pivot)
+        closest = np.minimum(closest, distances[:, i])
+        pivot = np.argmax(closest)
+
+    squared = distances ** 2
+    centered = -0.5 * (squared - squared.mean(axis=0) - squared.mean(axis=1)[:, None] + squared.mean())
+    left, singular, _ = np.linalg.svd(centered, full_matrices=False)
+    layout = left[:, :2] * singular[:2]
+
+    # scale the layout so that neighbours are about one unit apart
+    rows, cols = adjacency.nonzero()
+    edge_length = np.linalg.norm(layout[rows] - layout[cols], axis=1).mean()
+    return layout / edge_length if edge_length > 0 else layout
+
+
+def _rescale(positions, scale):
+    """Centers the positions around 0 and scales them to fit into [-scale, scale]."""
+    if not positions:
+        return positions
+
+    coordinates = np.array(list(positions.values()), dtype=float)
+    coordinates -= coordinates.mean(axis=0)
+    extent = np.abs(coordinates).max()
+    if extent > 0:
+        coordinates *= scale / extent
+
+    return dict(zip(positions.keys(), coordinates))
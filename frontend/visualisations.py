@@ -1,30 +1,90 @@
 """Module for visualising backend functionalities."""
 import logging
 import os
-from tkinter import *
+import sys
 
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
 import pandas as pd
-from IPython.display import display
 from pyvis.network import Network
 
 from backend.describe import GraphFeatures, GraphType
 from backend.domain import Disconnection, Communities
+from . import export
+from .layout import compute_layout, default_store, PositionStore
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# The screen size that is used when there is no screen, e.g. on headless workers.
+DEFAULT_SCREEN_SIZE = (1920, 1080)
+
+# Graphs with more nodes are downsampled before they are drawn.
+MAX_NODES = 1000
+
+DEFAULT_COLOR = '#97c2fc'
+
+# The number of rows of the feature tables that are displayed.
+TOP_K = 20
+
+# The number of bins of the feature histograms.
+HISTOGRAM_BINS = 30
+
+# Graphs with more nodes are streamed to html by the export module instead of being built as a pyvis network.
+STREAM_MIN_NODES = 2000
 
-def visualise_features(features: GraphFeatures):
-    """Visualises a features object.
+
+def top_k(table: pd.DataFrame, column: str, k=TOP_K):
+    """Selects the k rows of a table with the largest values in a column, without sorting the whole table.
 
     :arg
-    features (GraphFeatures) - the GraphFeatures object.
+    table (pd.DataFrame) - a pandas dataframe.
+    column (str) - the column to select by.
+    k (int) - the number of rows to select.
+
+    :return
+    a pandas dataframe with the k rows, sorted by the column in descending order.
+    """
+    return table.nlargest(k, column).reset_index(drop=True)
+
 
+def histogram(values, bins=HISTOGRAM_BINS):
+    """Bins values into a histogram.
 
+    :arg
+    values (iter) - an array-like of numbers.
+    bins (int) - the number of bins.
+
+    :return
+    a pandas dataframe with the columns from, to and count, one row per bin.
     """
+    counts, edges = np.histogram(np.asarray(values), bins=bins)
+    return pd.DataFrame({'from': edges[:-1], 'to': edges[1:], 'count': counts})
+
+
+def _plot_histogram(ax, hist: pd.DataFrame, title: str, xlabel: str):
+    ax.stairs(hist['count'].values, np.append(hist['from'].values, hist['to'].values[-1:]), fill=True,
+              color='tomato')
+    ax.set_yscale('log')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Count')
+
+
+def visualise_features(features: GraphFeatures, k=TOP_K, bins=HISTOGRAM_BINS):
+    """Visualises a features object.
+
+    The collaborations and the comics can have millions of rows, so only the k largest rows are displayed and all rows
+    are aggregated into histograms.
+
+    :arg
+    features (GraphFeatures) - the GraphFeatures object.
+    k (int) - the number of rows of the collaboration and comic tables that are displayed.
+    bins (int) - the number of bins of the histograms.
+    """
+    from IPython.display import display
+
     # Basic features:
     print('')
     print('SOME BASIC FEATURE:')
@@ -42,8 +102,8 @@ def visualise_features(features: GraphFeatures):
 
     print('SOME INFO ABOUT THE HUBS:')
     print('')
-    print('-->  The Hubs of the network are the following:')
-    display(features.hubs)
+    print(f'-->  The network has {len(features.hubs)} hubs. The {min(k, len(features.hubs))} largest are:')
+    display(top_k(features.hubs, 'degree', k))
     print('')
     print('*' * 70)
     print('')
@@ -52,7 +112,8 @@ def visualise_features(features: GraphFeatures):
     if features.graph_type == GraphType.COLLABORATIVE:
         print('SOME INFO ABOUT THE COLLABORATION OF EACH HERO:')
         print('')
-        display(features.hero_collabs)
+        print(f'-->  The {k} largest of {len(features.hero_collabs)} collaborations:')
+        display(top_k(features.hero_collabs, 'n_collabs', k))
         print('')
         print('*' * 70)
 
@@ -60,7 +121,8 @@ def visualise_features(features: GraphFeatures):
     if features.graph_type == GraphType.HERO_COMIC:
         print('SOME INFO ABOUT THE COMICS:')
         print('')
-        display(features.n_heroes_per_comic)
+        print(f'-->  The {k} largest of {len(features.n_heroes_per_comic)} comics:')
+        display(top_k(features.n_heroes_per_comic, 'n_heroes', k))
         print('')
         print('*' * 70)
 
@@ -72,33 +134,129 @@ def visualise_features(features: GraphFeatures):
     axgrid = fig.add_gridspec(5, 4)
 
     ax1 = fig.add_subplot(axgrid[3:, :2])
-    ax1.plot(features.degree_dist.degree, marker=".", markersize=4, color='tomato')
-    ax1.set_title("Degree Distribution")
-    ax1.set_ylabel("Degree")
-    ax1.set_xlabel("Rank")
+    _plot_histogram(ax1, histogram(features.degree_dist.degree, bins), 'Degree Distribution', 'Degree')
+
+    ax2 = fig.add_subplot(axgrid[3:, 2:])
+    if features.graph_type == GraphType.COLLABORATIVE and len(features.hero_collabs):
+        _plot_histogram(ax2, histogram(features.hero_collabs.n_collabs, bins), 'Collaborations', 'Number of comics')
+    elif features.graph_type == GraphType.HERO_COMIC and len(features.n_heroes_per_comic):
+        _plot_histogram(ax2, histogram(features.n_heroes_per_comic.n_heroes, bins), 'Comics', 'Number of heroes')
+    else:
+        ax2.axis('off')
 
 
-def get_screen_size():
+def get_screen_size(default=DEFAULT_SCREEN_SIZE):
     """Gets the width and height of the screen size in pixels.
 
+    The size can be set with the MARVEL_SCREEN_SIZE environment variable, e.g. '1920x1080'. Without a display, e.g. on
+    headless workers, the default size is returned.
+
+    :arg
+    default (int, int) - the (width, height) to return when there is no screen.
+
     :return
     (int, int) - the (width, height) of the current screen.
     """
-    # Create an instance of tkinter frame
-    win = Tk()
+    if os.environ.get('MARVEL_SCREEN_SIZE'):
+        width, height = os.environ['MARVEL_SCREEN_SIZE'].lower().split('x')
+        return int(width), int(height)
 
-    # Set the geometry of frame
-    win.geometry("650x250")
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        return default
 
-    # Get the current screen width and height
-    return win.winfo_screenwidth(), win.winfo_screenheight()
+    try:
+        from tkinter import Tk
+
+        # Create an instance of tkinter frame that is never shown
+        win = Tk()
+        win.withdraw()
+
+        # Get the current screen width and height
+        size = win.winfo_screenwidth(), win.winfo_screenheight()
+        win.destroy()
+        return size
+    except Exception:
+        logger.info(f'Could not read the screen size, using the default: {default}.')
+        return default
+
+
+def downsample(graph: nx.Graph, max_nodes: int, keep: iter = ()):
+    """Reduces a graph to at most max_nodes of its highest degree nodes, so that it can be drawn readably.
+
+    :arg
+    graph (nx.Graph) - a networkx graph.
+    max_nodes (int) - the maximum number of nodes. If None, the graph is not reduced.
+    keep (iter) - nodes that are always kept, e.g. the heroes that are highlighted.
+
+    :return
+    the graph itself if it is small enough, otherwise the subgraph induced by the kept nodes.
+    """
+    if not max_nodes or graph.number_of_nodes() <= max_nodes:
+        return graph
+
+    keep = [node for node in keep if node in graph]
+    kept = set(keep)
+    by_degree = sorted(graph.degree(), key=lambda node_degree: node_degree[1], reverse=True)
+    kept.update(node for node, _ in by_degree[:max(0, max_nodes - len(kept))])
+
+    logger.info(f'Downsampled the graph from {graph.number_of_nodes()} to {len(kept)} nodes.')
+    return graph.subgraph(kept)
+
+
+def _network(graph: nx.Graph, screen_height: int, colors: dict = None, size=50, positions: dict = None):
+    """Creates a pyvis network from a graph, with fixed positions.
+
+    The nodes and edges are assigned in bulk instead of with Network.from_nx, which checks every new edge against all
+    existing edges and modifies the attributes of the given graph.
+
+    :arg
+    graph (nx.Graph) - the networkx graph.
+    screen_height (int) - the height of the network in pixels.
+    colors (dict) - a dictionary of node to color. Nodes that are not in it have the default color.
+    size (int) - the size of the nodes.
+    positions (dict) - a dictionary of node to (x, y) position. If None, it is computed with compute_layout.
+
+    :return
+    a pyvis Network.
+    """
+    colors = colors or {}
+    positions = positions or compute_layout(graph)
+
+    nt = Network(height=f'{screen_height}px', width='100%')
+    for node in graph.nodes():
+        x, y = positions[node]
+        # the minus is needed here to respect the networkx y-axis convention
+        options = {'color': colors.get(node, DEFAULT_COLOR), 'size': size, 'x': float(x), 'y': -float(y),
+                   'physics': False, 'id': node, 'label': str(node), 'shape': 'dot'}
+        nt.nodes.append(options)
+        nt.node_ids.append(node)
+        nt.node_map[node] = options
+
+    nt.edges.extend({'from': u, 'to': v, 'width': weight} for u, v, weight in graph.edges(data='weight', default=1))
+
+    nt.toggle_physics(False)
+    nt.show_buttons(filter_=['nodes'])
+    return nt
 
 
-def visualise_disconnected_graph(disc: Disconnection):
+def _write_network(path: str, graph: nx.Graph, screen_height: int, colors: dict = None, size=50,
+                   positions: dict = None):
+    """Writes a graph to an html file, with pyvis for small graphs and with the streaming exporter for large graphs."""
+    if graph.number_of_nodes() >= STREAM_MIN_NODES:
+        export.write_html(graph, path, positions=positions, colors=colors, size=size, height=f'{screen_height}px')
+    else:
+        _network(graph, screen_height, colors, size, positions).write_html(path)
+
+
+def visualise_disconnected_graph(disc: Disconnection, screen_size: tuple = None, max_nodes=MAX_NODES,
+                                 store: PositionStore = None):
     """Visualises disconnected graphs.
 
     :arg
     disc (Disconnection) - the disconnection to be visualised.
+    screen_size (int, int) - the (width, height) of the visualisation. If None, the size of the screen is used.
+    max_nodes (int) - graphs with more nodes are downsampled to their highest degree nodes. If None, never downsample.
+    store (PositionStore) - a store of node positions on disk. If None, the default_store is used.
 
     :return
     (str, str, str) - a message about the disconnected graphs and the two paths for the generated html for the
@@ -113,52 +271,26 @@ def visualise_disconnected_graph(disc: Disconnection):
 
     message = f'The number of edges that were removed from the original graph is: {disc.num_links()}'
 
-    attrs = {}
-    # use different colours for the two main heroes to distinguish them from the rest.
-    for node in disc.original_graph.nodes():
-        if node in {disc.hero_a, disc.hero_b}:
-            attrs[node] = {'color': 'red'}
-        else:
-            attrs[node] = {'color': 'blue'}
-
-    nx.set_node_attributes(disc.original_graph, attrs)
     # Get the current screen width and height
-    screen_width, screen_height = get_screen_size()
-
-    def node_size(x):
-        return 50
+    screen_width, screen_height = screen_size or get_screen_size()
 
-    nt = Network(height=f'{screen_height}px', width='100%')
+    original_graph = downsample(disc.original_graph, max_nodes, keep=[disc.hero_a, disc.hero_b])
 
-    nt.barnes_hut()
-    # nt.toggle_physics(False)
-    nt.from_nx(disc.original_graph, node_size_transf=node_size)
-    nt.show_buttons(filter_=['nodes'])
+    # use different colours for the two main heroes to distinguish them from the rest.
+    colors = {node: 'blue' for node in original_graph.nodes()}
+    colors.update({disc.hero_a: 'red', disc.hero_b: 'red'})
 
-    nt.write_html(original_graph_file)
+    # the disconnected graphs are drawn with the positions of the original graph, so that the nodes do not move
+    positions = compute_layout(original_graph, store=store or default_store())
+    _write_network(original_graph_file, original_graph, screen_height, colors, positions=positions)
     logger.info(f"Successfully wrote original graph to: {original_graph_file}.")
 
-    nt = Network(height=f'{screen_height}px', width='100%')
-
     removed_graphs = nx.Graph()
-    removed_graphs.add_nodes_from(list(disc.graph_a.nodes(data=True)) + list(disc.graph_b.nodes(data=True)))
-    removed_graphs.add_edges_from(list(disc.graph_a.edges(data=True)) + list(disc.graph_b.edges(data=True)))
-
-    nt.from_nx(removed_graphs)
+    removed_graphs.add_nodes_from(original_graph.nodes())
+    removed_graphs.add_edges_from(edge for graph in [disc.graph_a, disc.graph_b] for edge in graph.edges(data=True)
+                                  if edge[0] in removed_graphs and edge[1] in removed_graphs)
 
-    pos = nx.spring_layout(removed_graphs, k=2, scale=1000)
-
-    for node in nt.get_nodes():
-        nt.get_node(node)['x'] = pos[node][0]
-        nt.get_node(node)['y'] = -pos[node][1]  # the minus is needed here to respect ntworkx y-axis convention 
-        nt.get_node(node)['physics'] = False
-        nt.get_node(node)['label'] = str(node)  # set the node label as a string so that it can be displayed
-        nt.get_node(node)['size'] = 25
-
-    nt.toggle_physics(False)
-    nt.show_buttons(filter_=['nodes'])
-
-    nt.write_html(disconnected_graphs_file)
+    _write_network(disconnected_graphs_file, removed_graphs, screen_height, colors, size=25, positions=positions)
 
     logger.info(f"Successfully wrote disconnected graphs to: {disconnected_graphs_file}.")
 
@@ -197,8 +329,20 @@ def visualise_metrics(graph_metrics: tuple, node_metrics: tuple, metric: str):
     ax.axis("off");
 
 
-def visualise_communities(comms: Communities):
-    """Visualises the communities."""
+def visualise_communities(comms: Communities, screen_size: tuple = None, max_nodes=MAX_NODES,
+                          store: PositionStore = None):
+    """Visualises the communities.
+
+    :arg
+    comms (Communities) - the communities to be visualised.
+    screen_size (int, int) - the (width, height) of the visualisation. If None, the size of the screen is used.
+    max_nodes (int) - graphs with more nodes are downsampled to their highest degree nodes. If None, never downsample.
+    store (PositionStore) - a store of node positions on disk. If None, the default_store is used.
+
+    :return
+    (str, Figure, str, str, str) - a message about the communities, a table of the communities and the paths of the
+    generated html for the original, the communities and the final graphs.
+    """
     target_directory = "doc/visualisations/communities"
     original_graph_file = f'{target_directory}/original_graph.html'
     communities_graphs_file = f'{target_directory}/communities_graph.html'
@@ -236,73 +380,49 @@ def visualise_communities(comms: Communities):
     table.scale(2, 2)
     ax.axis("off")
 
-    screen_width, screen_height = get_screen_size()
+    screen_width, screen_height = screen_size or get_screen_size()
 
-    def node_size(x):
-        return 50
+    # All three graphs have the same nodes and edges, so they share one (cached) layout and differ only in colours.
+    original_graph = downsample(comms.original_graph, max_nodes, keep=[comms.hero_1, comms.hero_2])
+    positions = compute_layout(original_graph, store=store or default_store())
 
     # Create the original graph
-    nt = Network(height=f'{screen_height}px', width='100%')
-
-    nt.barnes_hut()
-    nt.from_nx(comms.original_graph, node_size_transf=node_size)
-    nt.show_buttons(filter_=['nodes'])
-
-    nt.write_html(original_graph_file)
+    _write_network(original_graph_file, original_graph, screen_height, positions=positions)
     logger.info(f"Successfully wrote original graph to: {original_graph_file}.")
 
     # Create the graph showing the communities in the network
-    communities_graph = nx.Graph(comms.original_graph)
-    attrs = {}
-
     # use different colours for the two heroes to distinguish them from the rest.
-    for node in communities_graph.nodes():
-        if node in comms.community_1:
-            attrs[node] = {'color': 'red'}
-        elif node in comms.community_2:
-            attrs[node] = {'color': 'blue'}
+    community_1, community_2 = set(comms.community_1), set(comms.community_2)
+    colors = {}
+    for node in original_graph.nodes():
+        if node in community_1:
+            colors[node] = 'red'
+        elif node in community_2:
+            colors[node] = 'blue'
 
-    nx.set_node_attributes(communities_graph, attrs)
-
-    nt = Network(height=f'{screen_height}px', width='100%')
-
-    nt.barnes_hut()
-    nt.from_nx(communities_graph, node_size_transf=node_size)
-    nt.show_buttons(filter_=['nodes'])
-
-    nt.write_html(communities_graphs_file)
-    logger.info(f"Successfully wrote communities graph to: {original_graph_file}.")
+    _write_network(communities_graphs_file, original_graph, screen_height, colors, positions=positions)
+    logger.info(f"Successfully wrote communities graph to: {communities_graphs_file}.")
 
     # Create the final graph and identify the community/communities of Hero_1 and Hero_2
-    hero_1_community = comms.community_1 if comms.hero_1 in comms.community_1 else comms.community_2
-    hero_2_community = comms.community_1 if comms.hero_2 in comms.community_1 else comms.community_2
-
-    final_graph = nx.Graph(comms.original_graph)
-    attrs = {}
+    hero_1_community = community_1 if comms.hero_1 in community_1 else community_2
+    hero_2_community = community_1 if comms.hero_2 in community_1 else community_2
 
-    for node in final_graph.nodes():
+    colors = {}
+    for node in original_graph.nodes():
         # Green means that both heroes are in the same community
         if node in hero_1_community and node in hero_2_community:
-            attrs[node] = {'color': 'green'}
+            colors[node] = 'green'
         # Blue means that a node is in hero 1 community
         elif node in hero_1_community:
-            attrs[node] = {'color': 'blue'}
+            colors[node] = 'blue'
         # Red means that a node is in hero 2 community
         elif node in hero_2_community:
-            attrs[node] = {'color': 'red'}
+            colors[node] = 'red'
         # Yellow means that the node is in neither community
         else:
-            attrs[node] = {'color': 'yellow'}
-
-    nx.set_node_attributes(final_graph, attrs)
-
-    nt = Network(height=f'{screen_height}px', width='100%')
-
-    nt.barnes_hut()
-    nt.from_nx(final_graph, node_size_transf=node_size)
-    nt.show_buttons(filter_=['nodes'])
+            colors[node] = 'yellow'
 
-    nt.write_html(final_graphs_file)
+    _write_network(final_graphs_file, original_graph, screen_height, colors, positions=positions)
     logger.info(f"Successfully wrote final graph to: {final_graphs_file}.")
 
     return message, fig, original_graph_file, communities_graphs_file, final_graphs_file
@@ -0,0 +1,55 @@
+"""Shared configuration of the tests.
+
+The performance tests are marked with perf and only run with --perf, e.g. `pytest --perf -m perf`. Their time budgets
+are given in units of a calibration loop, so that they hold on slower and faster machines alike.
+"""
+import time
+
+import pytest
+
+# The number of times the calibration loop is timed. The best time is the unit of the time budgets.
+CALIBRATION_REPEAT = 5
+
+
+def pytest_addoption(parser):
+    parser.addoption('--perf', action='store_true', help='run the performance tests, which are marked with perf.')
+    parser.addoption('--perf-scale', type=float, default=1.0,
+                     help='the factor by which the budgets of the performance tests are multiplied.')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'perf: a performance test with time and memory budgets, run with --perf.')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--perf'):
+        return
+
+    skip = pytest.mark.skip(reason='performance tests only run with --perf.')
+    for item in items:
+        if 'perf' in item.keywords:
+            item.add_marker(skip)
+
+
+def calibration_loop():
+    """A fixed mix of dictionary updates and sorting of strings, like the pure Python parts of the backend."""
+    counts = {}
+    for i in range(200_000):
+        counts[i % 1000] = counts.get(i % 1000, 0) + i
+    return sorted(str(i) for i in range(100_000))
+
+
+@pytest.fixture(scope='session')
+def calibration():
+    """The best time of the calibration loop in seconds, the unit of the time budgets."""
+    best = float('inf')
+    for _ in range(CALIBRATION_REPEAT):
+        start = time.perf_counter()
+        calibration_loop()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(scope='session')
+def perf_scale(request):
+    return request.config.getoption('--perf-scale')
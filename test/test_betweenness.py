@@ -0,0 +1,30 @@
+"""Unit tests for the edge betweenness engine."""
+import networkx as nx
+import pytest
+
+from backend.graph import edge_betweenness
+
+
+@pytest.fixture
+def graph():
+    g = nx.barbell_graph(5, 2)
+    for i, (u, v) in enumerate(g.edges()):
+        g[u][v]['weight'] = 1 + i % 3
+    return g
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'weight': 'weight'}, {'k': 4, 'seed': 7}, {'normalized': False}])
+def test_that_scores_are_equal_to_networkx(graph, kwargs):
+    expected = nx.edge_betweenness_centrality(graph, **kwargs)
+    result = edge_betweenness(graph, **kwargs).to_dict()
+    assert result.keys() == expected.keys()
+    assert all(result[edge] == pytest.approx(expected[edge]) for edge in expected)
+
+
+def test_that_batches_are_summed(graph):
+    result = edge_betweenness(graph, weight='weight', batch_size=3)
+    assert result.scores == pytest.approx(edge_betweenness(graph, weight='weight').scores)
+    # the path between the two bells carries the most shortest paths
+    assert result.top() in {(5, 6), (4, 5), (6, 7)}
+    assert result.score(6, 5) == result.score(5, 6)
+
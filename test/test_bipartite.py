@@ -0,0 +1,43 @@
+"""Unit tests for the bipartite algorithms on the hero-comic graph."""
+import networkx as nx
+import pytest
+
+from backend import manager
+from backend.describe import GraphType
+from backend.graph import BipartiteIndex
+from backend.service import TopHeroService
+
+
+@pytest.fixture
+def graph():
+    g = nx.Graph()
+    g.add_nodes_from(['A', 'B', 'C', 'D', 'E'], type='hero')
+    g.add_nodes_from(['AB', 'BC', 'CD', 'BD', 'X'], type='comic')
+    g.add_edges_from([('A', 'AB'), ('B', 'AB'), ('B', 'BC'), ('C', 'BC'), ('C', 'CD'), ('D', 'CD'), ('B', 'BD'),
+                      ('D', 'BD'), ('E', 'X')])
+    return g
+
+
+def test_that_statistics_are_per_side(graph):
+    index = BipartiteIndex.of(graph)
+    heroes, comics = index.degree_dists()
+    assert index.density() == 9 / 25
+    assert dict(zip(heroes.node, heroes.degree)) == {'A': 1, 'B': 3, 'C': 2, 'D': 2, 'E': 1}
+    assert set(comics.degree) == {1, 2}
+    assert BipartiteIndex.of(graph) is index
+
+
+def test_that_shortest_path_steps_over_comics(graph):
+    index = BipartiteIndex.of(graph)
+    assert index.shortest_path('A', 'D') == ['A', 'AB', 'B', 'BD', 'D']
+    assert index.shortest_path('C', 'C') == ['C']
+    with pytest.raises(nx.NetworkXNoPath):
+        index.shortest_path('A', 'E')
+
+
+def test_that_features_contain_bipartite_statistics(graph):
+    manager.hero_service = TopHeroService(['A', 'B', 'C', 'D', 'E'])
+    features = manager.features(graph, 5, graph_type=GraphType.HERO_COMIC)
+    assert features.bipartite_density == 9 / 25
+    assert len(features.hero_degree_dist) == 5
+    assert manager.features(nx.Graph([('A', 'B', {'n_collabs': 1})]), 2, graph_type=GraphType.COLLABORATIVE).bipartite_density is None
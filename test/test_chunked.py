@@ -0,0 +1,40 @@
+"""Unit tests for the chunked module."""
+import networkx as nx
+import pytest
+
+from backend.graph import chunked, collaborative, hero_comic, reciprocal_prop
+from benchmark import synthetic
+
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    return synthetic.write(str(tmp_path_factory.mktemp('synthetic')), n_heroes=300, n_comics=500)
+
+
+def test_that_ranges_cover_every_row_once(data):
+    hero_network, *_ = data
+    ranges = chunked.chunk_ranges(hero_network, 7)
+
+    rows = [len(chunked.read_range(hero_network, start, end)) for start, end in ranges]
+
+    assert sum(rows) == sum(1 for _ in open(hero_network)) - 1
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+
+def test_that_parallel_collaborative_graph_is_identical(data):
+    hero_network, *_ = data
+
+    graph, _ = collaborative.create_from(hero_network, weight=reciprocal_prop)
+    parallel_graph, _ = collaborative.create_from(hero_network, weight=reciprocal_prop, parallel=True, max_workers=3)
+
+    assert nx.utils.graphs_equal(graph, parallel_graph)
+
+
+def test_that_parallel_hero_comic_graph_is_identical(data):
+    _, edges, nodes = data
+
+    graph, _ = hero_comic.create_from(nodes, edges)
+    parallel_graph, _ = hero_comic.create_from(nodes, edges, parallel=True, max_workers=3)
+
+    assert nx.utils.graphs_equal(graph, parallel_graph)
+    assert list(graph.edges()) == list(parallel_graph.edges())
@@ -0,0 +1,33 @@
+"""Unit tests for the connected component index."""
+import networkx as nx
+
+from backend import manager
+from backend.graph import ComponentIndex
+from backend.service import TopHeroService
+
+
+def test_that_components_are_maintained_through_updates():
+    graph = nx.path_graph(4)
+    graph.add_edge(10, 11)
+    index = ComponentIndex(graph)
+    assert len(index) == 2
+    assert index.connected(0, 3) and not index.connected(0, 10) and not index.connected(0, 99)
+
+    index.add_edge(graph, 3, 10)
+    assert len(index) == 1 and index.connected(0, 11)
+
+    assert index.remove_edge(graph, 0, 1)
+    assert index.remove_edge(graph, 3, 10)
+    assert sorted(map(sorted, index.components())) == [[0], [1, 2, 3], [10, 11]]
+    assert sorted(map(sorted, index.components())) == sorted(map(sorted, nx.connected_components(graph)))
+
+
+def test_that_unreachable_route_legs_are_rejected():
+    graph = nx.Graph()
+    graph.add_nodes_from(['A', 'B', 'C'], type='hero')
+    graph.add_nodes_from(['AB', 'C1'], type='comic')
+    graph.add_edges_from([('A', 'AB'), ('B', 'AB'), ('C', 'C1')])
+    manager.hero_service = TopHeroService(['A', 'B', 'C'])
+
+    assert manager.shortest_order_route(graph, 3, initial_hero='A', final_hero='C', superheroes=['B']) == 'WARNING: There is no such path!'
+    assert manager.shortest_order_route(graph, 3, initial_hero='A', final_hero='B', superheroes=[]) == [['A', 'AB', 'B']]
@@ -0,0 +1,50 @@
+"""Unit tests for the controller module."""
+import pytest
+
+from backend import Controller, manager
+from backend.graph import collaborative
+
+
+@pytest.fixture
+def controller():
+    manager.create_hero_service('resources/test_edges.csv')
+    graph, _ = collaborative.create_from('resources/test_hero-network.csv')
+    return Controller(graph)
+
+
+def test_that_run_batch_returns_results_in_input_order(controller):
+    jobs = [('metrics', 2, {'node': 'Iron Man', 'metric': 'degree_centrality'}),
+            ('metrics', 1, {'node': 'Captain America', 'metric': 'degree_centrality'}),
+            ('metrics', 2, {'node': 'Captain America', 'metric': 'closeness_centrality'})]
+
+    results = controller.run_batch(jobs)
+
+    assert results == [controller.run(identifier, top_n, **kwargs) for identifier, top_n, kwargs in jobs]
+
+
+def test_that_run_batch_selects_top_n_once_per_group(controller, monkeypatch):
+    calls = []
+    top_n = manager.hero_service.top_n
+    monkeypatch.setattr(manager.hero_service, 'top_n', lambda n: calls.append(n) or top_n(n))
+    jobs = [('metrics', 2, {'node': 'Iron Man', 'metric': 'degree_centrality'}),
+            ('metrics', 2, {'node': 'Captain America', 'metric': 'degree_centrality'})]
+
+    controller.run_batch(jobs)
+
+    assert calls == [2]
+
+
+def test_that_run_batch_rejects_unknown_identifier(controller):
+    with pytest.raises(ValueError):
+        controller.run_batch([('unknown', 2, {})])
+
+
+def test_that_instrumented_run_records_stages(controller, tmp_path):
+    profile = str(tmp_path / 'metrics.prof')
+
+    instrumented = controller.run('metrics', 2, profile=profile, node='Iron Man', metric='degree_centrality')
+
+    assert instrumented.result == controller.run('metrics', 2, node='Iron Man', metric='degree_centrality')
+    assert [stage.name for stage in instrumented.record.stages] == ['top_n', 'subgraph', 'algorithm', 'pack']
+    assert instrumented.record.sizes == {'subgraph': (2, 1)}
+    assert (tmp_path / 'metrics.prof').exists()
@@ -0,0 +1,46 @@
+"""Unit tests for the core module."""
+import networkx as nx
+import pytest
+
+from backend import Controller, manager
+from backend.graph import core
+from backend.service import TopHeroService
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_that_core_numbers_match_networkx(seed):
+    graph = nx.gnm_random_graph(100, 400 * seed, seed=seed)
+    graph.add_edge(0, 0)
+    expected = nx.Graph(graph)
+    expected.remove_edges_from(nx.selfloop_edges(expected))
+
+    assert core.core_numbers(graph) == nx.core_number(expected)
+
+
+def test_that_min_core_removes_the_periphery():
+    graph = nx.complete_graph(['Captain America', 'Iron Man', 'Black Widow', 'Hulk'])
+    graph.add_edge('Hulk', 'Thor')
+    nx.set_edge_attributes(graph, 1, 'weight')
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+    controller = Controller(graph)
+
+    instrumented = controller.run('metrics', 5, instrument=True, min_core=3, node='Hulk', metric='degree_centrality')
+
+    assert instrumented.record.sizes['subgraph'] == (4, 6)
+    with pytest.raises(ValueError):
+        controller.run('metrics', 5, min_core=3, node='Thor', metric='degree_centrality')
+
+
+def test_that_core_numbers_are_computed_once_per_graph(monkeypatch):
+    graph = nx.complete_graph(['Captain America', 'Iron Man', 'Black Widow', 'Hulk'])
+    nx.set_edge_attributes(graph, 1, 'weight')
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+    controller = Controller(graph)
+    calls = []
+    decompose = core._decompose
+    monkeypatch.setattr(core, '_decompose', lambda *args: calls.append(args) or decompose(*args))
+
+    for top_n in [3, 4, 4]:
+        controller.run('metrics', top_n, min_core=3, node='Captain America', metric='degree_centrality')
+
+    assert len(calls) == 1
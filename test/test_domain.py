@@ -0,0 +1,47 @@
+"""Unit tests for the compact result objects."""
+import gc
+import pickle
+
+import pandas as pd
+import pytest
+
+from backend import Controller, manager
+from backend.graph import collaborative
+from backend.service import TopHeroService
+
+HEROES = ['Captain America', 'Iron Man', 'Black Widow', 'Hulk']
+
+
+@pytest.fixture
+def controller():
+    manager.hero_service = TopHeroService(HEROES)
+    data = pd.DataFrame({'hero1': ['Captain America', 'Iron Man', 'Black Widow', 'Hulk', 'Captain America'],
+                         'hero2': ['Iron Man', 'Black Widow', 'Hulk', 'Captain America', 'Black Widow']})
+    graph, _ = collaborative.create_from(data)
+    return Controller(graph)
+
+
+def test_that_disconnection_builds_subgraphs_on_demand(controller):
+    disc = controller.run('disconnecting_graphs', 4, hero_a='Captain America', hero_b='Black Widow')
+
+    assert not hasattr(disc, '__dict__')
+    assert set(disc.graph_a) | set(disc.graph_b) == set(disc.original_graph) == set(disc.nodes)
+    assert disc.num_links() == len(disc.links) > 0
+    assert all((u in disc.graph_a) != (v in disc.graph_a) for u, v in disc.links)
+
+
+def test_that_results_do_not_keep_the_graph_alive(controller):
+    copy = Controller(controller.graph.copy())
+    disc = copy.run('disconnecting_graphs', 4, hero_a='Captain America', hero_b='Black Widow')
+    del copy
+    gc.collect()
+
+    with pytest.raises(ValueError):
+        disc.original_graph
+
+
+def test_that_pickled_results_can_be_attached_to_a_graph(controller):
+    disc = pickle.loads(pickle.dumps(
+        controller.run('disconnecting_graphs', 4, hero_a='Captain America', hero_b='Black Widow')))
+
+    assert set(disc.with_graph(controller.graph).original_graph) == set(disc.nodes)
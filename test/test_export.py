@@ -0,0 +1,52 @@
+"""Unit tests for the export module."""
+import json
+
+import networkx as nx
+import pytest
+
+from backend.describe import GraphType
+from backend.graph import snapshot
+from frontend import export
+
+
+@pytest.fixture
+def graph():
+    g = nx.Graph()
+    g.add_edge('Captain America', 'Iron Man', weight=3)
+    g.add_edge('Iron Man', '</script>')
+    return g
+
+
+def test_that_json_contains_all_nodes_and_edges(graph, tmp_path):
+    path = export.write_json(graph, str(tmp_path / 'graph.json'), colors={'Iron Man': 'red'}, chunk_size=1)
+
+    with open(path) as file:
+        data = json.load(file)
+
+    assert [node['id'] for node in data['nodes']] == list(graph.nodes())
+    assert data['nodes'][1]['color'] == 'red'
+    assert data['edges'] == [{'from': 'Captain America', 'to': 'Iron Man', 'width': 3.0},
+                             {'from': 'Iron Man', 'to': '</script>'}]
+
+
+def test_that_html_escapes_the_end_of_the_script(graph, tmp_path):
+    path = export.write_html(graph, str(tmp_path / 'graph.html'), layout=False, title='</title><script>x</script>')
+
+    with open(path) as file:
+        html = file.read()
+
+    data = html.split('<script type="application/json" id="data">')[1].split('</script>')[0]
+    assert len(json.loads(data)['nodes']) == 3
+    assert '<title>&lt;/title&gt;&lt;script&gt;x&lt;/script&gt;</title>' in html
+
+
+def test_that_snapshots_are_exported_without_networkx(graph, tmp_path, monkeypatch):
+    graph['Iron Man']['</script>']['weight'] = 1
+    expected = export.write_json(graph, str(tmp_path / 'expected.json'), layout=False)
+    monkeypatch.setattr(snapshot.Snapshot, 'to_networkx', None)
+
+    path = snapshot.write(graph, str(tmp_path / 'snapshot'), GraphType.COLLABORATIVE)
+    path = export.write_json(snapshot.Snapshot(path), str(tmp_path / 'graph.json'), chunk_size=2)
+
+    with open(path) as actual, open(expected) as file:
+        assert json.load(actual) == json.load(file)
@@ -0,0 +1,45 @@
+"""Unit tests for the out of core graph snapshots."""
+import networkx as nx
+import pytest
+
+from backend import manager
+from backend.describe import GraphType
+from backend.graph import collaborative, hero_comic, external, reciprocal_prop
+from backend.graph.snapshot import Snapshot
+from backend.service import TopHeroService
+from benchmark import synthetic
+
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    return synthetic.write(str(tmp_path_factory.mktemp('synthetic')), n_heroes=300, n_comics=500)
+
+
+def test_that_collaborative_snapshot_is_identical(data, tmp_path):
+    hero_network, *_ = data
+    graph, _ = collaborative.create_from(hero_network, weight=reciprocal_prop)
+
+    path = external.create_collaborative(hero_network, str(tmp_path), weight=reciprocal_prop, chunk_rows=500,
+                                         block_size=300)
+
+    assert nx.utils.graphs_equal(graph, Snapshot(path).to_networkx())
+
+
+def test_that_hero_comic_snapshot_is_identical(data, tmp_path):
+    _, edges, nodes = data
+    graph, _ = hero_comic.create_from(nodes, edges)
+
+    snapshot = Snapshot(external.create_hero_comic(nodes, edges, str(tmp_path), chunk_rows=100, block_size=200))
+
+    assert nx.utils.graphs_equal(graph, snapshot.to_networkx())
+    assert TopHeroService.create_from_snapshot(snapshot).top_n(50) == TopHeroService.create_from(edges).top_n(50)
+
+
+def test_that_features_run_on_out_of_core_snapshot(data, tmp_path):
+    _, edges, nodes = data
+    snapshot = Snapshot(external.create_hero_comic(nodes, edges, str(tmp_path), chunk_rows=100))
+    manager.create_hero_service(snapshot)
+
+    features = manager.features(snapshot, 20, graph_type=GraphType.HERO_COMIC)
+
+    assert len(features.hero_degree_dist) == 20
@@ -0,0 +1,37 @@
+"""Unit tests for the feature tables and their aggregation."""
+import networkx as nx
+import numpy as np
+
+from backend.describe import get_degree_dist
+from backend.graph import collaborative, hero_comic
+from frontend.visualisations import top_k, histogram
+
+
+def test_that_hero_collabs_contain_every_pair_once():
+    graph, _ = collaborative.create_from('resources/test_hero-network.csv')
+
+    collabs = collaborative.get_hero_collabs(graph)
+
+    pairs = {frozenset(pair): n for *pair, n in collabs.itertuples(index=False)}
+    assert len(pairs) == len(collabs) == graph.number_of_edges()
+    assert pairs[frozenset(['Captain America', 'Iron Man'])] == 2
+
+
+def test_that_n_heroes_per_comic_are_degrees_of_comics():
+    graph = nx.Graph()
+    graph.add_nodes_from(['Civil War', 'Secret Wars'], type='comic')
+    graph.add_nodes_from(['Captain America', 'Iron Man'], type='hero')
+    graph.add_edges_from([('Civil War', 'Captain America'), ('Civil War', 'Iron Man'), ('Secret Wars', 'Iron Man')])
+
+    comics = hero_comic.get_n_heroes_per_comic(graph)
+
+    assert comics.to_dict(orient='records') == [{'comic': 'Civil War', 'n_heroes': 2},
+                                                {'comic': 'Secret Wars', 'n_heroes': 1}]
+
+
+def test_that_tables_are_aggregated():
+    dist = get_degree_dist(nx.star_graph(10))
+
+    assert list(top_k(dist, 'degree', 2).degree) == [10, 1]
+    assert histogram(dist.degree, bins=2)['count'].tolist() == [10, 1]
+    assert np.issubdtype(dist.degree.dtype, np.integer)
@@ -0,0 +1,54 @@
+"""Tests that importing the backend stays fast and does not pull in heavy dependencies."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The maximum time in seconds that importing the backend may take, without networkx, pandas and numpy.
+IMPORT_BUDGET = 0.1
+
+HEAVY_MODULES = ['networkx', 'pandas', 'numpy', 'scipy', 'matplotlib', 'pyvis', 'tkinter', 'IPython']
+
+FRONTEND_MODULES = ['matplotlib', 'pyvis', 'tkinter', 'IPython']
+
+
+def _import(statement):
+    """Runs the import statement in a fresh interpreter and returns its duration and the imported heavy modules."""
+    code = (f'import sys, time, json\n'
+            f'start = time.perf_counter()\n'
+            f'{statement}\n'
+            f'seconds = time.perf_counter() - start\n'
+            f'print(json.dumps([seconds, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))')
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize('statement', ['import backend',
+                                       'from backend.service import TopHeroService',
+                                       'import frontend'])
+def test_that_import_is_lazy(statement):
+    _, heavy_modules = _import(statement)
+
+    assert heavy_modules == []
+
+
+def test_that_import_is_within_budget():
+    seconds = min(_import('import backend; from backend.service import TopHeroService')[0] for _ in range(3))
+
+    assert seconds < IMPORT_BUDGET
+
+
+def test_that_top_n_works_without_heavy_modules():
+    _, heavy_modules = _import("from backend.service import TopHeroService; TopHeroService(['a', 'b', 'a']).top_n(1)")
+
+    assert heavy_modules == []
+
+
+def test_that_manager_is_importable_without_frontend():
+    _, heavy_modules = _import('from backend import manager, Controller')
+
+    assert not set(heavy_modules) & set(FRONTEND_MODULES)
@@ -0,0 +1,80 @@
+"""Unit tests for the layout module."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from frontend import layout
+
+
+@pytest.fixture
+def graph():
+    g = nx.path_graph(['Captain America', 'Iron Man', 'Black Widow', 'Hulk'])
+    g.add_edge('Thor', 'Loki')
+    return g
+
+
+def test_that_fingerprint_ignores_order(graph):
+    reordered = nx.Graph()
+    reordered.add_nodes_from(reversed(list(graph.nodes())))
+    reordered.add_edges_from((v, u) for u, v in reversed(list(graph.edges())))
+
+    assert layout.fingerprint(graph) == layout.fingerprint(reordered)
+
+
+def test_that_stress_layout_places_all_nodes_within_scale(graph):
+    positions = layout.stress_layout(graph, scale=100)
+
+    assert set(positions) == set(graph.nodes())
+    assert np.abs(np.array(list(positions.values()))).max() == pytest.approx(100)
+
+
+def test_that_stress_layout_keeps_neighbours_close(graph):
+    positions = layout.stress_layout(nx.path_graph(50), scale=100)
+
+    distance = np.linalg.norm(positions[0] - positions[1])
+    assert distance < np.linalg.norm(positions[0] - positions[49])
+
+
+def test_that_layout_is_cached(graph):
+    positions = layout.compute_layout(graph, method='stress')
+
+    assert layout.compute_layout(nx.Graph(graph), method='stress') is positions
+
+
+def test_that_stored_layout_is_reused_by_later_processes(graph, tmp_path, monkeypatch):
+    store = layout.PositionStore(str(tmp_path))
+    positions = layout.compute_layout(graph, method='stress', seed=1, store=store)
+    monkeypatch.setattr(layout, '_cache', layout.OrderedDict())
+    monkeypatch.setattr(layout, 'stress_layout', lambda *args, **kwargs: pytest.fail('The layout was recomputed.'))
+
+    stored = layout.compute_layout(graph, method='stress', seed=1, store=layout.PositionStore(str(tmp_path)))
+
+    assert set(stored) == set(positions)
+    assert all(np.allclose(stored[node], positions[node]) for node in graph)
+
+
+def test_that_layout_of_similar_graph_is_warm_started(graph, tmp_path):
+    store = layout.PositionStore(str(tmp_path))
+    positions = layout.compute_layout(graph, method='stress', seed=2, store=store)
+    grown = nx.Graph(graph)
+    grown.add_edge('Hulk', 'She-Hulk')
+
+    warm = layout.compute_layout(grown, method='stress', seed=2, store=store)
+
+    assert all(np.allclose(warm[node], positions[node]) for node in graph)
+    edge_length = np.linalg.norm(positions['Hulk'] - positions['Black Widow'])
+    distance = np.linalg.norm(warm['She-Hulk'] - positions['Hulk'])
+    assert 0.5 * edge_length < distance < 1.5 * edge_length
+    assert np.linalg.norm(warm['She-Hulk'] - positions['Black Widow']) > distance
+
+
+def test_that_cached_layout_is_stored_and_known_positions_are_capped(graph, tmp_path, monkeypatch):
+    positions = layout.compute_layout(graph, method='stress', seed=3)
+    store = layout.PositionStore(str(tmp_path))
+    monkeypatch.setattr(layout, 'KNOWN_MAX_NODES', 4)
+
+    assert layout.compute_layout(graph, method='stress', seed=3, store=store) is positions
+
+    assert layout._layout_key(graph, 'stress', 1000, 3) in store
+    assert len(store.known(graph, 'stress', 1000)) == 4
+    assert not [path for path in tmp_path.iterdir() if 'tmp' in path.name]
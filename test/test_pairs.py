@@ -0,0 +1,45 @@
+"""Unit tests for the hero pair index."""
+import pickle
+
+import pandas as pd
+import pytest
+
+from backend.service import pairs
+
+COUNTS = pd.DataFrame({'hero_1': ['A', 'A', 'B', 'C', 'A'],
+                       'hero_2': ['B', 'C', 'C', 'D', 'D'],
+                       'n_collabs': [3, 5, 1, 5, 2]})
+
+
+@pytest.fixture
+def index(tmp_path):
+    return pairs.create_from(COUNTS, str(tmp_path / 'pairs'))
+
+
+def test_that_pairs_are_looked_up_in_either_order(index):
+    assert len(index) == 5
+    assert index.collaborations('A', 'C') == 5
+    assert index.collaborations('C', 'A') == 5
+    assert index.collaborations('B', 'D') == 0
+    assert index.collaborations('A', 'WOLVERINE') == 0
+
+
+def test_that_top_pairs_and_partners_are_sorted_by_collaborations(index):
+    assert index.top_pairs(3) == [('A', 'C', 5), ('C', 'D', 5), ('A', 'B', 3)]
+    assert index.partners('A') == [('C', 5), ('B', 3), ('D', 2)]
+    assert index.partners('C', k=2) == [('A', 5), ('D', 5)]
+    assert index.partners('WOLVERINE') == []
+    assert pickle.loads(pickle.dumps(index)).top_pairs(1) == [('A', 'C', 5)]
+
+
+def test_that_the_index_of_a_csv_file_matches_the_collaborative_graph(tmp_path):
+    from backend.graph import collaborative, get_hero_collabs
+
+    path = tmp_path / 'hero-network.csv'
+    pd.DataFrame({'hero1': ['A', 'B/', 'A', 'C', 'A'], 'hero2': ['B', 'A', 'C', 'C', 'D']}).to_csv(path, index=False)
+    index = pairs.create_from(str(path), str(tmp_path / 'pairs'), max_workers=1)
+
+    collabs = get_hero_collabs(collaborative.create_from(str(path), parallel=True, max_workers=1)[0])
+    for hero_1, hero_2, n_collabs in collabs[['hero_1', 'hero_2', 'n_collabs']].itertuples(index=False):
+        assert index.collaborations(hero_1, hero_2) == n_collabs
+    assert len(index) == 3
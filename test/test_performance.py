@@ -0,0 +1,99 @@
+"""Performance regression tests of the hot paths on medium synthetic data.
+
+Every test measures the best time and the memory peak of a function with benchmark.run.measure and asserts that they
+are within its budget. The time budgets are in units of the calibration loop, see conftest.py, and about three times
+the measured time. The memory budgets are in MiB of the tracemalloc peak, and about twice the measured peak.
+"""
+import logging
+
+import pytest
+
+from backend import Controller, manager
+from backend.describe import GraphType
+from backend.graph import collaborative, hero_comic
+from backend.service import TopHeroService
+from benchmark import synthetic
+from benchmark.run import measure
+
+pytestmark = pytest.mark.perf
+
+N_HEROES = 2000
+N_COMICS = 4000
+
+# The number of timed runs of every function, the best time counts.
+REPEAT = 2
+
+# (calibration units, MiB) of every measured function
+BUDGETS = {'collaborative.create_from': (48, 96),
+           'hero_comic.create_from': (6, 16),
+           'TopHeroService.create_from': (2, 4),
+           'TopHeroService.top_n': (1, 2),
+           'features': (25, 10),
+           'features[hero_comic]': (15, 4),
+           'metrics': (20, 2),
+           'shortest_order_route': (5, 4),
+           'disconnecting_graphs': (12, 10)}
+
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    """The paths of the hero network, the edges and the nodes of the medium synthetic data."""
+    logging.disable(logging.INFO)
+    yield synthetic.write(str(tmp_path_factory.mktemp('synthetic')), n_heroes=N_HEROES, n_comics=N_COMICS, seed=0)
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope='module')
+def controllers(data):
+    hero_network, edges, nodes = data
+    manager.hero_service = TopHeroService.create_from(edges)
+    return {GraphType.COLLABORATIVE: Controller(collaborative.create_from(hero_network)[0]),
+            GraphType.HERO_COMIC: Controller(hero_comic.create_from(nodes=nodes, edges=edges)[0])}
+
+
+def assert_within_budget(name, func, calibration, perf_scale):
+    units, mebibytes = (budget * perf_scale for budget in BUDGETS[name])
+    result, seconds, peak_bytes = measure(func, REPEAT)
+
+    assert seconds <= units * calibration, \
+        f'{name} took {seconds:.3f}s, {seconds / calibration:.1f} units. Budget: {units:g} units.'
+    assert peak_bytes <= mebibytes * 2 ** 20, \
+        f'{name} peaked at {peak_bytes / 2 ** 20:.1f} MiB. Budget: {mebibytes:g} MiB.'
+    return result
+
+
+def test_graph_construction(data, calibration, perf_scale):
+    hero_network, edges, nodes = data
+
+    graph, _ = assert_within_budget('collaborative.create_from', lambda: collaborative.create_from(hero_network),
+                                    calibration, perf_scale)
+    assert_within_budget('hero_comic.create_from', lambda: hero_comic.create_from(nodes=nodes, edges=edges),
+                         calibration, perf_scale)
+    assert graph.number_of_nodes() > N_HEROES // 2
+
+
+def test_top_n(data, calibration, perf_scale):
+    service = assert_within_budget('TopHeroService.create_from', lambda: TopHeroService.create_from(data[1]),
+                                   calibration, perf_scale)
+
+    top_heroes = assert_within_budget('TopHeroService.top_n', lambda: TopHeroService(service.heroes).top_n(500),
+                                      calibration, perf_scale)
+    assert len(top_heroes) == 500
+
+
+@pytest.mark.parametrize('name, graph_type, top_n', [('features', GraphType.COLLABORATIVE, 1000),
+                                                     ('features[hero_comic]', GraphType.HERO_COMIC, 1000),
+                                                     ('metrics', GraphType.COLLABORATIVE, 200),
+                                                     ('shortest_order_route', GraphType.HERO_COMIC, 500),
+                                                     ('disconnecting_graphs', GraphType.COLLABORATIVE, 200)])
+def test_controller_functions(data, controllers, calibration, perf_scale, name, graph_type, top_n):
+    first, second, third = manager.hero_service.top_n(3)
+    kwargs = {'features': {'graph_type': GraphType.COLLABORATIVE},
+              'features[hero_comic]': {'graph_type': GraphType.HERO_COMIC},
+              'metrics': {'node': first, 'metric': 'closeness_centrality'},
+              'shortest_order_route': {'initial_hero': first, 'final_hero': third, 'superheroes': [second]},
+              'disconnecting_graphs': {'hero_a': first, 'hero_b': second}}[name]
+
+    identifier = name.split('[')[0]
+    assert_within_budget(name, lambda: controllers[graph_type].run(identifier, top_n, **kwargs), calibration,
+                         perf_scale)
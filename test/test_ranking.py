@@ -0,0 +1,55 @@
+"""Unit tests for the rankings of the hero service."""
+import pickle
+
+import networkx as nx
+import pytest
+
+from backend import Controller, manager
+from backend.service import TopHeroService
+
+
+@pytest.fixture
+def graph():
+    g = nx.Graph()
+    g.add_edge('Captain America', 'Iron Man', n_collabs=5, weight=0.1)
+    g.add_edge('Captain America', 'Black Widow', n_collabs=1, weight=0.9)
+    g.add_edge('Iron Man', 'Black Widow', n_collabs=1, weight=0.9)
+    g.add_edge('Iron Man', 'Hulk', n_collabs=2, weight=0.5)
+    return g
+
+
+@pytest.fixture
+def service():
+    return TopHeroService(['Hulk', 'Hulk', 'Hulk', 'Iron Man', 'Captain America', 'Black Widow'])
+
+
+def test_that_weighted_degree_ranks_by_collaborations(service, graph):
+    assert service.top_n(2, ranking='weighted_degree', graph=graph) == ['Iron Man', 'Captain America']
+    assert service.top_n(2) == ['Hulk', 'Iron Man']
+
+
+def test_that_top_by_score_uses_threshold(service, graph):
+    assert service.top_by_score(2, 'core_number', graph) == ['Black Widow', 'Captain America', 'Iron Man']
+    assert service.top_n(2, ranking='core_number', graph=graph, min_score=2) == ['Black Widow', 'Captain America']
+
+
+def test_that_scores_are_computed_once_per_graph(service, graph, monkeypatch):
+    from backend.service import ranking
+    calls = []
+    monkeypatch.setitem(ranking.RANKINGS, 'pagerank', lambda g: calls.append(g) or nx.pagerank(g))
+
+    service.top_n(2, ranking='pagerank', graph=graph)
+    service.top_n(3, ranking='pagerank', graph=graph)
+
+    assert calls == [graph]
+    assert pickle.loads(pickle.dumps(service)).top_n(1) == ['Hulk']
+
+
+def test_that_manager_selects_top_n_by_ranking(service, graph):
+    manager.hero_service = service
+    controller = Controller(graph)
+
+    _, (node, value) = controller.run('metrics', 2, ranking='weighted_degree', node='Captain America',
+                                      metric='pagerank')
+
+    assert value == pytest.approx(0.5)
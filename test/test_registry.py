@@ -0,0 +1,90 @@
+"""Unit tests for the hero registry."""
+import pickle
+
+import networkx as nx
+import pytest
+
+from backend import manager
+from backend.service import HeroRegistry, TopHeroService
+
+HEROES = ['SPIDER-MAN/PETER PARKER', 'CAPTAIN AMERICA', 'IRON MAN/TONY STARK', 'IRON FIST/DANIEL RAN', 'HULK/DR. ROBERT BRUC']
+
+
+@pytest.fixture
+def registry():
+    return HeroRegistry(HEROES)
+
+
+def test_that_names_are_interned_once(registry):
+    assert registry.intern('HULK/DR. ROBERT BRUC') == 4
+    assert registry.intern('THOR/DR. DONALD BLAK') == 5
+    assert registry.names[registry.ids['CAPTAIN AMERICA']] == 'CAPTAIN AMERICA'
+    assert len(registry) == 6
+
+
+@pytest.mark.parametrize('query, name', [('CAPTAIN AMERICA', 'CAPTAIN AMERICA'),
+                                         ('captain  america/', 'CAPTAIN AMERICA'),
+                                         ('SPIDER-MAN/PETER PAR', 'SPIDER-MAN/PETER PARKER'),
+                                         ('iron man', 'IRON MAN/TONY STARK'),
+                                         ('WOLVERINE', None)])
+def test_that_input_is_resolved(registry, query, name):
+    assert registry.resolve(query) == name
+
+
+@pytest.mark.parametrize('query', ['CAPTIAN AMERICA', 'IRON'])
+def test_that_fuzzy_and_ambiguous_input_is_rejected(registry, query):
+    with pytest.raises(ValueError):
+        registry.resolve(query)
+
+
+def test_that_hero_variants_and_comics_are_not_resolved():
+    graph = nx.Graph()
+    graph.add_nodes_from(['IRON MAN/TONY STARK', 'IRON MAN IV/JAMES R.', 'THOR', 'THOR IV'], type='hero')
+    graph.add_nodes_from(['CA 3', 'IM 2'], type='comic')
+    graph.add_edges_from([('IRON MAN/TONY STARK', 'IM 2'), ('IRON MAN IV/JAMES R.', 'IM 2'), ('THOR', 'CA 3')])
+    registry = HeroRegistry.from_graphs(graph)
+
+    with pytest.raises(ValueError, match='IRON MAN/TONY STARK'):
+        registry.resolve('IRON MAN')
+    assert registry.resolve('thor') == 'THOR'
+    assert registry.resolve('CA') is None
+    assert 'CA 3' not in registry
+
+
+def test_that_prefixes_of_heroes_with_aliases_are_resolved(registry):
+    registry.intern('SPIDER-WOMAN/JESSICA')
+
+    assert registry.resolve('spider-man') == 'SPIDER-MAN/PETER PARKER'
+    assert registry.resolve('SPIDER-MAN/PETER') == 'SPIDER-MAN/PETER PARKER'
+    assert registry.prefixed('SPIDER') == ['SPIDER-MAN/PETER PARKER', 'SPIDER-WOMAN/JESSICA']
+    names = [name for name, _ in registry.suggest('SPIDER-MAN/PETER PARK')]
+    assert len(names) == len(set(names)) and names[0] == 'SPIDER-MAN/PETER PARKER'
+
+
+def test_that_aliases_added_later_are_indexed(registry):
+    assert registry.prefixed('IRON')
+
+    registry.add_alias('WINGHEAD', 'CAPTAIN AMERICA')
+
+    assert registry.prefixed('WING') == ['CAPTAIN AMERICA']
+    assert registry.suggest('WINGHEAD', 1)[0][0] == 'CAPTAIN AMERICA'
+
+
+def test_that_suggestions_are_sorted_by_similarity(registry):
+    suggestions = registry.suggest('IRON MAN', 2)
+    assert [name for name, _ in suggestions] == ['IRON MAN/TONY STARK', 'IRON FIST/DANIEL RAN']
+    assert suggestions[0][1] > suggestions[1][1]
+    assert pickle.loads(pickle.dumps(registry)).resolve('iron man') == 'IRON MAN/TONY STARK'
+
+
+def test_that_manager_resolves_hero_kwargs():
+    graph = nx.Graph()
+    graph.add_edge('CAPTAIN AMERICA', 'IRON MAN/TONY STARK', weight=1)
+    graph.add_edge('IRON MAN/TONY STARK', 'HULK/DR. ROBERT BRUC', weight=1)
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+    manager.create_hero_registry(graph)
+    try:
+        _, (node, _) = manager.metrics(graph, 3, node='iron man', metric='degree_centrality')
+        assert node == 'IRON MAN/TONY STARK'
+    finally:
+        manager.hero_registry = None
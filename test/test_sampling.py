@@ -0,0 +1,65 @@
+"""Unit tests for the seeded samplers and the sampled estimates."""
+import networkx as nx
+import pytest
+
+from backend import manager
+from backend.describe import GraphType
+from backend.graph import sampling
+from backend.service import TopHeroService
+
+
+@pytest.fixture
+def graph():
+    g = nx.gnm_random_graph(200, 1000, seed=1)
+    nx.set_edge_attributes(g, 1, 'n_collabs')
+    return nx.relabel_nodes(g, {node: f'HERO {node}' for node in g})
+
+
+@pytest.mark.parametrize('method', list(sampling.SAMPLERS))
+def test_that_samples_are_seeded(graph, method):
+    sampler = sampling.SAMPLERS[method]
+
+    sample = sampler(graph, 30, seed=3, include=['HERO 7'])
+
+    assert 30 <= sample.number_of_nodes() <= 31 and 'HERO 7' in sample
+    assert nx.utils.graphs_equal(sample, sampler(graph, 30, seed=3, include=['HERO 7']))
+    assert set(sample) <= set(graph)
+
+
+def test_that_estimates_cover_the_full_value(graph):
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+    full = manager.features(graph, 200, graph_type=GraphType.COLLABORATIVE)
+
+    sampled = manager.features(graph, 200, graph_type=GraphType.COLLABORATIVE,
+                               sample={'method': 'node', 'fraction': 0.3, 'repeats': 20})
+
+    assert sampled.density.low <= full.density <= sampled.density.high
+    assert sampled.avg_degree.low <= full.avg_degree <= sampled.avg_degree.high
+    assert sampled == manager.features(graph, 200, graph_type=GraphType.COLLABORATIVE,
+                                       sample={'method': 'node', 'fraction': 0.3, 'repeats': 20})
+
+
+def test_that_sampled_betweenness_covers_the_exact_value(graph):
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+    (_, exact_mean), (_, exact) = manager.metrics(graph, 200, node='HERO 7', metric='betweenness_centrality')
+
+    (_, mean), (node, value) = manager.metrics(graph, 200, node='HERO 7', metric='betweenness_centrality',
+                                               sample={'size': 50, 'repeats': 10})
+
+    assert node == 'HERO 7' and value.n_samples == 10
+    assert value.low <= exact <= value.high
+    assert mean.low <= exact_mean <= mean.high
+
+
+@pytest.mark.parametrize('metric, method', [('closeness_centrality', 'node'), ('pagerank', 'node'),
+                                            ('betweenness_centrality', 'forest_fire')])
+def test_that_metrics_that_cannot_be_estimated_are_rejected(graph, metric, method):
+    manager.hero_service = TopHeroService(list(graph.nodes()))
+
+    with pytest.raises(ValueError):
+        manager.metrics(graph, 200, node='HERO 7', metric=metric, sample={'method': method, 'size': 50})
+    for biased in ['edge', 'random_walk', 'forest_fire']:
+        with pytest.raises(ValueError):
+            manager.features(graph, 200, graph_type=GraphType.COLLABORATIVE, sample={'method': biased, 'size': 50})
+    with pytest.raises(ValueError):
+        sampling.SampleSpec.of({'method': 'snowball'})
@@ -0,0 +1,71 @@
+"""Unit tests for the serialize module."""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from backend import Controller, manager, serialize
+from backend.describe import GraphType
+from backend.graph import collaborative
+from backend.service import TopHeroService
+
+HEROES = ['Captain America', 'Iron Man', 'Black Widow', 'Hulk']
+
+
+@pytest.fixture
+def controller():
+    manager.hero_service = TopHeroService(HEROES)
+    data = pd.DataFrame({'hero1': ['Captain America', 'Iron Man', 'Black Widow', 'Hulk', 'Captain America'],
+                         'hero2': ['Iron Man', 'Black Widow', 'Hulk', 'Captain America', 'Black Widow']})
+    graph, _ = collaborative.create_from(data)
+    return Controller(graph)
+
+
+def test_that_disconnection_is_loaded_memory_mapped(controller, tmp_path):
+    disc = controller.run('disconnecting_graphs', 4, hero_a='Captain America', hero_b='Hulk')
+
+    loaded = serialize.load(serialize.save(disc, str(tmp_path / 'disc')))
+
+    assert loaded.nodes_a.filename is not None
+    assert sorted(loaded.nodes_a) == sorted(disc.nodes_a)
+    assert loaded.links.tolist() == disc.links.tolist()
+    assert (loaded.weight, loaded.hero_a, loaded.hero_b) == (disc.weight, disc.hero_a, disc.hero_b)
+    assert set(loaded.with_graph(controller.graph).graph_b) == set(disc.graph_b)
+
+
+def test_that_features_tables_round_trip(controller, tmp_path):
+    features = controller.run('features', 4, graph_type=GraphType.COLLABORATIVE)
+    path = serialize.save(features, str(tmp_path / 'features'))
+
+    loaded = serialize.load(path)
+
+    pd.testing.assert_frame_equal(loaded.hero_collabs, features.hero_collabs)
+    pd.testing.assert_frame_equal(loaded.hubs, features.hubs.reset_index(drop=True))
+    assert loaded.n_heroes_per_comic == features.n_heroes_per_comic
+    assert (loaded.graph_type, loaded.mode, loaded.density) == (features.graph_type, features.mode, features.density)
+    assert serialize.read_table(path, 'degree_dist').num_rows == features.n_nodes
+
+
+def test_that_older_versions_are_read(controller, tmp_path):
+    path = serialize.save(controller.run('features', 4, graph_type=GraphType.COLLABORATIVE), str(tmp_path / 'f'))
+    with open(os.path.join(path, 'result.json')) as file:
+        meta = json.load(file)
+    meta['version'] = 1
+    for name in ['bipartite_density', 'global_clustering', 'avg_clustering']:
+        meta['scalars'].pop(name)
+    with open(os.path.join(path, 'result.json'), 'w') as file:
+        json.dump(meta, file)
+
+    loaded = serialize.load(path)
+
+    assert loaded.bipartite_density is None and loaded.hero_degree_dist is None
+    assert loaded.global_clustering is None and loaded.hero_triangles is None
+
+
+def test_that_newer_versions_are_rejected(controller, tmp_path, monkeypatch):
+    path = serialize.save(controller.run('features', 4, graph_type=GraphType.COLLABORATIVE), str(tmp_path / 'f'))
+    monkeypatch.setattr(serialize, 'SCHEMA_VERSION', 0)
+
+    with pytest.raises(ValueError):
+        serialize.load(path)
@@ -0,0 +1,98 @@
+"""Unit tests for the server module."""
+import asyncio
+
+import pytest
+
+from backend import manager
+from backend.describe import GraphType
+from backend.graph import collaborative
+from backend.server import QueryServer, LatencyHistogram
+
+
+@pytest.fixture
+def server():
+    manager.create_hero_service('resources/test_edges.csv')
+    graph, graph_type = collaborative.create_from('resources/test_hero-network.csv')
+    return QueryServer({graph_type: graph}, max_workers=0)
+
+
+def test_that_query_returns_json_result(server):
+    request = {'top_n': 2, 'node': 'Iron Man', 'metric': 'degree_centrality'}
+
+    result = asyncio.run(server.query('metrics', request))
+
+    assert result == [[2, 1.0], ['Iron Man', 1.0]]
+    assert server.histograms['metrics'].count == 1
+
+
+def test_that_identical_queries_are_coalesced(server):
+    features_request = {'top_n': 2, 'graph_type': GraphType.COLLABORATIVE.name}
+    metrics_request = {'top_n': 2, 'node': 'Iron Man', 'metric': 'degree_centrality'}
+
+    async def run_concurrently():
+        return await asyncio.gather(server.query('features', features_request),
+                                    server.query('metrics', metrics_request),
+                                    server.query('metrics', dict(metrics_request)))
+
+    features, metrics_1, metrics_2 = asyncio.run(run_concurrently())
+
+    assert features['n_nodes'] == 2
+    assert metrics_1 == metrics_2
+    assert server.histograms['metrics'].count == 1
+
+
+def test_that_coalesced_queries_survive_a_cancelled_query(server, monkeypatch):
+    calls = []
+
+    async def dispatch(identifier, request):
+        calls.append(identifier)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    monkeypatch.setattr(server, '_dispatch', dispatch)
+    request = {'top_n': 2, 'node': 'Iron Man', 'metric': 'degree_centrality'}
+
+    async def cancel_first():
+        first = asyncio.create_task(server.query('metrics', request))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(server.query('metrics', dict(request)))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.wait_for(second, timeout=1)
+
+    assert asyncio.run(cancel_first()) == 'result'
+    assert calls == ['metrics', 'metrics']
+
+
+@pytest.mark.parametrize('field, value', [('profile', 'stats.prof'), ('instrument', True), ('recorder', None),
+                                          ('selection_cache', {})])
+def test_that_internal_kwargs_are_rejected(server, tmp_path, field, value):
+    request = {'top_n': 2, 'node': 'Iron Man', 'metric': 'degree_centrality',
+               field: str(tmp_path / value) if field == 'profile' else value}
+
+    with pytest.raises(ValueError):
+        asyncio.run(server.query('metrics', request))
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"x"', b'2'])
+def test_that_bodies_that_are_not_objects_are_rejected(server, body):
+    async def respond():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'POST /metrics HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+        reader.feed_eof()
+        return await server._respond(reader)
+
+    status, response = asyncio.run(respond())
+
+    assert status == 400
+    assert 'json object' in response['error']
+
+
+def test_that_histogram_buckets_latencies():
+    histogram = LatencyHistogram(buckets=(10, 100))
+
+    for millis in [1, 50, 500]:
+        histogram.observe(millis)
+
+    assert histogram.to_dict()['buckets'] == {'le_10': 1, 'le_100': 1, 'le_inf': 1}
@@ -0,0 +1,54 @@
+"""Unit tests for the snapshot module."""
+import pickle
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+from backend import Controller, manager
+from backend.describe import GraphType
+from backend.graph import collaborative, snapshot
+from backend.service import TopHeroService
+
+HEROES = ['Captain America', 'Iron Man', 'Black Widow', 'Hulk']
+
+
+@pytest.fixture
+def graph():
+    data = pd.DataFrame({'hero1': ['Captain America', 'Iron Man', 'Black Widow', 'Hulk', 'Captain America', 'Hulk'],
+                         'hero2': ['Iron Man', 'Black Widow', 'Hulk', 'Captain America', 'Black Widow', 'Thor']})
+    graph, _ = collaborative.create_from(data)
+    return graph
+
+
+def test_that_subgraph_matches_networkx(graph, tmp_path):
+    snap = snapshot.Snapshot(snapshot.write(graph, str(tmp_path), GraphType.COLLABORATIVE))
+
+    subgraph = snap.subgraph(HEROES)
+
+    expected = graph.subgraph(HEROES)
+    assert sorted(subgraph.nodes()) == sorted(expected.nodes())
+    assert {frozenset(edge): data for *edge, data in subgraph.edges(data=True)} == \
+           {frozenset(edge): data for *edge, data in expected.edges(data=True)}
+    assert sorted(snap.neighbors('Hulk')) == sorted(graph.neighbors('Hulk'))
+
+
+def test_that_hero_comic_subgraph_contains_comics(tmp_path):
+    graph = nx.Graph()
+    graph.add_nodes_from(['Civil War', 'Secret Wars'], type='comic')
+    graph.add_nodes_from(['Captain America', 'Iron Man'], type='hero')
+    graph.add_edges_from([('Civil War', 'Captain America'), ('Civil War', 'Iron Man'), ('Secret Wars', 'Iron Man')])
+    snap = snapshot.Snapshot(snapshot.write(graph, str(tmp_path), GraphType.HERO_COMIC))
+
+    subgraph = snap.subgraph(['Captain America'], neighbours=True)
+
+    assert dict(subgraph.nodes(data='type')) == {'Civil War': 'comic', 'Captain America': 'hero'}
+
+
+def test_that_controller_runs_on_pickled_snapshot(graph, tmp_path):
+    manager.hero_service = TopHeroService(HEROES)
+    snap = pickle.loads(pickle.dumps(snapshot.Snapshot(snapshot.write(graph, str(tmp_path),
+                                                                      GraphType.COLLABORATIVE))))
+    kwargs = {'node': 'Hulk', 'metric': 'closeness_centrality'}
+
+    assert Controller(snap).run('metrics', 4, **kwargs) == Controller(graph).run('metrics', 4, **kwargs)
@@ -0,0 +1,35 @@
+"""Unit tests for the sweeps over increasing numbers of top heroes."""
+import networkx as nx
+import pytest
+
+from backend import manager, sweep
+from backend.service import TopHeroService
+
+
+@pytest.fixture
+def graph():
+    g = nx.Graph()
+    g.add_edge('A', 'B', n_collabs=3, weight=0.3)
+    g.add_edge('B', 'C', n_collabs=1, weight=1)
+    g.add_edge('D', 'E', n_collabs=1, weight=1)
+    g.add_edge('A', 'E', n_collabs=2, weight=0.5)
+    manager.hero_service = TopHeroService(['A'] * 5 + ['B'] * 4 + ['D'] * 3 + ['C'] * 2 + ['E'])
+    return g
+
+
+def test_that_sweep_equals_independent_runs(graph):
+    table = sweep.run(graph, [4, 2, 5, 10], analyses={'edges': lambda subgraph, heroes: sorted(subgraph.edges)})
+
+    assert table.top_n.tolist() == [2, 4, 5]
+    for top_n, row in table.set_index('top_n').iterrows():
+        _, subgraph = manager.select_top_n(graph, top_n)
+        assert row.n_edges == subgraph.number_of_edges()
+        assert row.n_components == nx.number_connected_components(subgraph)
+        assert row.density == nx.density(subgraph)
+        assert {frozenset(edge) for edge in row.edges} == {frozenset(edge) for edge in subgraph.edges}
+    assert table.largest_component.tolist() == [2, 3, 5]
+
+
+def test_that_min_core_is_rejected(graph):
+    with pytest.raises(ValueError):
+        sweep.run(graph, [2], min_core=2)
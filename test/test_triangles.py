@@ -0,0 +1,47 @@
+"""Unit tests for the triangles and the clustering."""
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import Controller, manager, serialize
+from backend.describe import GraphType
+from backend.graph import collaborative, triangles, transitivity
+from backend.service import TopHeroService
+
+
+@pytest.mark.parametrize('graph', [nx.karate_club_graph(), nx.barabasi_albert_graph(300, 4, seed=0),
+                                   nx.complete_graph(5), nx.star_graph(10), nx.empty_graph(3)])
+def test_that_triangles_match_networkx(graph):
+    graph = nx.Graph(graph)
+    graph.add_edge(0, 0)
+
+    table = triangles(graph)
+
+    assert table.node.tolist() == list(graph.nodes())
+    assert table.triangles.tolist() == [nx.triangles(graph)[node] for node in graph]
+    assert np.allclose(table.clustering, [nx.clustering(graph)[node] for node in graph])
+    assert transitivity(table) == pytest.approx(nx.transitivity(graph))
+
+
+def test_that_features_include_clustering(tmp_path):
+    manager.hero_service = TopHeroService(['Captain America', 'Iron Man', 'Black Widow', 'Hulk'])
+    data = pd.DataFrame({'hero1': ['Captain America', 'Iron Man', 'Black Widow', 'Captain America'],
+                         'hero2': ['Iron Man', 'Black Widow', 'Captain America', 'Hulk']})
+    controller = Controller(collaborative.create_from(data)[0])
+
+    features = controller.run('features', 4, graph_type=GraphType.COLLABORATIVE, clustering=True)
+
+    assert features.global_clustering == pytest.approx(3 / 5)
+    assert features.avg_clustering == pytest.approx((1 / 3 + 1 + 1 + 0) / 4)
+    assert features.hero_triangles.node[0] == 'Captain America'
+    assert features.hero_triangles.triangles.tolist() == [1, 1, 1, 0]
+    loaded = serialize.load(serialize.save(features, str(tmp_path / 'features')))
+    assert loaded.global_clustering == features.global_clustering
+    pd.testing.assert_frame_equal(loaded.hero_triangles, features.hero_triangles)
+    assert controller.run('features', 4, graph_type=GraphType.COLLABORATIVE).hero_triangles is None
+
+
+def test_that_clustering_of_the_hero_comic_graph_is_rejected():
+    with pytest.raises(ValueError):
+        manager.features(nx.Graph(), 4, graph_type=GraphType.HERO_COMIC, clustering=True)